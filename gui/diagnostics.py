@@ -0,0 +1,136 @@
+"""Ventana de diagnóstico (Ayuda ▸ Diagnóstico de memoria): memoria por fuente cargada + RSS en el tiempo."""
+import gc
+import os
+
+import pandas as pd
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog,  # type: ignore
+                             QMessageBox, QSplitter, QApplication)
+from PyQt6.QtCore import Qt, QTimer, QSettings  # type: ignore
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas  # type: ignore
+from matplotlib.figure import Figure  # type: ignore
+
+from modules.flow2d.flow2d_models import ColumnsTableModel, fixed_format
+from modules.flow2d.flow2d_widget import make_table_view
+from utils.memory import memory_report, rss_history
+
+MB = 1024.0 * 1024.0
+
+
+class MemoryInspectorDialog(QDialog):
+    """
+    Tabla: bytes de cada fuente registrada (ParseResult de Flow 2D, matrices XSECH, Excel, Cv) por
+    categoría. Gráfico: RSS del proceso (muestreado por el launcher). No modal.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnóstico de memoria")
+        self.resize(820, 560)
+        self._report = None
+
+        lay = QVBoxLayout(self)
+        split = QSplitter(Qt.Orientation.Vertical)
+        self.model = ColumnsTableModel()
+        self.view = make_table_view(self, self.model)
+        split.addWidget(self.view)
+        self.fig = Figure(figsize=(6, 2.5), tight_layout=True)
+        self.ax = self.fig.add_subplot(111)
+        self.canvas = FigureCanvas(self.fig)
+        split.addWidget(self.canvas)
+        split.setStretchFactor(0, 3)
+        split.setStretchFactor(1, 2)
+        lay.addWidget(split, 1)
+
+        self.lbl_info = QLabel("")
+        lay.addWidget(self.lbl_info)
+
+        row = QHBoxLayout()
+        btn_refresh = QPushButton("Actualizar")
+        btn_refresh.clicked.connect(self.refresh)
+        btn_gc = QPushButton("Recolectar basura")
+        btn_gc.setToolTip("gc.collect() y volver a medir (para verificar que algo se liberó)")
+        btn_gc.clicked.connect(self._collect)
+        self.btn_export = QPushButton("Exportar CSV")
+        self.btn_export.clicked.connect(self._export)
+        row.addWidget(btn_refresh)
+        row.addWidget(btn_gc)
+        row.addStretch(1)
+        row.addWidget(self.btn_export)
+        btn_close = QPushButton("Cerrar")
+        btn_close.clicked.connect(self.close)
+        row.addWidget(btn_close)
+        lay.addLayout(row)
+
+        # el gráfico de RSS se redibuja mientras la ventana está visible
+        self._plot_timer = QTimer(self)
+        self._plot_timer.setInterval(2000)
+        self._plot_timer.timeout.connect(self._refresh_plot)
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        self._plot_timer.start()
+
+    def hideEvent(self, e):
+        self._plot_timer.stop()
+        super().hideEvent(e)
+
+    def refresh(self):
+        """Vuelve a medir todas las fuentes (en contenedores grandes por muestreo)."""
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            self._report = memory_report()
+        finally:
+            QApplication.restoreOverrideCursor()
+        rep = self._report
+        headers, cols = rep.as_columns()
+        num = fixed_format(2)
+        self.model.set_columns(headers, cols, [None] + [num] * (len(headers) - 2) + [None])
+        self.view.resizeColumnToContents(0)
+        rss = rep.rss
+        parts = [f"Medido: {rep.total / MB:,.1f} MB"]
+        if rss is not None:
+            parts.append(f"RSS: {rss / MB:,.1f} MB")
+            parts.append(f"sin atribuir (intérprete, Qt, librerías…): {max(0, rss - rep.total) / MB:,.1f} MB")
+        peak = rss_history.peak()
+        if peak is not None:
+            parts.append(f"pico RSS: {peak / MB:,.1f} MB")
+        parts.append(f"({rep.elapsed:.2f} s)")
+        self.lbl_info.setText("  ·  ".join(parts))
+        print(f"[MEM] {len(rep.entries)} fuentes, medido {rep.total / MB:.1f} MB, "
+              f"RSS {'-' if rss is None else f'{rss / MB:.1f} MB'}")
+        self._refresh_plot()
+
+    def _collect(self):
+        n = gc.collect()
+        print(f"[MEM] gc.collect(): {n} objetos")
+        self.refresh()
+
+    def _refresh_plot(self):
+        t, rss = rss_history.arrays()
+        self.ax.clear()
+        if len(t):
+            self.ax.plot(t / 60.0, rss / MB, color="#1f4e79", linewidth=1.4)
+        else:
+            self.ax.text(0.5, 0.5, "RSS no disponible en esta plataforma", ha="center", va="center",
+                         transform=self.ax.transAxes)
+        self.ax.set_xlabel("Tiempo desde el inicio (min)")
+        self.ax.set_ylabel("RSS (MB)")
+        self.ax.grid(True, alpha=0.3)
+        self.canvas.draw_idle()
+
+    def _export(self):
+        if self._report is None:
+            return
+        s = QSettings("MyFriendTGI", "Diagnostics")
+        path, _ = QFileDialog.getSaveFileName(self, "Guardar informe de memoria",
+                                              os.path.join(s.value("last_dir", ""), "memoria.csv"),
+                                              "CSV (*.csv)")
+        if not path:
+            return
+        s.setValue("last_dir", os.path.dirname(path))
+        headers, cols = self._report.as_columns()
+        try:
+            pd.DataFrame(dict(zip(headers, cols))).to_csv(path, index=False)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo guardar:\n{e}")
+            return
+        print(f"[MEM] Informe -> {path}")
@@ -1,10 +1,13 @@
 """Base principal donde se ensamblan los módulos"""
 from PyQt6.QtWidgets import (QMainWindow, QTabWidget, QFileDialog, QMessageBox ) # type: ignore
+from PyQt6.QtCore import QTimer # type: ignore
 #Importacion de modulos
 from modules.excel.excel_widget import ExcelWidget
 from modules.flow2d.flow2d_widget import Flow2DWidget
 from modules.HidrogramasCv.HidrogramasCv_widget import HidrogramasCvWidget
 from utils.i18n_loader import cargar_traducciones
+from utils.memory import rss_history
+from utils import tracing
 
 class Launcher(QMainWindow):
     """Ventana principal del programa My Friend TGI, organizada con pestañas para módulos."""
@@ -32,8 +35,8 @@ class Launcher(QMainWindow):
         self.tabs.addTab(self.flow2d_tab, "Flow 2D")
 
         # Agregar pestaña de Hidrogramas Cv
-        self.flow2d_tab = HidrogramasCvWidget()
-        self.tabs.addTab(self.flow2d_tab, "Hidrogramas Cv")
+        self.cv_tab = HidrogramasCvWidget(hydrograph_provider=self.flow2d_tab.xsech_tab.current_hydrographs)
+        self.tabs.addTab(self.cv_tab, "Hidrogramas Cv")
 
         #Agregando barra de menú
         #self.init_menu_bar()
@@ -41,6 +44,13 @@ class Launcher(QMainWindow):
         # Menú inicial
         self.build_menu()
 
+        # Muestreo de RSS en segundo plano (historial para Ayuda ▸ Diagnóstico de memoria)
+        self._diag = None
+        rss_history.sample()
+        self._rss_timer = QTimer(self)
+        self._rss_timer.timeout.connect(rss_history.sample)
+        self._rss_timer.start(2000)
+
     def build_menu(self):
         tr = self.traducciones
         """Barra de menu"""
@@ -74,6 +84,17 @@ class Launcher(QMainWindow):
         # Menú Ayuda
         ayuda_menu = menu_bar.addMenu(tr["help"])
 
+        diag_action = ayuda_menu.addAction(tr.get("memory_diagnostics", "Diagnóstico de memoria"))
+        diag_action.triggered.connect(self.mostrar_diagnostico_memoria)
+
+        trace_action = ayuda_menu.addAction(tr.get("trace_record", "Registrar trazas de tiempo"))
+        trace_action.setCheckable(True)
+        trace_action.setChecked(tracing.is_enabled())
+        trace_action.toggled.connect(tracing.enable)
+        trace_export = ayuda_menu.addAction(tr.get("trace_export", "Exportar trazas (Chrome/Perfetto)…"))
+        trace_export.triggered.connect(self.exportar_trazas)
+        ayuda_menu.addSeparator()
+
         acerca_action = ayuda_menu.addAction(tr["about"])
         acerca_action.triggered.connect(self.mostrar_acerca_de)
 
@@ -91,6 +112,32 @@ class Launcher(QMainWindow):
         if archivo:
             QMessageBox.information(self, "Archivo seleccionado", archivo)
 
+    def mostrar_diagnostico_memoria(self):
+        """Ventana no modal con la memoria de cada resultado cargado y el RSS del proceso."""
+        from gui.diagnostics import MemoryInspectorDialog
+        if self._diag is None:
+            self._diag = MemoryInspectorDialog(self)
+        self._diag.refresh()
+        self._diag.show()
+        self._diag.raise_()
+
+    def exportar_trazas(self):
+        """Guarda los spans registrados como JSON de trace-event (chrome://tracing, ui.perfetto.dev)."""
+        if tracing.event_count() == 0:
+            QMessageBox.information(self, "Trazas", "No hay trazas registradas.\n"
+                                    "Activa Ayuda ▸ Registrar trazas y repite la operación lenta.")
+            return
+        ruta, _ = QFileDialog.getSaveFileName(self, "Guardar trazas", "traza_mft.json", "Trace JSON (*.json)")
+        if not ruta:
+            return
+        try:
+            tracing.export_chrome_trace(ruta)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"No se pudo guardar:\n{e}")
+            return
+        for name, calls, total_ms, max_ms in tracing.summary()[:10]:
+            print(f"[TRACE] {name}: {calls}× total {total_ms:.1f} ms, máx {max_ms:.1f} ms")
+
     def mostrar_acerca_de(self):
         """Generacion de información"""
         QMessageBox.information(
@@ -1,10 +1,12 @@
 """Punto de entrada principal de My Friend TGI."""
 
 import sys  # 1. Módulos estándar
+import multiprocessing
 from PyQt6.QtWidgets import QApplication  # pylint: disable=no-name-in-module
 from gui.launcher import Launcher  # 3. Módulos internos del proyecto
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # exportación en paralelo (procesos) desde el .exe de PyInstaller
     app = QApplication(sys.argv)
     window = Launcher()
     window.show()
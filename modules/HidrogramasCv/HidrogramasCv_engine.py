@@ -0,0 +1,186 @@
+# modules/HidrogramasCv/HidrogramasCv_engine.py
+"""
+Motor de hidrogramas con concentración volumétrica de sedimentos (Cv) — flujos de lodo.
+  Q_bulked(t) = BF(t) · Q_agua(t),   BF = 1 / (1 − Cv(t))
+- Entrada: matriz Q (T×S) de agua clara (p.ej. la de XSECH) + eje de tiempo en horas.
+- Escenarios: K leyes Cv(t) (constante o tramos lineales) → matriz Cv (K×T).
+- Resumen (pico, tiempo al pico, volumen) de las K×S combinaciones en pasadas NumPy:
+  el volumen es un producto de matrices (pesos trapezoidales × BF) @ Q.
+Sin Qt: la interfaz está en HidrogramasCv_widget.py.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from modules.flow2d.flow2d_hydro import trapezoid_weights
+
+CV_MAX = 0.95                       # Cv ≥ 1 → BF infinito; por encima de ~0.6 ya no es un flujo
+PEAK_BLOCK_ELEMS = 16 * 1024 * 1024  # elementos K×T×bloque por pasada del pico (memoria acotada)
+
+
+@dataclass
+class CvSchedule:
+    """Ley Cv(t): puntos (hora, Cv) interpolados linealmente; fuera del rango se mantiene el extremo."""
+    name: str
+    hours: np.ndarray
+    cv: np.ndarray
+
+    @classmethod
+    def constant(cls, name: str, cv: float) -> "CvSchedule":
+        return cls(name, np.array([0.0]), np.array([float(cv)]))
+
+    @classmethod
+    def parse(cls, name: str, text: str) -> "CvSchedule":
+        """
+        "0.35" → constante; "0:0.2, 3:0.45, 8:0.3" → tramos (hora:Cv).
+        Acepta ';' o ',' entre puntos y coma decimal si los puntos se separan con ';'.
+        """
+        text = text.strip()
+        if not text:
+            raise ValueError(f"{name}: ley Cv vacía")
+        if ":" not in text:
+            return cls.constant(name, float(text.replace(",", ".")))
+        sep = ";" if ";" in text else ","
+        pts = []
+        for tok in filter(None, (p.strip() for p in text.split(sep))):
+            m = re.fullmatch(r"([-+0-9.,eE]+)\s*:\s*([-+0-9.,eE]+)", tok)
+            if not m:
+                raise ValueError(f"{name}: punto inválido '{tok}' (usa hora:Cv)")
+            pts.append((float(m.group(1).replace(",", ".")), float(m.group(2).replace(",", "."))))
+        pts.sort()
+        return cls(name, np.array([p[0] for p in pts]), np.array([p[1] for p in pts]))
+
+    def describe(self) -> str:
+        if len(self.hours) == 1:
+            return f"{self.cv[0]:g}"
+        return ", ".join(f"{h:g}:{c:g}" for h, c in zip(self.hours, self.cv))
+
+    def validate(self):
+        if len(self.hours) == 0 or len(self.hours) != len(self.cv):
+            raise ValueError(f"{self.name}: ley Cv sin puntos")
+        if not np.all(np.isfinite(self.cv)) or np.any(self.cv < 0) or np.any(self.cv > CV_MAX):
+            raise ValueError(f"{self.name}: Cv debe estar entre 0 y {CV_MAX}")
+
+
+def cv_matrix(times_hours: np.ndarray, schedules: list[CvSchedule]) -> np.ndarray:
+    """Cv de cada escenario en cada tiempo → (K, T)."""
+    t = np.asarray(times_hours, dtype=float)
+    out = np.empty((len(schedules), t.shape[0]), dtype=float)
+    for k, sch in enumerate(schedules):
+        sch.validate()
+        out[k] = np.interp(t, sch.hours, sch.cv)
+    return out
+
+
+def bulking_factor(cv: np.ndarray) -> np.ndarray:
+    """BF = 1 / (1 − Cv) (mismo shape que cv)."""
+    return 1.0 / (1.0 - np.asarray(cv, dtype=float))
+
+
+def bulk(Q: np.ndarray, cv: np.ndarray) -> np.ndarray:
+    """
+    Hidrogramas con sedimento.
+    Q (T,S) y cv (T,) → (T,S);  Q (T,S) y cv (K,T) → (K,T,S). NaN de Q se conserva.
+    """
+    Q = np.asarray(Q, dtype=float)
+    bf = bulking_factor(cv)
+    if bf.ndim == 1:
+        return Q * bf[:, None]
+    return Q[None, :, :] * bf[:, :, None]
+
+
+@dataclass
+class BulkSummary:
+    """Resultados por escenario (k) y sección (s)."""
+    scenarios: list[str]
+    sections: list[str]
+    peak_clear: np.ndarray      # (S,)   pico de agua clara
+    volume_clear: np.ndarray    # (S,)   volumen de agua clara [m³ si Q en m³/s]
+    peak: np.ndarray            # (K,S)  pico con sedimento
+    t_peak: np.ndarray          # (K,S)  hora del pico con sedimento
+    volume: np.ndarray          # (K,S)  volumen con sedimento
+    bf_mean: np.ndarray         # (K,S)  BF efectivo = volumen / volumen agua clara
+
+    def as_columns(self) -> tuple[list[str], list[np.ndarray]]:
+        """Tabla larga (K·S filas): encabezados + columnas para ColumnsTableModel/CSV."""
+        K, S = self.peak.shape
+        headers = ["Escenario", "Sección", "Qp agua", "Qp con Cv", "t pico (h)",
+                   "Vol. agua", "Vol. con Cv", "BF efectivo"]
+        cols = [
+            np.repeat(np.array(self.scenarios, dtype=object), S),
+            np.tile(np.array(self.sections, dtype=object), K),
+            np.tile(self.peak_clear, K),
+            self.peak.ravel(),
+            self.t_peak.ravel(),
+            np.tile(self.volume_clear, K),
+            self.volume.ravel(),
+            self.bf_mean.ravel(),
+        ]
+        return headers, cols
+
+
+def summarize(times_hours: np.ndarray, Q: np.ndarray, cv: np.ndarray,
+              scenarios: list[str], sections: list[str]) -> BulkSummary:
+    """
+    Pico, hora del pico y volumen de las K×S combinaciones.
+    - Volumen: (w·BF) (K,T) @ Q (T,S) → una multiplicación de matrices (NaN de Q cuenta como 0).
+    - Pico: max sobre T de BF·Q, por bloques de secciones (no materializa K×T×S completo).
+    """
+    t = np.asarray(times_hours, dtype=float)
+    Q = np.asarray(Q, dtype=float)
+    cv = np.atleast_2d(cv)
+    K, T = cv.shape
+    if Q.shape[0] != T:
+        raise ValueError(f"Dimensiones incompatibles: Q={Q.shape}, Cv={cv.shape}")
+    S = Q.shape[1]
+    bf = bulking_factor(cv)
+    w = trapezoid_weights(t)
+    valid = np.isfinite(Q)
+    Qz = np.where(valid, Q, 0.0)
+
+    volume_clear = w @ Qz
+    volume = (bf * w[None, :]) @ Qz
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bf_mean = np.where(volume_clear[None, :] != 0, volume / volume_clear[None, :], np.nan)
+
+    any_valid = valid.any(axis=0)
+    Qm = np.where(valid, Q, -np.inf)
+    peak_clear = np.where(any_valid, Qm.max(axis=0, initial=-np.inf), np.nan)
+    peak = np.full((K, S), np.nan)
+    t_peak = np.full((K, S), np.nan)
+    block = max(1, PEAK_BLOCK_ELEMS // max(K * T, 1))
+    for s0 in range(0, S, block):
+        s1 = min(S, s0 + block)
+        qb = bf[:, :, None] * Qm[None, :, s0:s1]      # (K,T,b); -inf donde no hay dato
+        idx = qb.argmax(axis=1)                        # (K,b)
+        pk = np.take_along_axis(qb, idx[:, None, :], axis=1)[:, 0, :]
+        ok = any_valid[s0:s1][None, :]
+        peak[:, s0:s1] = np.where(ok, pk, np.nan)
+        t_peak[:, s0:s1] = np.where(ok, t[idx], np.nan)
+    return BulkSummary(list(scenarios), list(sections), peak_clear, volume_clear,
+                       peak, t_peak, volume, bf_mean)
+
+
+def read_hydrograph_file(path: str) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """
+    Hidrograma importado (CSV/TXT o Excel): primera columna = tiempo en horas, resto = Q por serie.
+    Devuelve (horas (T,), Q (T,S), nombres). Filas ordenadas por tiempo.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm", ".xls"):
+        from modules.excel.excel_reader import list_sheets, load_table
+        table = load_table(path, list_sheets(path)[0])
+        df = pd.DataFrame({c: table.data[c] for c in table.columns})
+    else:
+        df = pd.read_csv(path, sep=None, engine="python")
+    if df.shape[1] < 2:
+        raise ValueError("El archivo debe tener una columna de tiempo (h) y al menos una de caudal.")
+    df = df.apply(pd.to_numeric, errors="coerce")
+    df = df[np.isfinite(df.iloc[:, 0].to_numpy(dtype=float))].sort_values(df.columns[0])
+    hours = df.iloc[:, 0].to_numpy(dtype=float)
+    Q = df.iloc[:, 1:].to_numpy(dtype=float)
+    return hours, Q, [str(c) for c in df.columns[1:]]
@@ -1,9 +1,245 @@
 """Widget principal para la generación de hidrogramas con Cv en la interfaz de My Friend TGI."""
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel # type: ignore
+import os
+
+import numpy as np
+import pandas as pd
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog, # type: ignore
+                             QMessageBox, QComboBox, QSplitter, QTableWidget, QTableWidgetItem,
+                             QTableView, QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import Qt, QSettings # type: ignore
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas  # type: ignore
+from matplotlib.figure import Figure  # type: ignore
+
+from modules.flow2d.flow2d_models import ColumnsTableModel, fixed_format
+from utils.memory import MemoryUsage, measure, register_source
+from .HidrogramasCv_engine import CvSchedule, bulk, cv_matrix, read_hydrograph_file, summarize
+
+DEFAULT_SCENARIOS = [("Cv 0.20", "0.2"), ("Cv 0.40", "0.4"), ("Cv variable", "0:0.2, 2:0.45, 6:0.3")]
+
+
 class HidrogramasCvWidget(QWidget):
-    """Interfaz gráfica para el módulo Flow 2D de My Friend TGI."""
-    def __init__(self):
+    """
+    Hidrogramas con sedimento: Q·BF, BF = 1/(1 − Cv(t)), para varios escenarios Cv a la vez.
+    Fuente de caudales: la matriz T×S de XSECH (Flow 2D) o un hidrograma importado (CSV/Excel).
+    `hydrograph_provider()` → (horas, Q, secciones, etiqueta) | None (lo conecta el launcher).
+    """
+    def __init__(self, hydrograph_provider=None):
         super().__init__()
+        self._provider = hydrograph_provider
+        self._hours: np.ndarray | None = None
+        self._Q: np.ndarray | None = None
+        self._sections: list[str] = []
+        self._schedules: list[CvSchedule] = []
+        self._cv: np.ndarray | None = None      # (K, T)
+        self._summary = None
+
         layout = QVBoxLayout()
-        layout.addWidget(QLabel("Este es el módulo Flow 2D. Aquí irá tu lógica."))
+
+        # Fuente de caudales
+        top = QHBoxLayout()
+        self.btn_xsech = QPushButton("Usar hidrogramas XSECH (Flow 2D)")
+        self.btn_xsech.clicked.connect(self.cargar_desde_xsech)
+        self.btn_xsech.setEnabled(hydrograph_provider is not None)
+        top.addWidget(self.btn_xsech)
+        self.btn_import = QPushButton("Importar hidrograma…")
+        self.btn_import.setToolTip("CSV/Excel: 1ª columna = tiempo (h), resto = caudal por serie")
+        self.btn_import.clicked.connect(self.importar_hidrograma)
+        top.addWidget(self.btn_import)
+        self.lbl_source = QLabel("Sin hidrogramas cargados")
+        top.addWidget(self.lbl_source, 1)
+        layout.addLayout(top)
+
+        split = QSplitter(Qt.Orientation.Horizontal)
+
+        # Escenarios Cv (editables)
+        left = QWidget()
+        lv = QVBoxLayout(left)
+        lv.setContentsMargins(0, 0, 0, 0)
+        lv.addWidget(QLabel("Escenarios Cv (constante o hora:Cv, …):"))
+        self.tbl_cv = QTableWidget(0, 2)
+        self.tbl_cv.setHorizontalHeaderLabels(["Escenario", "Cv"])
+        self.tbl_cv.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        for name, text in DEFAULT_SCENARIOS:
+            self._add_scenario(name, text)
+        lv.addWidget(self.tbl_cv)
+        hb = QHBoxLayout()
+        btn_add = QPushButton("Agregar")
+        btn_add.clicked.connect(lambda: self._add_scenario(f"Escenario {self.tbl_cv.rowCount() + 1}", "0.3"))
+        btn_del = QPushButton("Quitar")
+        btn_del.clicked.connect(self._remove_scenario)
+        hb.addWidget(btn_add)
+        hb.addWidget(btn_del)
+        lv.addLayout(hb)
+        self.btn_calc = QPushButton("Calcular")
+        self.btn_calc.clicked.connect(self.calcular)
+        lv.addWidget(self.btn_calc)
+        split.addWidget(left)
+
+        # Gráfico de la sección elegida + tabla resumen
+        right = QSplitter(Qt.Orientation.Vertical)
+        plot_box = QWidget()
+        pv = QVBoxLayout(plot_box)
+        pv.setContentsMargins(0, 0, 0, 0)
+        row = QHBoxLayout()
+        row.addWidget(QLabel("Sección:"))
+        self.cbo_section = QComboBox()
+        self.cbo_section.currentIndexChanged.connect(self._refresh_plot)
+        row.addWidget(self.cbo_section, 1)
+        pv.addLayout(row)
+        self.fig = Figure(figsize=(6, 3.5), tight_layout=True)
+        self.ax = self.fig.add_subplot(111)
+        self.ax2 = self.ax.twinx()
+        self.canvas = FigureCanvas(self.fig)
+        pv.addWidget(self.canvas)
+        right.addWidget(plot_box)
+
+        table_box = QWidget()
+        tv = QVBoxLayout(table_box)
+        tv.setContentsMargins(0, 0, 0, 0)
+        self.model = ColumnsTableModel()
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.view.verticalHeader().setDefaultSectionSize(22)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.view.setAlternatingRowColors(True)
+        tv.addWidget(self.view)
+        self.btn_export = QPushButton("Exportar resumen CSV")
+        self.btn_export.setEnabled(False)
+        self.btn_export.clicked.connect(self.exportar_resumen)
+        tv.addWidget(self.btn_export, 0, Qt.AlignmentFlag.AlignRight)
+        right.addWidget(table_box)
+        right.setStretchFactor(0, 3)
+        right.setStretchFactor(1, 2)
+        split.addWidget(right)
+        split.setStretchFactor(1, 3)
+        layout.addWidget(split, 1)
+
         self.setLayout(layout)
+        register_source("Hidrogramas Cv", self._memory_usage)
+
+    def _memory_usage(self) -> MemoryUsage | None:
+        """Hidrogramas cargados + Cv + resumen (la matriz Q puede ser la misma que la de XSECH)."""
+        if self._Q is None:
+            return None
+        return measure((self._hours, self._Q, self._sections, self._cv, self._summary))
+
+    # ---- fuentes ----
+    def cargar_desde_xsech(self):
+        """Toma la matriz Q (T×S) que ya construyó la pestaña XSECH."""
+        data = self._provider() if self._provider else None
+        if data is None:
+            QMessageBox.information(self, "Hidrogramas Cv", "Carga primero un XSECI en Flow 2D.")
+            return
+        hours, Q, sections, label = data
+        self._set_hydrographs(hours, Q, sections, f"XSECH — {label}")
+
+    def importar_hidrograma(self):
+        s = QSettings("MyFriendTGI", "HidrogramasCv")
+        path, _ = QFileDialog.getOpenFileName(self, "Importar hidrograma", s.value("last_dir", ""),
+                                              "Hidrogramas (*.csv *.txt *.xlsx *.xlsm *.xls);;Todos (*.*)")
+        if not path:
+            return
+        s.setValue("last_dir", os.path.dirname(path))
+        try:
+            hours, Q, names = read_hydrograph_file(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo leer el hidrograma:\n{e}")
+            return
+        self._set_hydrographs(hours, Q, names, os.path.basename(path))
+
+    def _set_hydrographs(self, hours, Q, sections, label: str):
+        self._hours = np.asarray(hours, dtype=float)
+        self._Q = np.asarray(Q, dtype=float)
+        self._sections = [str(s) for s in sections]
+        self.lbl_source.setText(f"{label}: {len(self._hours)} tiempos × {len(self._sections)} series")
+        print(f"[CV] Hidrogramas: {label} ({self._Q.shape[0]}×{self._Q.shape[1]})")
+        self.cbo_section.blockSignals(True)
+        self.cbo_section.clear()
+        self.cbo_section.addItems(self._sections)
+        self.cbo_section.blockSignals(False)
+        self.calcular()
+
+    # ---- escenarios ----
+    def _add_scenario(self, name: str, text: str):
+        r = self.tbl_cv.rowCount()
+        self.tbl_cv.insertRow(r)
+        self.tbl_cv.setItem(r, 0, QTableWidgetItem(name))
+        self.tbl_cv.setItem(r, 1, QTableWidgetItem(text))
+
+    def _remove_scenario(self):
+        rows = sorted({ix.row() for ix in self.tbl_cv.selectedIndexes()}, reverse=True)
+        for r in rows or [self.tbl_cv.rowCount() - 1]:
+            if r >= 0:
+                self.tbl_cv.removeRow(r)
+
+    def _read_schedules(self) -> list[CvSchedule]:
+        out = []
+        for r in range(self.tbl_cv.rowCount()):
+            name_it, cv_it = self.tbl_cv.item(r, 0), self.tbl_cv.item(r, 1)
+            name = (name_it.text().strip() if name_it else "") or f"Escenario {r + 1}"
+            text = cv_it.text() if cv_it else ""
+            if text.strip():
+                out.append(CvSchedule.parse(name, text))
+        if not out:
+            raise ValueError("Define al menos un escenario Cv.")
+        return out
+
+    # ---- cálculo ----
+    def calcular(self):
+        """Aplica todos los escenarios a todas las series y llena el resumen (pico, volumen, BF)."""
+        if self._Q is None:
+            QMessageBox.information(self, "Hidrogramas Cv", "No hay hidrogramas cargados.")
+            return
+        try:
+            schedules = self._read_schedules()
+            cv = cv_matrix(self._hours, schedules)
+            summary = summarize(self._hours, self._Q, cv, [s.name for s in schedules], self._sections)
+        except ValueError as e:
+            QMessageBox.warning(self, "Hidrogramas Cv", str(e))
+            return
+        self._schedules, self._cv, self._summary = schedules, cv, summary
+        headers, cols = summary.as_columns()
+        num = fixed_format(3)
+        self.model.set_columns(headers, cols, [None, None, num, num, num, fixed_format(1), fixed_format(1), num])
+        self.btn_export.setEnabled(True)
+        self._refresh_plot()
+
+    def _refresh_plot(self, *_):
+        self.ax.clear()
+        self.ax2.clear()
+        j = self.cbo_section.currentIndex()
+        if self._Q is None or self._cv is None or j < 0:
+            self.canvas.draw_idle()
+            return
+        q = self._Q[:, j]
+        self.ax.plot(self._hours, q, color="#1f4e79", linewidth=1.8, label="Agua clara")
+        qb = bulk(q[:, None], self._cv)[:, :, 0]   # (K, T)
+        for k, sch in enumerate(self._schedules):
+            line, = self.ax.plot(self._hours, qb[k], linewidth=1.4, label=f"{sch.name}")
+            self.ax2.plot(self._hours, self._cv[k], linestyle=":", linewidth=1.0, color=line.get_color())
+        self.ax.set_xlabel("Tiempo (h)")
+        self.ax.set_ylabel("Caudal (m³/s)")
+        self.ax2.set_ylabel("Cv (punteado)")
+        self.ax2.set_ylim(0, max(0.6, float(np.nanmax(self._cv)) * 1.1))
+        self.ax.grid(True, alpha=0.3)
+        self.ax.set_title(self._sections[j])
+        self.ax.legend(loc="best", fontsize=8)
+        self.canvas.draw_idle()
+
+    def exportar_resumen(self):
+        if self._summary is None:
+            return
+        s = QSettings("MyFriendTGI", "HidrogramasCv")
+        path, _ = QFileDialog.getSaveFileName(self, "Guardar resumen",
+                                              os.path.join(s.value("last_dir", ""), "resumen_cv.csv"),
+                                              "CSV (*.csv)")
+        if not path:
+            return
+        headers, cols = self._summary.as_columns()
+        try:
+            pd.DataFrame(dict(zip(headers, cols))).to_csv(path, index=False)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo guardar:\n{e}")
+            return
+        print(f"[CV] Resumen -> {path}")
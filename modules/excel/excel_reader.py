@@ -0,0 +1,392 @@
+# modules/excel/excel_reader.py
+"""
+Lectura rápida (solo lectura, en streaming) de libros Excel de aforos / datos observados.
+- Motor: python-calamine si está instalado (Rust, también lee .xls); si no, openpyxl read_only.
+- Se recorren las filas una sola vez guardando solo las columnas elegidas; cada columna se
+  convierte a un arreglo NumPy con tipo inferido (int64, float64, datetime64, bool o texto).
+- La tabla convertida se guarda en caché (.npz sin pickle): reabrir el mismo libro sin cambios
+  no vuelve a leer el Excel.
+Sin Qt: se usa desde un worker en segundo plano (ver excel_widget.py).
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+import datetime as dt
+import hashlib
+import json
+import os
+import re
+import zipfile
+
+import numpy as np
+
+from utils.tracing import traced
+
+CACHE_VERSION = 1
+PROGRESS_EVERY = 4096   # filas entre avisos de progreso / comprobación de cancelación
+
+
+class ExcelLoadCancelled(Exception):
+    """Señal interna para cortar la lectura por cancelación del usuario."""
+    pass
+
+
+@dataclass
+class ExcelTable:
+    """Hoja convertida: columnas (en orden) → arreglo 1D de igual longitud."""
+    path: str
+    sheet: str
+    columns: list[str]
+    data: dict[str, np.ndarray]
+    header_row: int = 1
+    from_cache: bool = False
+    meta: dict = field(default_factory=dict)
+
+    @property
+    def n_rows(self) -> int:
+        return len(next(iter(self.data.values()))) if self.data else 0
+
+    def dtypes(self) -> dict[str, str]:
+        return {c: dtype_label(self.data[c]) for c in self.columns}
+
+
+def dtype_label(arr: np.ndarray) -> str:
+    if arr.dtype.kind == "M":
+        return "fecha"
+    if arr.dtype.kind == "O":
+        return "texto"
+    return str(arr.dtype)
+
+
+# ---------------- motores ----------------
+def _calamine():
+    try:
+        import python_calamine  # type: ignore
+    except ImportError:
+        return None
+    return python_calamine
+
+
+def _require_openpyxl():
+    try:
+        import openpyxl  # type: ignore
+    except ImportError as e:
+        raise RuntimeError("Para leer Excel instala 'python-calamine' u 'openpyxl' "
+                           "(pip install python-calamine).") from e
+    return openpyxl
+
+
+def _check_engine(path: str):
+    if os.path.splitext(path)[1].lower() == ".xls" and _calamine() is None:
+        raise RuntimeError("Los archivos .xls (Excel 97-2003) requieren 'python-calamine' "
+                           "(pip install python-calamine).")
+
+
+def list_sheets(path: str) -> list[str]:
+    """Nombres de hoja. En .xlsx/.xlsm se leen del índice del zip (no carga celdas ni textos)."""
+    _check_engine(path)
+    if zipfile.is_zipfile(path):
+        try:
+            with zipfile.ZipFile(path) as zf:
+                xml = zf.read("xl/workbook.xml").decode("utf-8", errors="replace")
+            names = re.findall(r"<(?:\w+:)?sheet\b[^>]*?\bname=\"([^\"]*)\"", xml)
+            if names:
+                return [_xml_unescape(n) for n in names]
+        except (KeyError, zipfile.BadZipFile):
+            pass
+    pc = _calamine()
+    if pc is not None:
+        wb = pc.CalamineWorkbook.from_path(path)
+        try:
+            return list(wb.sheet_names)
+        finally:
+            wb.close()
+    wb = _require_openpyxl().load_workbook(path, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def _xml_unescape(s: str) -> str:
+    return (s.replace("&lt;", "<").replace("&gt;", ">").replace("&quot;", '"')
+             .replace("&apos;", "'").replace("&amp;", "&"))
+
+
+class _RowSource:
+    """
+    Filas de una hoja alineadas a la fila 1 / columna A (ambos motores), como secuencias de valores.
+    total: nº de filas estimado (para la barra de progreso; 0 si no se conoce).
+    """
+    def __init__(self, path: str, sheet: str):
+        _check_engine(path)
+        self._close = None
+        pc = _calamine()
+        if pc is not None:
+            wb = pc.CalamineWorkbook.from_path(path)
+            ws = wb.get_sheet_by_name(sheet)
+            (r0, c0) = ws.start or (0, 0)
+            self.total = r0 + ws.height
+            self.rows = self._calamine_rows(ws.iter_rows(), r0, c0)
+            self._close = wb.close
+        else:
+            wb = _require_openpyxl().load_workbook(path, read_only=True, data_only=True)
+            ws = wb[sheet]
+            self.total = ws.max_row or 0
+            self.rows = ws.iter_rows(values_only=True)
+            self._close = wb.close
+
+    @staticmethod
+    def _calamine_rows(rows, r0: int, c0: int):
+        # calamine arranca en la primera celda usada: se rellena hasta A1
+        for _ in range(r0):
+            yield ()
+        pad = (None,) * c0
+        for row in rows:
+            yield pad + tuple(row) if c0 else row
+
+    def close(self):
+        if self._close:
+            self._close()
+            self._close = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------- encabezados ----------------
+def _header_names(values) -> list[str]:
+    """Texto del encabezado; vacíos → 'Columna N', duplicados → 'nombre.1', 'nombre.2' (como pandas)."""
+    out, seen = [], {}
+    for j, v in enumerate(values):
+        name = str(v).strip() if v not in (None, "") else f"Columna {j + 1}"
+        k = seen.get(name, 0)
+        seen[name] = k + 1
+        out.append(name if k == 0 else f"{name}.{k}")
+    return out
+
+
+def read_header(path: str, sheet: str, header_row: int = 1) -> list[str]:
+    """Nombres de columna de la fila `header_row` (1 = primera). Usa la caché de encabezados."""
+    key = _file_key(path, sheet, header_row)
+    index = _load_header_index()
+    if key in index:
+        return list(index[key])
+    with _RowSource(path, sheet) as src:
+        header = ()
+        for i, row in enumerate(src.rows, start=1):
+            if i == header_row:
+                header = row
+                break
+    while header and header[-1] in (None, ""):
+        header = header[:-1]
+    names = _header_names(header)
+    index[key] = names
+    _save_header_index(index)
+    return names
+
+
+# ---------------- inferencia de tipos ----------------
+_NULLS = (None, "")
+
+
+def infer_column(values: list) -> np.ndarray:
+    """
+    Lista de celdas → ndarray con el tipo más estrecho que admite todos los valores no vacíos:
+    bool (sin vacíos) → int64 (sin vacíos) → float64 (vacío = NaN) → datetime64[s] (vacío = NaT)
+    → texto (object, vacío = ""). Números guardados como texto ("12,5") cuentan como números.
+    """
+    kinds = {type(v) for v in values}
+    has_null = bool(kinds & {type(None)}) or ("" in values if str in kinds else False)
+    kinds.discard(type(None))
+    if not kinds:
+        return np.full(len(values), np.nan)
+    if kinds == {bool} and not has_null:
+        return np.array(values, dtype=bool)
+    if kinds <= {int, float, bool} or (kinds <= {int, float, bool, str} and _all_numeric_text(values)):
+        if kinds <= {int, bool} and not has_null:
+            return np.array(values, dtype=np.int64)
+        if str not in kinds:
+            arr = np.array(values, dtype=float)   # None → NaN en la conversión de NumPy
+            # calamine entrega todo número como float: enteros sin vacíos → int64 (igual que openpyxl)
+            if not has_null and np.all(np.abs(arr) < 2 ** 53) and np.array_equal(arr, np.trunc(arr)):
+                return arr.astype(np.int64)
+            return arr
+        return np.array([_to_float(v) for v in values], dtype=float)
+    if kinds <= {dt.datetime, dt.date, str} and (str not in kinds or _only_blank_text(values)):
+        return np.array([np.datetime64("NaT") if v in _NULLS else np.datetime64(v, "s") for v in values],
+                        dtype="datetime64[s]")
+    return np.array(["" if v is None else str(v) for v in values], dtype=object)
+
+
+def _to_float(v) -> float:
+    if v in _NULLS:
+        return np.nan
+    if isinstance(v, str):
+        return float(v.strip().replace(",", "."))
+    return float(v)
+
+
+def _all_numeric_text(values) -> bool:
+    for v in values:
+        if isinstance(v, str) and v != "":
+            try:
+                float(v.strip().replace(",", "."))
+            except ValueError:
+                return False
+    return True
+
+
+def _only_blank_text(values) -> bool:
+    return all(v == "" for v in values if isinstance(v, str))
+
+
+# ---------------- lectura ----------------
+@traced(cat="excel")
+def read_sheet(path: str, sheet: str, header_row: int = 1, columns: list[int] | None = None,
+               progress_cb=None, cancel_cb=None) -> ExcelTable:
+    """
+    Lee la hoja en streaming guardando solo las columnas `columns` (índices 0-based sobre el
+    encabezado; None = todas). Las filas completamente vacías del final se descartan.
+    - progress_cb(done:int, total:int) ; cancel_cb() -> bool (mismo contrato que parse_xseci)
+    """
+    names = read_header(path, sheet, header_row)
+    idx = list(range(len(names))) if columns is None else [j for j in columns if 0 <= j < len(names)]
+    if not idx:
+        raise ValueError("No hay columnas seleccionadas.")
+    cols: list[list] = [[] for _ in idx]
+    appends = [c.append for c in cols]
+    pairs = list(zip(idx, appends))
+    last_data = 0   # nº de filas hasta la última con algún dato (recorta el relleno final)
+    n = 0
+    with _RowSource(path, sheet) as src:
+        total = max(src.total - header_row, 0)
+        for i, row in enumerate(src.rows, start=1):
+            if i <= header_row:
+                continue
+            width = len(row)
+            any_value = False
+            for j, append in pairs:
+                v = row[j] if j < width else None
+                append(v)
+                if v is not None and v != "":
+                    any_value = True
+            n += 1
+            if any_value:
+                last_data = n
+            if n % PROGRESS_EVERY == 0:
+                if progress_cb:
+                    progress_cb(n, max(total, n))
+                if cancel_cb and cancel_cb():
+                    raise ExcelLoadCancelled()
+    data = {}
+    for j, values in zip(idx, cols):
+        del values[last_data:]
+        data[names[j]] = infer_column(values)
+        if cancel_cb and cancel_cb():
+            raise ExcelLoadCancelled()
+    if progress_cb:
+        progress_cb(last_data, last_data)
+    return ExcelTable(path=path, sheet=sheet, columns=[names[j] for j in idx], data=data,
+                      header_row=header_row)
+
+
+@traced(cat="excel")
+def load_table(path: str, sheet: str, header_row: int = 1, columns: list[int] | None = None,
+               use_cache: bool = True, progress_cb=None, cancel_cb=None) -> ExcelTable:
+    """read_sheet con caché: si el libro no cambió (tamaño + fecha) se carga el .npz convertido."""
+    cache_path = _cache_path(path, sheet, header_row, columns) if use_cache else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            table = _load_npz(cache_path, path, sheet, header_row)
+            print(f"[EXCEL] Caché: {cache_path}")
+            return table
+        except Exception as e:   # caché corrupta/antigua → se vuelve a leer el Excel
+            print(f"[EXCEL] Caché inválida ({e}); se relee el libro")
+    table = read_sheet(path, sheet, header_row, columns, progress_cb, cancel_cb)
+    if cache_path:
+        try:
+            _save_npz(cache_path, table)
+        except OSError as e:
+            print(f"[EXCEL] No se pudo escribir la caché: {e}")
+    return table
+
+
+# ---------------- caché ----------------
+def default_cache_dir() -> str:
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "MyFriendTGI", "excel")
+
+
+def _file_key(path: str, *parts) -> str:
+    st = os.stat(path)
+    raw = json.dumps([os.path.abspath(path), st.st_size, st.st_mtime_ns, CACHE_VERSION, *parts])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _cache_path(path: str, sheet: str, header_row: int, columns) -> str:
+    cols = None if columns is None else sorted(set(columns))
+    return os.path.join(default_cache_dir(), _file_key(path, sheet, header_row, cols) + ".npz")
+
+
+def _header_index_path() -> str:
+    return os.path.join(default_cache_dir(), "headers.json")
+
+
+def _load_header_index() -> dict:
+    try:
+        with open(_header_index_path(), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_header_index(index: dict, max_entries: int = 256):
+    for old in list(index)[:-max_entries]:   # los más antiguos primero (orden de inserción)
+        del index[old]
+    try:
+        os.makedirs(default_cache_dir(), exist_ok=True)
+        tmp = _header_index_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(index, fh, ensure_ascii=False)
+        os.replace(tmp, _header_index_path())
+    except OSError:
+        pass
+
+
+def _save_npz(cache_path: str, table: ExcelTable):
+    """
+    Columnas numéricas/fecha tal cual; texto como categórico (códigos int32 + valores únicos en
+    Unicode fijo) para no depender de pickle. Escritura atómica (tmp + replace).
+    """
+    arrays = {}
+    for k, c in enumerate(table.columns):
+        arr = table.data[c]
+        if arr.dtype == object:
+            uniques, codes = np.unique(arr.astype(str), return_inverse=True)
+            arrays[f"c{k}"] = codes.astype(np.int32)
+            arrays[f"u{k}"] = uniques
+        else:
+            arrays[f"c{k}"] = arr
+    meta = {"columns": table.columns, "text": [table.data[c].dtype == object for c in table.columns]}
+    arrays["__meta__"] = np.array(json.dumps(meta, ensure_ascii=False))
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp = cache_path + ".tmp"
+    with open(tmp, "wb") as fh:
+        np.savez(fh, **arrays)
+    os.replace(tmp, cache_path)
+
+
+def _load_npz(cache_path: str, path: str, sheet: str, header_row: int) -> ExcelTable:
+    with np.load(cache_path, allow_pickle=False) as z:
+        meta = json.loads(str(z["__meta__"]))
+        data = {}
+        for k, (c, is_text) in enumerate(zip(meta["columns"], meta["text"])):
+            if is_text:
+                data[c] = z[f"u{k}"].astype(object)[z[f"c{k}"]]
+            else:
+                data[c] = z[f"c{k}"]
+    return ExcelTable(path=path, sheet=sheet, columns=list(meta["columns"]), data=data,
+                      header_row=header_row, from_cache=True)
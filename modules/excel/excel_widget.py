@@ -1,11 +1,69 @@
 """Módulo que contiene la interfaz de usuario para el procesamiento de archivos Excel."""
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog, QMessageBox # type: ignore
+import os
+import time
+
+import numpy as np
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog, # type: ignore
+                             QMessageBox, QComboBox, QSpinBox, QListWidget, QListWidgetItem, QSplitter,
+                             QTableView, QHeaderView, QProgressDialog, QCheckBox, QApplication)
+from PyQt6.QtCore import Qt, QObject, QThread, QSettings, pyqtSignal # type: ignore
+
+from modules.flow2d.flow2d_models import ColumnsTableModel, format_cell
+from utils.memory import MemoryUsage, measure, register_source
+from .excel_reader import ExcelLoadCancelled, list_sheets, load_table, read_header
+
+
+def _format_datetime(val) -> str:
+    """Fechas datetime64 → 'AAAA-MM-DD hh:mm:ss' (NaT → vacío)."""
+    if val is None or np.isnat(val):
+        return ""
+    return np.datetime_as_string(val, unit="s").replace("T", " ")
+
+
+class ExcelLoadWorker(QObject):
+    """Lee la hoja en un QThread (la GUI no se congela con libros grandes)."""
+    progress = pyqtSignal(int, int)   # filas leídas, total estimado
+    finished = pyqtSignal(object)     # ExcelTable
+    failed   = pyqtSignal(str)
+    cancelled= pyqtSignal()
+
+    def __init__(self, path: str, sheet: str, header_row: int, columns, use_cache: bool):
+        super().__init__()
+        self._args = (path, sheet, header_row, columns, use_cache)
+        self._cancel = False
+
+    def request_cancel(self):
+        self._cancel = True
+
+    def run(self):
+        path, sheet, header_row, columns, use_cache = self._args
+        try:
+            table = load_table(path, sheet, header_row, columns, use_cache=use_cache,
+                               progress_cb=self.progress.emit, cancel_cb=lambda: self._cancel)
+            if self._cancel:
+                self.cancelled.emit()
+            else:
+                self.finished.emit(table)
+        except ExcelLoadCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+
 
 class ExcelWidget(QWidget):
     """Interfaz gráfica para el módulo Excel de My Friend TGI."""
     def __init__(self):
         super().__init__()
+        self.file_path: str | None = None
+        self.table = None          # ExcelTable cargada
+        self._thr: QThread | None = None
+        self._wk: ExcelLoadWorker | None = None
+        self._t0 = 0.0
         self.init_ui()
+        register_source("Excel", self._memory_usage)
+
+    def _memory_usage(self) -> MemoryUsage | None:
+        return None if self.table is None else measure(self.table)
 
     def init_ui(self):
         """Interfaz gráfica para el módulo Excel de My Friend TGI."""
@@ -14,17 +72,185 @@ class ExcelWidget(QWidget):
         self.label = QLabel("Módulo de procesamiento Excel")
         layout.addWidget(self.label)
 
+        top = QHBoxLayout()
         self.load_button = QPushButton("Cargar archivo Excel")
         self.load_button.clicked.connect(self.cargar_excel)
-        layout.addWidget(self.load_button)
+        top.addWidget(self.load_button)
+        top.addWidget(QLabel("Hoja:"))
+        self.cbo_sheet = QComboBox()
+        self.cbo_sheet.setMinimumWidth(180)
+        self.cbo_sheet.currentTextChanged.connect(self._refresh_columns)
+        top.addWidget(self.cbo_sheet)
+        self.spin_header = QSpinBox()
+        self.spin_header.setRange(1, 1000)
+        self.spin_header.setPrefix("Encabezado fila ")
+        self.spin_header.valueChanged.connect(self._refresh_columns)
+        top.addWidget(self.spin_header)
+        self.chk_cache = QCheckBox("Usar caché")
+        self.chk_cache.setChecked(True)
+        self.chk_cache.setToolTip("Reutiliza la conversión guardada si el libro no cambió")
+        top.addWidget(self.chk_cache)
+        self.read_button = QPushButton("Leer datos")
+        self.read_button.setEnabled(False)
+        self.read_button.clicked.connect(self.leer_datos)
+        top.addWidget(self.read_button)
+        top.addStretch(1)
+        layout.addLayout(top)
+
+        # Columnas (checks) | vista previa virtualizada
+        split = QSplitter(Qt.Orientation.Horizontal)
+        left = QWidget()
+        lv = QVBoxLayout(left)
+        lv.setContentsMargins(0, 0, 0, 0)
+        lv.addWidget(QLabel("Columnas:"))
+        self.lst_cols = QListWidget()
+        lv.addWidget(self.lst_cols)
+        hb = QHBoxLayout()
+        btn_all = QPushButton("Todas")
+        btn_all.clicked.connect(lambda: self._check_all(True))
+        btn_none = QPushButton("Ninguna")
+        btn_none.clicked.connect(lambda: self._check_all(False))
+        hb.addWidget(btn_all)
+        hb.addWidget(btn_none)
+        lv.addLayout(hb)
+        split.addWidget(left)
+
+        self.model = ColumnsTableModel()
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        vh = self.view.verticalHeader()
+        vh.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)   # no mide cada fila
+        vh.setDefaultSectionSize(22)
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.view.setAlternatingRowColors(True)
+        split.addWidget(self.view)
+        split.setStretchFactor(1, 4)
+        layout.addWidget(split, 1)
+
+        self.lbl_info = QLabel("")
+        layout.addWidget(self.lbl_info)
 
         self.setLayout(layout)
 
     def cargar_excel(self):
         """Funcion para cargar la data y ruta de un archivo excel"""
-        file_path, _ = QFileDialog.getOpenFileName(self, "Seleccionar archivo Excel", "", "Excel Files (*.xlsx *.xls)") # pylint: disable=line-too-long
-        if file_path:
-            # Aquí iría tu lógica de procesamiento real
-            QMessageBox.information(self, "Archivo cargado", f"Se ha cargado:\n{file_path}")
-        else:
+        s = QSettings("MyFriendTGI", "Excel")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Seleccionar archivo Excel", s.value("last_dir", ""), "Excel Files (*.xlsx *.xlsm *.xls)") # pylint: disable=line-too-long
+        if not file_path:
             QMessageBox.warning(self, "Sin selección", "No se seleccionó ningún archivo.")
+            return
+        s.setValue("last_dir", os.path.dirname(file_path))
+        try:
+            sheets = list_sheets(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo abrir:\n{e}")
+            return
+        print(f"[EXCEL] Abrir: {file_path} ({len(sheets)} hojas)")
+        self.file_path = file_path
+        self.label.setText(os.path.basename(file_path))
+        self.cbo_sheet.blockSignals(True)
+        self.cbo_sheet.clear()
+        self.cbo_sheet.addItems(sheets)
+        self.cbo_sheet.blockSignals(False)
+        self._refresh_columns()
+
+    def _refresh_columns(self, *_):
+        """Relee los nombres de columna de la hoja/fila de encabezado elegidas."""
+        self.lst_cols.clear()
+        self.read_button.setEnabled(False)
+        sheet = self.cbo_sheet.currentText()
+        if not (self.file_path and sheet):
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            names = read_header(self.file_path, sheet, self.spin_header.value())
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo leer el encabezado:\n{e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        for name in names:
+            it = QListWidgetItem(name)
+            it.setFlags(it.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            it.setCheckState(Qt.CheckState.Checked)
+            self.lst_cols.addItem(it)
+        self.read_button.setEnabled(bool(names))
+
+    def _check_all(self, on: bool):
+        state = Qt.CheckState.Checked if on else Qt.CheckState.Unchecked
+        for i in range(self.lst_cols.count()):
+            self.lst_cols.item(i).setCheckState(state)
+
+    def _selected_columns(self) -> list[int]:
+        return [i for i in range(self.lst_cols.count())
+                if self.lst_cols.item(i).checkState() == Qt.CheckState.Checked]
+
+    # ---- lectura en segundo plano ----
+    def leer_datos(self):
+        """Lee la hoja elegida (solo columnas marcadas) en un hilo, con progreso cancelable."""
+        cols = self._selected_columns()
+        if not cols:
+            QMessageBox.information(self, "Excel", "Marca al menos una columna.")
+            return
+        if self._thr is not None:
+            return   # ya hay una lectura en curso
+        all_cols = None if len(cols) == self.lst_cols.count() else cols
+        sheet = self.cbo_sheet.currentText()
+
+        self._prog = QProgressDialog(f"Leyendo {sheet}…", "Cancelar", 0, 0, self)
+        self._prog.setWindowTitle("Cargando Excel")
+        self._prog.setWindowModality(Qt.WindowModality.WindowModal)
+        self._prog.setAutoClose(False)
+        self._prog.setAutoReset(False)
+        self._prog.setMinimumDuration(300)  # ms
+
+        self._thr = QThread(self)
+        self._wk = ExcelLoadWorker(self.file_path, sheet, self.spin_header.value(), all_cols,
+                                   self.chk_cache.isChecked())
+        self._wk.moveToThread(self._thr)
+        self._thr.started.connect(self._wk.run)
+        self._wk.progress.connect(self._on_progress)
+        self._wk.finished.connect(self._on_finished)
+        self._wk.failed.connect(self._on_failed)
+        self._wk.cancelled.connect(self._on_cancelled)
+        self._prog.canceled.connect(self._wk.request_cancel)
+        self._t0 = time.perf_counter()
+        self._thr.start()
+
+    def _on_progress(self, done: int, total: int):
+        if total <= 0:
+            self._prog.setRange(0, 0)
+        else:
+            self._prog.setRange(0, total)
+            self._prog.setValue(done)
+
+    def _cleanup_worker(self):
+        self._prog.close()
+        if self._thr is not None:
+            self._thr.quit()
+            self._thr.wait(1500)
+        self._thr = None
+        self._wk = None
+
+    def _on_finished(self, table):
+        self._cleanup_worker()
+        self.table = table
+        formats = [_format_datetime if table.data[c].dtype.kind == "M" else format_cell for c in table.columns]
+        self.model.set_columns(table.columns, [table.data[c] for c in table.columns], formats)
+        dtypes = table.dtypes()
+        self.view.horizontalHeader().setToolTip(", ".join(f"{c}: {dtypes[c]}" for c in table.columns))
+        origen = "caché" if table.from_cache else "libro"
+        self.lbl_info.setText(
+            f"{table.sheet}: {table.n_rows:,} filas × {len(table.columns)} columnas "
+            f"({origen}, {time.perf_counter() - self._t0:.2f} s)  —  "
+            + ", ".join(f"{c} [{dtypes[c]}]" for c in table.columns)
+        )
+        print(f"[EXCEL] {table.sheet}: {table.n_rows} filas, {len(table.columns)} columnas ({origen})")
+
+    def _on_failed(self, msg: str):
+        self._cleanup_worker()
+        QMessageBox.critical(self, "Error", f"No se pudo leer la hoja:\n{msg}")
+
+    def _on_cancelled(self):
+        self._cleanup_worker()
+        self.lbl_info.setText("Lectura cancelada.")
@@ -0,0 +1,148 @@
+# modules/flow2d/flow2d_batch.py
+"""
+Exportación masiva de perfiles XSECI a imágenes con un pool de procesos.
+Cada proceso tiene su propio lienzo Agg off-screen (nada de Qt aquí: se importa en los workers).
+"""
+from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import os
+
+from .flow2d_profile import (OffscreenProfileCanvas, ProfileArtists, RenderCancelled,
+                             extract_profile)
+
+CHUNK_SIZE = 16          # imágenes por tarea (amortiza el coste de IPC)
+INFLIGHT_PER_WORKER = 3  # tareas encoladas por proceso (memoria acotada)
+
+
+def plan_unique_paths(out_dir: str, names: list[str]) -> list[str]:
+    """
+    Rutas libres de colisión calculadas de antemano:
+    un solo listado del directorio + conjunto en memoria (sin sondear el disco en bucle).
+    Mismo esquema que antes: nombre, nombre_1, nombre_2, ...
+    """
+    try:
+        taken = {n.lower() for n in os.listdir(out_dir)}
+    except FileNotFoundError:
+        taken = set()
+    next_suffix: dict[str, int] = {}
+    out = []
+    for name in names:
+        base, ext = os.path.splitext(name)
+        cand = name
+        i = next_suffix.get(name.lower(), 1)
+        while cand.lower() in taken:
+            cand = f"{base}_{i}{ext}"
+            i += 1
+        next_suffix[name.lower()] = i
+        taken.add(cand.lower())
+        out.append(os.path.join(out_dir, cand))
+    return out
+
+
+# ---------------- lado worker (proceso hijo) ----------------
+_canvas: OffscreenProfileCanvas | None = None
+_artists: ProfileArtists | None = None
+
+
+def _init_worker(figsize: tuple[float, float] | None = None):
+    global _canvas, _artists
+    _canvas = OffscreenProfileCanvas(figsize=figsize) if figsize else OffscreenProfileCanvas()
+    _artists = ProfileArtists(_canvas, blit=False)
+
+
+def _render_chunk(jobs: list[tuple], dpi: int, aspect_mode: str,
+                  figsize: tuple[float, float] | None = None) -> tuple[int, list[str]]:
+    """jobs = [(title, ProfileData, out_path)]. Devuelve (hechas, errores)."""
+    if _canvas is None:
+        _init_worker(figsize)
+    fig = _canvas.fig
+    done, errors = 0, []
+    for title, data, out_path in jobs:
+        try:
+            _artists.render(data, title, aspect_mode, full=True)
+            fig.savefig(
+                out_path,
+                dpi=dpi,
+                bbox_inches="tight",
+                facecolor=fig.get_facecolor(),
+                edgecolor=fig.get_edgecolor(),
+                metadata={
+                    "Title": title,
+                    "Creator": "My Friend TGI",
+                    "Subject": "Perfil XSECI",
+                },
+            )
+            done += 1
+        except Exception as e:
+            errors.append(f"{os.path.basename(out_path)}: {e}")
+    return done, errors
+
+
+# ---------------- lado orquestador ----------------
+def export_profile_batch(jobs: list[tuple], dpi: int = 180, aspect_mode: str = "pretty",
+                         max_workers: int | None = None, figsize: tuple[float, float] | None = None,
+                         progress_cb=None, cancel_cb=None) -> tuple[int, list[str]]:
+    """
+    jobs = [(title, df, out_path)] (rutas ya únicas, ver plan_unique_paths).
+    figsize: pulgadas de la figura (la del lienzo visible → mismo tamaño/aspecto que "Guardar imagen";
+    None = tamaño por defecto de OffscreenProfileCanvas). dpi: resolución de savefig.
+    Renderiza en paralelo (un proceso por núcleo) y reporta progress_cb(done, total).
+    cancel_cb() -> bool: cancela lo pendiente y lanza RenderCancelled.
+    Devuelve (imágenes escritas, errores por archivo).
+    """
+    total = len(jobs)
+    if total == 0:
+        return 0, []
+    workers = max_workers or os.cpu_count() or 1
+    workers = max(1, min(workers, (total + CHUNK_SIZE - 1) // CHUNK_SIZE))
+
+    done, errors = 0, []
+    skipped = 0
+
+    def _chunks():
+        nonlocal skipped
+        chunk = []
+        for title, df, out_path in jobs:
+            data = extract_profile(df) if df is not None and not df.empty else None
+            if data is None:
+                skipped += 1
+                errors.append(f"{os.path.basename(out_path)}: sin datos STATION/BEDEL")
+                continue
+            chunk.append((title, data, out_path))
+            if len(chunk) >= CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    pending = set()
+    source = _chunks()
+    exhausted = False
+    figsize = tuple(map(float, figsize)) if figsize is not None else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(figsize,)) as pool:
+        try:
+            while True:
+                # Mantener la cola llena pero acotada (no serializa los 10.000 trabajos de golpe)
+                while not exhausted and len(pending) < workers * INFLIGHT_PER_WORKER:
+                    chunk = next(source, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    pending.add(pool.submit(_render_chunk, chunk, dpi, aspect_mode, figsize))
+                if not pending:
+                    break
+                finished, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    n, errs = fut.result()
+                    done += n
+                    errors.extend(errs)
+                if progress_cb:
+                    progress_cb(done + skipped, total)
+                if cancel_cb and cancel_cb():
+                    raise RenderCancelled()
+        except BaseException:
+            for fut in pending:
+                fut.cancel()
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    return done, errors
@@ -0,0 +1,265 @@
+# modules/flow2d/flow2d_compare.py
+"""
+Comparación de escenarios XSECI (p.ej. "existente" = A vs "proyectado" = B); diferencias B − A.
+- Alineación por (tiempo, sección, estación): unión de tiempos (por segundos) y de secciones; lo
+  que está en una sola corrida queda con NaN del otro lado (y se marca en el ranking).
+- Estaciones: clave entera redondeada a STATION_DECIMALS + nº de ocurrencia (estaciones repetidas
+  en muros verticales se emparejan en orden), unión externa con lexsort (sin bucles por fila).
+- Por cada (tiempo, sección): máximo |Δ| de WSEL, DEPTH y VEL_NORM (matrices T×S) + ΔQ (T×S).
+Sin Qt: la interfaz está en flow2d_widget.py (XSECITab / XSECHidrogramaTab).
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+import os
+
+import numpy as np
+
+from .flow2d_parsers import ParseResult
+from .flow2d_xseci import float_matrix, time_label_to_seconds
+from utils.tracing import traced
+
+DIFF_VARS = ("WSEL", "DEPTH", "VEL_NORM")
+STATION_DECIMALS = 3
+_COLS = ["STATION", "BEDEL", *DIFF_VARS]
+
+
+class CompareCancelled(Exception):
+    """Señal interna para cortar la comparación por cancelación del usuario."""
+    pass
+
+
+# ---------------- alineación ----------------
+def station_keys(sec_idx: np.ndarray, station: np.ndarray) -> np.ndarray:
+    """
+    Claves (n, 3) int64 = (sección, estación redondeada, ocurrencia). Estación NaN → cada fila es única
+    (no se empareja con nada).
+    """
+    sec_idx = np.asarray(sec_idx, dtype=np.int64)
+    n = len(sec_idx)
+    st = np.asarray(station, dtype=float)
+    finite = np.isfinite(st)
+    q = np.empty(n, dtype=np.int64)
+    q[finite] = np.round(st[finite] * 10 ** STATION_DECIMALS).astype(np.int64)
+    q[~finite] = np.iinfo(np.int64).min
+    order = np.lexsort((q, sec_idx))
+    sk, qk = sec_idx[order], q[order]
+    new = np.ones(n, dtype=bool)
+    if n > 1:
+        new[1:] = (sk[1:] != sk[:-1]) | (qk[1:] != qk[:-1])
+    start = np.maximum.accumulate(np.where(new, np.arange(n), 0))
+    occ = np.empty(n, dtype=np.int64)
+    occ[order] = np.arange(n) - start
+    occ[~finite] = -1 - np.arange(int((~finite).sum()))   # sin estación: claves únicas
+    return np.stack([sec_idx, q, occ], axis=1)
+
+
+def align_outer(ka: np.ndarray, kb: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Unión externa de dos conjuntos de claves (n, 3) → (ia, ib, claves) ordenado por clave;
+    ia/ib = fila de A/B o −1 si falta en esa corrida.
+    """
+    na = len(ka)
+    k = np.concatenate([ka, kb]) if na or len(kb) else np.empty((0, 3), dtype=np.int64)
+    if len(k) == 0:
+        e = np.empty(0, dtype=np.int64)
+        return e, e, k
+    order = np.lexsort((k[:, 2], k[:, 1], k[:, 0]))
+    ks = k[order]
+    new = np.ones(len(ks), dtype=bool)
+    new[1:] = np.any(ks[1:] != ks[:-1], axis=1)
+    gid = np.cumsum(new) - 1
+    G = int(gid[-1]) + 1
+    ia = np.full(G, -1, dtype=np.int64)
+    ib = np.full(G, -1, dtype=np.int64)
+    from_a = order < na
+    ia[gid[from_a]] = order[from_a]
+    ib[gid[~from_a]] = order[~from_a] - na
+    return ia, ib, ks[new]
+
+
+def _take(values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """values[idx] con −1 → NaN (filas que faltan en esa corrida)."""
+    out = np.full((len(idx),) + values.shape[1:], np.nan)
+    ok = idx >= 0
+    out[ok] = values[idx[ok]]
+    return out
+
+
+def _gather(result: ParseResult, t_label: str | None, col_of: dict) -> tuple[np.ndarray, np.ndarray]:
+    """Todas las secciones de un tiempo → (índice de sección por fila, matriz n×len(_COLS))."""
+    if t_label is None:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(_COLS)))
+    idx, mats = [], []
+    for sid, sec in (result.data.get(t_label) or {}).items():
+        df = sec.get("df")
+        j = col_of.get(sid)
+        if j is None or df is None or df.empty:
+            continue
+        m = float_matrix(df, _COLS)
+        mats.append(m)
+        idx.append(np.full(len(m), j, dtype=np.int64))
+    if not mats:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(_COLS)))
+    return np.concatenate(idx), np.concatenate(mats)
+
+
+# ---------------- resultado ----------------
+@dataclass
+class ProfileDiff:
+    """Perfil alineado de una (tiempo, sección): columnas de A, de B y Δ = B − A por estación."""
+    station: np.ndarray            # (n,)
+    bed_a: np.ndarray
+    bed_b: np.ndarray
+    a: dict[str, np.ndarray]       # var → (n,)
+    b: dict[str, np.ndarray]
+    d: dict[str, np.ndarray]
+
+
+@dataclass
+class RunComparison:
+    label_a: str
+    label_b: str
+    result_a: ParseResult
+    result_b: ParseResult
+    times: list[str]               # unión, ordenada por tiempo
+    time_seconds: np.ndarray       # (T,)
+    sections: list[str]            # unión ordenada
+    in_a: np.ndarray               # (S,) bool: la sección existe en A
+    in_b: np.ndarray
+    Q_a: np.ndarray                # (T, S)
+    Q_b: np.ndarray
+    max_abs: dict[str, np.ndarray]  # var → (T, S) float32: máx |Δ| sobre estaciones (NaN = sin pareja)
+
+    @property
+    def dQ(self) -> np.ndarray:
+        return self.Q_b - self.Q_a
+
+    @property
+    def time_hours(self) -> np.ndarray:
+        return self.time_seconds / 3600.0
+
+    def reindex(self, M: np.ndarray, times: list[str], sections: list[str]) -> np.ndarray:
+        """Matriz (T, S) de la comparación llevada a otra grilla de etiquetas (faltantes → NaN)."""
+        t_of = {t: i for i, t in enumerate(self.times)}
+        s_of = {s: j for j, s in enumerate(self.sections)}
+        ti = np.array([t_of.get(t, -1) for t in times], dtype=np.int64)
+        sj = np.array([s_of.get(s, -1) for s in sections], dtype=np.int64)
+        out = np.full((len(ti), len(sj)), np.nan)
+        rows, cols = ti >= 0, sj >= 0
+        out[np.ix_(rows, cols)] = M[np.ix_(ti[rows], sj[cols])]
+        return out
+
+    def ranking(self, var: str = "WSEL") -> tuple[list[str], list[np.ndarray]]:
+        """
+        Secciones ordenadas por el mayor cambio de `var` (WSEL/DEPTH/VEL_NORM/Q) en todo el evento.
+        Secciones sin pareja (solo A / solo B) quedan al final.
+        """
+        th = self.time_hours
+        metrics = {}
+        for v in (*DIFF_VARS, "Q"):
+            M = np.abs(self.dQ) if v == "Q" else self.max_abs[v]
+            finite = np.isfinite(M)
+            has = finite.any(axis=0)
+            Mz = np.where(finite, M, -np.inf)
+            it = Mz.argmax(axis=0)
+            metrics[v] = (np.where(has, Mz[it, np.arange(M.shape[1])], np.nan), np.where(has, th[it], np.nan))
+        key = metrics[var][0]
+        order = np.argsort(np.where(np.isfinite(key), -key, np.inf), kind="stable")
+        where = np.where(self.in_a & self.in_b, "A y B", np.where(self.in_a, "solo A", "solo B"))
+        headers = ["Sección", "Corrida", f"t máx Δ{var} (h)",
+                   "|ΔWSEL| máx", "|ΔDEPTH| máx", "|ΔVEL_NORM| máx", "|ΔQ| máx"]
+        cols = [np.array(self.sections, dtype=object)[order], where.astype(object)[order],
+                metrics[var][1][order], *(metrics[v][0][order] for v in (*DIFF_VARS, "Q"))]
+        return headers, cols
+
+    def profile_diff(self, t_label: str, sec_id: str) -> ProfileDiff | None:
+        """Perfil alineado por estación de una sección en un tiempo (None si no está en ninguna corrida)."""
+        blocks = []
+        for res in (self.result_a, self.result_b):
+            sec = (res.data.get(t_label) or {}).get(sec_id)
+            df = sec.get("df") if sec else None
+            blocks.append(np.empty((0, len(_COLS))) if df is None or df.empty else float_matrix(df, _COLS))
+        ma, mb = blocks
+        if not len(ma) and not len(mb):
+            return None
+        ia, ib, _k = align_outer(station_keys(np.zeros(len(ma)), ma[:, 0]),
+                                 station_keys(np.zeros(len(mb)), mb[:, 0]))
+        A, B = _take(ma, ia), _take(mb, ib)
+        station = np.where(np.isfinite(A[:, 0]), A[:, 0], B[:, 0])
+        a = {v: A[:, 2 + i] for i, v in enumerate(DIFF_VARS)}
+        b = {v: B[:, 2 + i] for i, v in enumerate(DIFF_VARS)}
+        return ProfileDiff(station, A[:, 1], B[:, 1], a, b, {v: b[v] - a[v] for v in DIFF_VARS})
+
+
+# ---------------- cálculo ----------------
+def _time_seconds(result: ParseResult) -> dict[str, int]:
+    times = result.meta.get("times") or list(result.data.keys())
+    ts = result.time_seconds
+    if ts is not None and len(ts) == len(times):
+        return dict(zip(times, ts.tolist()))
+    return {t: s for t in times if (s := time_label_to_seconds(t)) is not None}
+
+
+def _q_matrix(result: ParseResult, times: list[str | None], col_of: dict, S: int) -> np.ndarray:
+    Q = np.full((len(times), S), np.nan)
+    for i, t in enumerate(times):
+        if t is None:
+            continue
+        for sid, sec in (result.data.get(t) or {}).items():
+            j = col_of.get(sid)
+            q = sec.get("Q")
+            if j is not None and q is not None:
+                Q[i, j] = float(q)
+    return Q
+
+
+@traced("compare_runs", "derive")
+def compare_runs(a: ParseResult, b: ParseResult, progress_cb=None, cancel_cb=None) -> RunComparison:
+    """
+    Alinea dos resultados XSECI y calcula las diferencias (B − A).
+    - progress_cb(done:int, total:int) ; cancel_cb() -> bool (mismo contrato que parse_xseci).
+    """
+    sec_a, sec_b = _time_seconds(a), _time_seconds(b)
+    # unión de tiempos por valor (las etiquetas pueden diferir en formato; manda el segundo)
+    label_of_a = {s: t for t, s in sec_a.items()}
+    label_of_b = {s: t for t, s in sec_b.items()}
+    seconds = np.array(sorted(set(label_of_a) | set(label_of_b)), dtype=np.int64)
+    times_a = [label_of_a.get(int(s)) for s in seconds]
+    times_b = [label_of_b.get(int(s)) for s in seconds]
+    times = [ta if ta is not None else tb for ta, tb in zip(times_a, times_b)]
+
+    ids_a = set(a.meta.get("ids") or {sid for t in a.data for sid in a.data[t]})
+    ids_b = set(b.meta.get("ids") or {sid for t in b.data for sid in b.data[t]})
+    sections = sorted(ids_a | ids_b)
+    col_of = {sid: j for j, sid in enumerate(sections)}
+    S, T = len(sections), len(times)
+    in_a = np.array([s in ids_a for s in sections], dtype=bool)
+    in_b = np.array([s in ids_b for s in sections], dtype=bool)
+
+    Q_a = _q_matrix(a, times_a, col_of, S)
+    Q_b = _q_matrix(b, times_b, col_of, S)
+
+    max_abs = {v: np.full((T, S), np.nan, dtype=np.float32) for v in DIFF_VARS}
+    for i in range(T):
+        if cancel_cb and cancel_cb():
+            raise CompareCancelled()
+        ja, ma = _gather(a, times_a[i], col_of)
+        jb, mb = _gather(b, times_b[i], col_of)
+        if len(ma) and len(mb):
+            ia, ib, keys = align_outer(station_keys(ja, ma[:, 0]), station_keys(jb, mb[:, 0]))
+            D = np.abs(_take(mb, ib)[:, 2:] - _take(ma, ia)[:, 2:])   # (n, 3); NaN si falta un lado
+            sec = keys[:, 0]
+            starts = np.flatnonzero(np.r_[True, sec[1:] != sec[:-1]])
+            valid = np.isfinite(D)
+            Dz = np.where(valid, D, -1.0)
+            seg_max = np.maximum.reduceat(Dz, starts, axis=0)      # (n_secciones, 3)
+            seg_max[seg_max < 0] = np.nan
+            for k, v in enumerate(DIFF_VARS):
+                max_abs[v][i, sec[starts]] = seg_max[:, k]
+        if progress_cb:
+            progress_cb(i + 1, T)
+
+    name = lambda r: os.path.basename(str(r.meta.get("source") or "")) or "?"
+    print(f"[COMPARE] {name(a)} vs {name(b)}: {T} tiempos, {S} secciones "
+          f"({int((in_a & ~in_b).sum())} solo A, {int((in_b & ~in_a).sum())} solo B)")
+    return RunComparison(name(a), name(b), a, b, times, seconds, sections, in_a, in_b, Q_a, Q_b, max_abs)
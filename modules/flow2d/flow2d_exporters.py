@@ -1,22 +1,941 @@
 # modules/flow2d/flow2d_exporters.py
-from typing import Protocol
+from decimal import Decimal
+from typing import Iterator, Protocol
+import json
+import os
+import re
+import shutil
+import numpy as np
 from .flow2d_parsers import ParseResult
 from .flow2d_pipeline import Flow2DState
+from .flow2d_xseci import WANTED, float_matrix, time_label_to_hours
+from utils.tracing import traced
+
+CSV_CHUNK_ROWS = 65536   # filas por bloque escrito (memoria acotada, independiente del tamaño total)
+
+class ExportCancelled(Exception):
+    """Señal interna para cortar una exportación por cancelación del usuario."""
+    pass
+
 
 class Exporter(Protocol):
+    """
+    Contrato de exportación (se ejecuta fuera del hilo de la GUI):
+    - name / extension: texto del menú y extensión por defecto del archivo.
+    - supports(result): si puede exportar ese tipo de resultado (el menú deshabilita el resto).
+    - export(...): consume el resultado por bloques, reporta progress_cb(done, total) y consulta
+      cancel_cb() -> bool (mismo contrato que parse_xseci); al cancelar borra la salida parcial
+      y lanza ExportCancelled.
+    """
     name: str
-    def export(self, result: ParseResult, state: Flow2DState, out_path: str) -> None: ...
+    extension: str
+    def supports(self, result: ParseResult) -> bool: ...
+    def export(self, result: ParseResult, state: Flow2DState, out_path: str,
+               progress_cb=None, cancel_cb=None) -> None: ...
+
+
+class _Ticker:
+    """Cuenta bloques procesados: progreso (limitado en frecuencia) + punto de cancelación."""
+    def __init__(self, total: int, progress_cb=None, cancel_cb=None, every: int = 32):
+        self.total, self.done = total, 0
+        self._progress_cb, self._cancel_cb = progress_cb, cancel_cb
+        self._every, self._last = every, 0
+
+    def __call__(self, n: int = 1):
+        self.done += n
+        if self._progress_cb and (self.done - self._last >= self._every or self.done >= self.total):
+            self._last = self.done
+            self._progress_cb(self.done, self.total)
+        if self._cancel_cb and self._cancel_cb():
+            raise ExportCancelled()
+
+
+def count_blocks(result: ParseResult) -> int:
+    """Unidades de progreso de un resultado: bloques (tiempo, sección) o secciones XSECS."""
+    if result.meta.get("type") == "XSECI":
+        return sum(len(v) for v in result.data.values())
+    return len(result.data)
+
+
+def _remove_output(path: str):
+    """Borra la salida parcial de una exportación cancelada/fallida (archivo o carpeta)."""
+    try:
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+    except OSError:
+        pass
+
+
+# ---------------- formato largo (una fila por vértice/estación) ----------------
+XSECI_LONG_COLUMNS = ["time", "time_hours", "section", "Q", "row", *WANTED]
+XSECS_LONG_COLUMNS = ["section", "n_vertices_ctrl", "n_vertices_xsec", "vertex", "x", "y"]
+
+
+class _ChunkBuffer:
+    """
+    Acumula bloques (constantes del bloque + matriz n×k de valores) y los entrega como columnas
+    cada ~chunk_rows filas. Las constantes (tiempo, sección, Q...) se expanden con np.repeat solo
+    al vaciar: por bloque no se crea ninguna columna intermedia.
+    """
+    def __init__(self, const_cols: list[str], row_col: str, row_base: int, mat_cols: list[str],
+                 chunk_rows: int = CSV_CHUNK_ROWS):
+        self.const_cols, self.row_col, self.row_base, self.mat_cols = const_cols, row_col, row_base, mat_cols
+        self.columns = [*const_cols, row_col, *mat_cols]
+        self.chunk_rows = chunk_rows
+        self._consts: list[tuple] = []
+        self._mats: list[np.ndarray] = []
+        self._counts: list[int] = []
+        self._rows = 0
+
+    def add(self, consts: tuple, mat: np.ndarray) -> bool:
+        """Añade un bloque; True si ya toca vaciar."""
+        self._consts.append(consts)
+        self._mats.append(mat)
+        self._counts.append(mat.shape[0])
+        self._rows += mat.shape[0]
+        return self._rows >= self.chunk_rows
+
+    def take(self) -> dict[str, np.ndarray] | None:
+        if self._rows == 0:
+            return None
+        counts = np.asarray(self._counts, dtype=np.int64)
+        out: dict[str, np.ndarray] = {}
+        for i, c in enumerate(self.const_cols):
+            out[c] = np.repeat(_const_array([k[i] for k in self._consts]), counts)
+        starts = np.cumsum(counts) - counts
+        out[self.row_col] = np.arange(self._rows, dtype=np.int64) - np.repeat(starts, counts) + self.row_base
+        mat = np.concatenate(self._mats, axis=0)
+        for j, c in enumerate(self.mat_cols):
+            out[c] = _clean_column(mat[:, j])
+        self._consts, self._mats, self._counts, self._rows = [], [], [], 0
+        return out
+
+
+def _const_array(values: list) -> np.ndarray:
+    """Valores por bloque → ndarray con dtype estable (texto, entero o float con NaN por None)."""
+    if any(isinstance(v, str) for v in values):
+        return np.array([None if v is None else str(v) for v in values], dtype=object)
+    if values and all(isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in values):
+        return np.array(values, dtype=np.int64)
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def _clean_column(col: np.ndarray) -> np.ndarray:
+    """Columnas 'object' (None mezclado con números) → float; si hay texto real, queda como texto."""
+    if col.dtype != object:
+        return col
+    try:
+        return col.astype(float)
+    except (TypeError, ValueError):
+        return np.array([None if v is None else str(v) for v in col], dtype=object)
+
+
+def _block_matrix(df, cols: list[str]) -> np.ndarray:
+    """Matriz n×k de las columnas pedidas (una sola conversión por bloque; faltantes → NaN)."""
+    if list(df.columns) == cols:
+        return df.to_numpy()
+    return df.reindex(columns=cols).to_numpy()
+
+
+def _xseci_blocks(result: ParseResult, times=None, sections=None):
+    """
+    (tiempo, sección, bloque) en orden tiempo→sección; si se pasan `sections`, en orden
+    sección→tiempo (útil para particionar por sección sin reabrir archivos).
+    """
+    times = times or result.meta.get("times") or list(result.data.keys())
+    if sections is None:
+        for t in times:
+            for sid, sec in (result.data.get(t) or {}).items():
+                yield t, sid, sec
+    else:
+        for sid in sections:
+            for t in times:
+                sec = (result.data.get(t) or {}).get(sid)
+                if sec:
+                    yield t, sid, sec
+
+
+def iter_xseci_long(result: ParseResult, chunk_rows: int = CSV_CHUNK_ROWS,
+                    times=None, sections=None, tick=None) -> Iterator[dict[str, np.ndarray]]:
+    """
+    Recorre (tiempo, sección) y produce bloques {columna: ndarray} de ~chunk_rows filas.
+    Toma los valores directamente del df de cada sección (sin concatenar DataFrames).
+    tick(): se llama por cada (tiempo, sección) consumido (progreso/cancelación).
+    """
+    buf = _ChunkBuffer(["time", "time_hours", "section", "Q"], "row", 0, WANTED, chunk_rows)
+    hours = result.hours_by_label()
+    for t, sid, sec in _xseci_blocks(result, times, sections):
+        if tick:
+            tick()
+        df = sec.get("df")
+        if df is None or df.empty:
+            continue
+        h = hours.get(t)
+        if h is None:
+            h = hours[t] = time_label_to_hours(t)   # tiempos fuera de meta["times"]
+        if buf.add((t, h, str(sid), sec.get("Q")), _block_matrix(df, WANTED)):
+            yield buf.take()
+    last = buf.take()
+    if last is not None:
+        yield last
+
+
+def iter_xsecs_long(result: ParseResult, chunk_rows: int = CSV_CHUNK_ROWS,
+                    tick=None) -> Iterator[dict[str, np.ndarray]]:
+    """Vértices de todas las secciones XSECS: (section, n_vertices_*, vertex, x, y)."""
+    buf = _ChunkBuffer(["section", "n_vertices_ctrl", "n_vertices_xsec"], "vertex", 1, ["x", "y"], chunk_rows)
+    for sid in result.meta.get("ids") or sorted(result.data.keys()):
+        if tick:
+            tick()
+        sec = result.data.get(sid) or {}
+        coords = sec.get("coords")
+        if coords is None or coords.empty:
+            continue
+        if buf.add((str(sid), sec.get("n_vertices_ctrl"), sec.get("n_vertices_xsec")),
+                   _block_matrix(coords, ["x", "y"])):
+            yield buf.take()
+    last = buf.take()
+    if last is not None:
+        yield last
+
+
+def iter_long(result: ParseResult, chunk_rows: int = CSV_CHUNK_ROWS, tick=None):
+    """(columnas, iterador de bloques) según el tipo de resultado."""
+    kind = result.meta.get("type")
+    if kind == "XSECI":
+        return XSECI_LONG_COLUMNS, iter_xseci_long(result, chunk_rows, tick=tick)
+    if kind == "XSECS":
+        return XSECS_LONG_COLUMNS, iter_xsecs_long(result, chunk_rows, tick=tick)
+    raise ValueError(f"Exportación no soportada para tipo {kind!r}")
+
+
+def _csv_float(x: float) -> str:
+    """
+    Float → texto con la misma regla que pyarrow.csv: dígitos mínimos de ida y vuelta; notación
+    decimal si 1e-6 ≤ |x| < 1e10 (sin '.0' en enteros: 2.0 → '2'), si no científica ('1e-7',
+    '1.5e+12'); NaN → celda vacía.
+    """
+    if x != x:
+        return ""
+    ax = abs(x)
+    if 1e-4 <= ax < 1e10 or ax == 0.0:      # rango en que repr() ya es decimal (caso común, rápido)
+        r = repr(x)
+        return r[:-2] if r.endswith(".0") else r
+    if ax == float("inf"):
+        return "inf" if x > 0 else "-inf"
+    sign, digits, exp = Decimal(repr(x)).normalize().as_tuple()
+    e = len(digits) - 1 + exp               # exponente en notación científica
+    s = "-" if sign else ""
+    if -7 < e < 10:
+        return s + format(Decimal((0, digits, exp)), "f")
+    d = "".join(map(str, digits))
+    return f"{s}{d[0]}{'.' + d[1:] if len(d) > 1 else ''}e{'+' if e >= 0 else '-'}{abs(e)}"
+
+
+def _csv_column(col: np.ndarray) -> np.ndarray:
+    """Floats siempre en float64 (float32 se escribiría con otros dígitos según el escritor)."""
+    return col.astype(np.float64) if col.dtype.kind == "f" and col.dtype != np.float64 else col
+
+
+def _csv_cells(col: np.ndarray) -> list[str]:
+    col = _csv_column(col)
+    if col.dtype.kind == "f":
+        return [_csv_float(v) for v in col.tolist()]
+    if col.dtype.kind in "iu":
+        return col.astype(str).tolist()
+    return ["" if v is None else '"' + str(v).replace('"', '""') + '"' for v in col.tolist()]
+
+
+def _write_csv_python(fh, block: dict, columns: list[str]):
+    cells = [_csv_cells(np.asarray(block[c])) for c in columns]
+    fh.write(("\n".join(map(",".join, zip(*cells))) + "\n").encode("utf-8"))
+
+
+def _write_csv_arrow(fh, block: dict, columns: list[str]):
+    import pyarrow as pa  # type: ignore
+    import pyarrow.csv as pa_csv  # type: ignore
+    table = pa.table({c: pa.array(_csv_column(np.asarray(block[c])), from_pandas=True) for c in columns})
+    pa_csv.write_csv(table, fh, write_options=pa_csv.WriteOptions(include_header=False, quoting_style="needed"))
+
+
+def _csv_block_writer():
+    """
+    Escritor de bloques CSV: pyarrow (C++, mucho más rápido formateando floats) si está instalado;
+    si no, Python puro. Ambos escriben byte a byte lo mismo:
+    - texto siempre entre comillas ("" para comillas internas); números nunca;
+    - None/NaN → celda vacía; floats según _csv_float (ida y vuelta exacta).
+    """
+    try:
+        import pyarrow.csv  # type: ignore  # noqa: F401
+    except ImportError:
+        return _write_csv_python
+    return _write_csv_arrow
+
 
 class CSVAllLinesExporter:
+    """
+    CSV en formato largo de TODO el resultado (XSECI: tiempo × sección × fila; XSECS: vértices).
+    Escritura en streaming por bloques: la memoria no crece con el tamaño del archivo.
+    """
     name = "CSV (todo)"
-    def export(self, result: ParseResult, state: Flow2DState, out_path: str) -> None:
-        print(f"[EXPORT] {self.name} -> {out_path}")
-        print(f"[EXPORT] meta={result.meta}")
-        print(f"[EXPORT] (stub) escribiría CSV con todas las líneas/filas pertinentes")
+    extension = ".csv"
+
+    def supports(self, result: ParseResult) -> bool:
+        return result.meta.get("type") in ("XSECI", "XSECS")
+
+    @traced(cat="export")
+    def export(self, result: ParseResult, state: Flow2DState, out_path: str,
+               progress_cb=None, cancel_cb=None) -> None:
+        tick = _Ticker(count_blocks(result), progress_cb, cancel_cb)
+        columns, chunks = iter_long(result, tick=tick)
+        write_block = _csv_block_writer()
+        n_rows = 0
+        try:
+            with open(out_path, "wb", buffering=1 << 20) as fh:
+                fh.write((",".join(columns) + "\n").encode("utf-8"))
+                for block in chunks:
+                    write_block(fh, block, columns)
+                    n_rows += len(block[columns[0]])
+        except BaseException:
+            _remove_output(out_path)
+            raise
+        print(f"[EXPORT] {self.name} -> {out_path} ({n_rows} filas)")
+
+# ---------------- Parquet / Arrow IPC ----------------
+PARQUET_ROW_GROUP_ROWS = 131072   # filas por row group (= bloque en streaming)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError as e:
+        raise RuntimeError("Para exportar Parquet/Arrow instala 'pyarrow' (pip install pyarrow).") from e
+    return pa, pq
+
+
+def _arrow_schema(pa, result: ParseResult):
+    """Esquema con tipos explícitos (no inferidos por bloque) + metadatos Q/unidades."""
+    kind = result.meta.get("type")
+    label = pa.dictionary(pa.int32(), pa.string())   # texto repetido → categórico en pandas
+    if kind == "XSECI":
+        fields = [("time", label), ("time_hours", pa.float64()), ("section", label),
+                  ("Q", pa.float64()), ("row", pa.int64())] + [(w, pa.float64()) for w in WANTED]
+        units, q_units = {}, set()
+        for _t, _sid, sec in _xseci_blocks(result):
+            if not units and sec.get("units"):
+                units = dict(sec["units"])
+            if sec.get("Q_units"):
+                q_units.add(sec["Q_units"])
+        meta = {"units": json.dumps(units, ensure_ascii=False),
+                "Q_units": json.dumps(sorted(q_units), ensure_ascii=False)}
+    elif kind == "XSECS":
+        fields = [("section", label), ("n_vertices_ctrl", pa.int64()), ("n_vertices_xsec", pa.int64()),
+                  ("vertex", pa.int64()), ("x", pa.float64()), ("y", pa.float64())]
+        meta = {}
+    else:
+        raise ValueError(f"Exportación no soportada para tipo {kind!r}")
+    meta.update({"type": str(kind), "source": str(result.meta.get("source") or ""),
+                 "creator": "My Friend TGI"})
+    return pa.schema(fields, metadata={k: str(v) for k, v in meta.items()})
+
+
+def _arrow_dictionaries(pa, result: ParseResult) -> dict:
+    """
+    Un diccionario fijo por columna categórica (tiempos / IDs de meta), compartido por todos los
+    bloques y particiones: Arrow IPC no admite reemplazar el diccionario entre lotes.
+    """
+    ids = result.meta.get("ids")
+    if result.meta.get("type") == "XSECS":
+        return {"section": pa.array([str(s) for s in (ids or sorted(result.data))], type=pa.string())}
+    times = result.meta.get("times") or list(result.data.keys())
+    ids = ids or sorted({sid for t in result.data for sid in result.data[t]})
+    return {"time": pa.array([str(t) for t in times], type=pa.string()),
+            "section": pa.array([str(s) for s in ids], type=pa.string())}
+
+
+def _arrow_table(pa, schema, block: dict, dictionaries: dict):
+    import pyarrow.compute as pc  # type: ignore
+    cols = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            values = pa.array(block[field.name], type=pa.string(), from_pandas=True)
+            fixed = dictionaries[field.name]
+            idx = pc.index_in(values, value_set=fixed)
+            if idx.null_count > values.null_count:
+                raise ValueError(f"Valor de '{field.name}' fuera de meta (tiempos/IDs): no se puede codificar")
+            arr = pa.DictionaryArray.from_arrays(idx.cast(field.type.index_type), fixed)
+        else:
+            arr = pa.array(block[field.name], type=field.type, from_pandas=True)
+        cols.append(arr)
+    return pa.Table.from_arrays(cols, schema=schema)
+
+
+def _slug(s: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.=-]+", "", str(s).replace(" ", "")) or "_"
+
+
+def _unique_slug(key, used: set[str]) -> str:
+    """
+    _slug sin colisiones entre particiones ('XS 1', 'XS1', 'XS/1' → XS1, XS1__2, XS1__3).
+    Sin distinguir mayúsculas (Windows); el valor original queda en los metadatos 'partition'.
+    """
+    base = name = _slug(key)
+    n = 1
+    while name.lower() in used:
+        n += 1
+        name = f"{base}__{n}"
+    used.add(name.lower())
+    return name
+
+
+class ParquetExporter:
+    """
+    Tabla larga columnar (mismas columnas que el CSV) con tipos correctos y metadatos Q/unidades.
+    - Extensión .arrow/.feather → Arrow IPC; cualquier otra → Parquet.
+    - partition_by: None (un archivo) | "time" | "section" (una carpeta con un archivo por valor,
+      legible de una vez con pd.read_parquet(carpeta)).
+    Se escribe bloque a bloque (un row group por bloque): la tabla completa nunca está en memoria.
+    """
+    def __init__(self, partition_by: str | None = None, compression: str = "snappy"):
+        if partition_by not in (None, "time", "section"):
+            raise ValueError(f"partition_by inválido: {partition_by!r}")
+        self.partition_by = partition_by
+        self.compression = compression
+        self.name = {None: "Parquet (todo)", "time": "Parquet por tiempo",
+                     "section": "Parquet por sección"}[partition_by]
+        self.extension = ".parquet"
+
+    def supports(self, result: ParseResult) -> bool:
+        kind = result.meta.get("type")
+        return kind == "XSECI" or (kind == "XSECS" and self.partition_by is None)
+
+    @traced(cat="export")
+    def export(self, result: ParseResult, state: Flow2DState, out_path: str,
+               progress_cb=None, cancel_cb=None) -> None:
+        pa, _pq = _require_pyarrow()
+        schema = _arrow_schema(pa, result)
+        dicts = _arrow_dictionaries(pa, result)
+        tick = _Ticker(count_blocks(result), progress_cb, cancel_cb)
+        ext = os.path.splitext(out_path)[1].lower()
+        ipc = ext in (".arrow", ".feather", ".ipc")
+        if self.partition_by is None:
+            columns, chunks = iter_long(result, PARQUET_ROW_GROUP_ROWS, tick=tick)
+            path = out_path if ext else out_path + ".parquet"
+            try:
+                n_rows = self._write(pa, schema, dicts, path, chunks, ipc)
+            except BaseException:
+                _remove_output(path)
+                raise
+            print(f"[EXPORT] {self.name} -> {path} ({n_rows} filas)")
+            return
+
+        if result.meta.get("type") != "XSECI":
+            raise ValueError("La partición por tiempo/sección solo aplica a resultados XSECI.")
+        out_dir = os.path.splitext(out_path)[0]
+        existed = os.path.isdir(out_dir)
+        os.makedirs(out_dir, exist_ok=True)
+        file_ext = ".arrow" if ipc else ".parquet"
+        n_rows = 0
+        if self.partition_by == "time":
+            keys = result.meta.get("times") or list(result.data.keys())
+            parts = ((t, iter_xseci_long(result, PARQUET_ROW_GROUP_ROWS, times=[t], tick=tick)) for t in keys)
+        else:
+            keys = result.meta.get("ids") or sorted({sid for t in result.data for sid in result.data[t]})
+            parts = ((sid, iter_xseci_long(result, PARQUET_ROW_GROUP_ROWS, sections=[sid], tick=tick))
+                     for sid in keys)
+        written: list[str] = []
+        used: set[str] = set()
+        try:
+            for key, chunks in parts:
+                path = os.path.join(out_dir, f"{self.partition_by}={_unique_slug(key, used)}{file_ext}")
+                written.append(path)
+                part_schema = schema.with_metadata({**schema.metadata,
+                                                    b"partition": f"{self.partition_by}={key}".encode()})
+                n_rows += self._write(pa, part_schema, dicts, path, chunks, ipc)
+        except BaseException:
+            # carpeta nueva → se borra entera; si ya existía, solo lo que escribimos
+            for path in ([out_dir] if not existed else written):
+                _remove_output(path)
+            raise
+        print(f"[EXPORT] {self.name} -> {out_dir} ({len(keys)} archivos, {n_rows} filas)")
+
+    @traced(cat="export")
+    def _write(self, pa, schema, dicts: dict, path: str, chunks, ipc: bool) -> int:
+        n_rows = 0
+        if ipc:
+            with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+                for block in chunks:
+                    table = _arrow_table(pa, schema, block, dicts)
+                    writer.write_table(table, max_chunksize=PARQUET_ROW_GROUP_ROWS)
+                    n_rows += table.num_rows
+            return n_rows
+        _pa, pq = _require_pyarrow()
+        with pq.ParquetWriter(path, schema, compression=self.compression) as writer:
+            for block in chunks:
+                table = _arrow_table(pa, schema, block, dicts)
+                writer.write_table(table, row_group_size=PARQUET_ROW_GROUP_ROWS)
+                n_rows += table.num_rows
+        return n_rows
+
+# ---------------- cubo HDF5 / NetCDF4 ----------------
+CUBE_SLAB_BYTES = 256 * 1024 * 1024   # memoria máx. del bloque en escritura (todas las variables)
+CUBE_CHUNK_T, CUBE_CHUNK_S = 32, 16    # chunk (tiempo, sección, estación completa): fijo, pensado para leer
+
+
+def _cube_layout(T: int, S: int, N: int, n_vars: int) -> tuple[tuple[int, int, int], int, int]:
+    """
+    (chunks, t_slab, s_slab): el chunk no depende del tamaño del modelo (la historia de una sección
+    son siempre ≈T/32 lecturas); el bloque en memoria se ajusta aparte, en múltiplos enteros del
+    chunk (cada chunk se escribe una sola vez). Si ni una altura de chunk con todas las secciones
+    cabe en CUBE_SLAB_BYTES, el bloque se parte también por secciones.
+    """
+    t_chunk = max(1, min(T, CUBE_CHUNK_T))
+    s_chunk = max(1, min(S, CUBE_CHUNK_S))
+    row_bytes = N * 8 * n_vars                       # una (tiempo, sección) de todas las variables
+    fit = CUBE_SLAB_BYTES // (t_chunk * S * row_bytes)
+    if fit >= 1:
+        return (t_chunk, s_chunk, N), min(T, t_chunk * fit), S
+    s_fit = CUBE_SLAB_BYTES // (t_chunk * s_chunk * row_bytes)
+    return (t_chunk, s_chunk, N), t_chunk, min(S, s_chunk * max(1, s_fit))
+
+
+def _require_h5py():
+    try:
+        import h5py  # type: ignore
+    except ImportError as e:
+        raise RuntimeError("Para exportar HDF5/NetCDF instala 'h5py' (pip install h5py).") from e
+    return h5py
+
+
+class HDF5CubeExporter:
+    """
+    Cubo denso (time, section, station) por variable WANTED, con NaN donde la sección tiene menos
+    estaciones (o falta en ese tiempo). Además: Q (time, section), n_rows (time, section),
+    eje numérico time (horas), etiquetas de tiempo e IDs de sección como escalas de dimensión
+    (legible con h5py, xarray/netCDF4).
+    - Chunks (≤32 tiempos, ≤16 secciones, todas las estaciones) fijos: leer la historia de una
+      sección toca T/32 chunks; un tiempo completo, S/16 chunks (también en modelos grandes).
+    - gzip + shuffle. Se escribe por bloques alineados al chunk (memoria acotada, _cube_layout).
+    """
+    name = "HDF5/NetCDF (cubo)"
+    extension = ".nc"
+
+    def __init__(self, compression_level: int = 4):
+        self.compression_level = compression_level
+
+    def supports(self, result: ParseResult) -> bool:
+        return result.meta.get("type") == "XSECI"
+
+    @traced(cat="export")
+    def export(self, result: ParseResult, state: Flow2DState, out_path: str,
+               progress_cb=None, cancel_cb=None) -> None:
+        h5py = _require_h5py()
+        if not self.supports(result):
+            raise ValueError("El cubo HDF5/NetCDF solo aplica a resultados XSECI.")
+        if not os.path.splitext(out_path)[1]:
+            out_path += self.extension
+        try:
+            self._write(h5py, result, out_path, _Ticker(count_blocks(result), progress_cb, cancel_cb))
+        except BaseException:
+            _remove_output(out_path)
+            raise
+
+    @traced(cat="export")
+    def _write(self, h5py, result: ParseResult, out_path: str, tick: _Ticker):
+
+        times = result.meta.get("times") or list(result.data.keys())
+        ids = result.meta.get("ids") or sorted({sid for t in result.data for sid in result.data[t]})
+        T, S = len(times), len(ids)
+        N = max((len(sec["df"]) for _t, _sid, sec in _xseci_blocks(result, times)
+                 if sec.get("df") is not None), default=0)
+        if T == 0 or S == 0 or N == 0:
+            raise ValueError("No hay datos para exportar.")
+
+        n_vars = len(WANTED)
+        chunks, t_slab, s_slab = _cube_layout(T, S, N, n_vars)
+        comp = dict(compression="gzip", compression_opts=self.compression_level, shuffle=True)
+        units, q_units = {}, None
+        for _t, _sid, sec in _xseci_blocks(result, times):
+            units = units or dict(sec.get("units") or {})
+            q_units = q_units or sec.get("Q_units")
+            if units and q_units:
+                break
+
+        str_dt = h5py.string_dtype()
+        with h5py.File(out_path, "w") as f:
+            f.attrs["title"] = "XSECI"
+            f.attrs["source"] = str(result.meta.get("source") or "")
+            f.attrs["creator"] = "My Friend TGI"
+
+            # --- ejes (escalas de dimensión) ---
+            hours = result.hours_by_label()
+            d_time = f.create_dataset("time", data=np.array([hours[t] if t in hours else time_label_to_hours(t)
+                                                             for t in times]))
+            d_time.attrs["units"] = "hours"
+            d_time.make_scale("time")
+            d_sec = f.create_dataset("section", data=np.array(ids, dtype=object), dtype=str_dt)
+            d_sec.make_scale("section")
+            d_sta = f.create_dataset("station", data=np.arange(N, dtype=np.int32))
+            d_sta.attrs["long_name"] = "índice de estación dentro de la sección"
+            d_sta.make_scale("station")
+            d_lbl = f.create_dataset("time_label", data=np.array(times, dtype=object), dtype=str_dt)
+            d_lbl.dims[0].attach_scale(d_time)
+
+            # --- variables ---
+            cube = {}
+            for w in WANTED:
+                ds = f.create_dataset(w, shape=(T, S, N), dtype="f8", chunks=chunks,
+                                      fillvalue=np.nan, **comp)
+                if units.get(w):
+                    ds.attrs["units"] = units[w]
+                for k, scale in enumerate((d_time, d_sec, d_sta)):
+                    ds.dims[k].attach_scale(scale)
+                cube[w] = ds
+            ts_chunks = (min(T, 256), min(S, 256))
+            d_q = f.create_dataset("Q", shape=(T, S), dtype="f8", chunks=ts_chunks, fillvalue=np.nan, **comp)
+            if q_units:
+                d_q.attrs["units"] = q_units
+            d_n = f.create_dataset("n_rows", shape=(T, S), dtype="i4", chunks=ts_chunks, fillvalue=0, **comp)
+            for ds in (d_q, d_n):
+                ds.dims[0].attach_scale(d_time)
+                ds.dims[1].attach_scale(d_sec)
+
+            # --- datos por bloques (tiempos × secciones) alineados al chunk: cada chunk se escribe una vez ---
+            for t0 in range(0, T, t_slab):
+                block_times = times[t0:t0 + t_slab]
+                nt = len(block_times)
+                for s0 in range(0, S, s_slab):
+                    block_ids = ids[s0:s0 + s_slab]
+                    ns = len(block_ids)
+                    slab = np.full((n_vars, nt, ns, N), np.nan)
+                    q = np.full((nt, ns), np.nan)
+                    nrows = np.zeros((nt, ns), dtype=np.int32)
+                    for k, t in enumerate(block_times):
+                        data_t = result.data.get(t) or {}
+                        for j, sid in enumerate(block_ids):
+                            sec = data_t.get(sid)
+                            if sec is None:
+                                continue
+                            tick()
+                            df = sec.get("df")
+                            if df is None or df.empty:
+                                continue
+                            mat = float_matrix(df, WANTED)
+                            slab[:, k, j, :mat.shape[0]] = mat.T
+                            nrows[k, j] = mat.shape[0]
+                            if sec.get("Q") is not None:
+                                q[k, j] = sec["Q"]
+                    for i, w in enumerate(WANTED):
+                        cube[w][t0:t0 + nt, s0:s0 + ns] = slab[i]
+                    d_q[t0:t0 + nt, s0:s0 + ns] = q
+                    d_n[t0:t0 + nt, s0:s0 + ns] = nrows
+        print(f"[EXPORT] {self.name} -> {out_path} (cubo {T}×{S}×{N})")
+
+# ---------------- Excel (XLSX) en streaming ----------------
+XLSX_MAX_ROWS = 1048576   # límite de filas por hoja de Excel (incluye la cabecera)
+XLSX_MAX_COLS = 16384
+XLSX_MAX_OPEN_SHEETS = 200   # sin Worksheet._opt_close: hojas con su temporal abierto a la vez (descriptores)
+_SHEET_BAD = re.compile(r"[\[\]:*?/\\]")
+_INF = float("inf")
+
+
+def _require_xlsxwriter():
+    try:
+        import xlsxwriter  # type: ignore
+    except ImportError as e:
+        raise RuntimeError("Para exportar Excel instala 'xlsxwriter' (pip install xlsxwriter).") from e
+    return xlsxwriter
+
+
+def _can_close_sheets() -> bool:
+    """
+    ¿Esta versión de xlsxwriter permite cerrar el temporal de una hoja terminada? (método privado
+    Worksheet._opt_close, probado con la versión fijada en requirements.txt).
+    """
+    from xlsxwriter.worksheet import Worksheet  # type: ignore
+    return callable(getattr(Worksheet, "_opt_close", None))
+
+
+class _SheetNamer:
+    """Nombres de hoja válidos para Excel: sin []:*?/\\, ≤ 31 caracteres y únicos (sin mayúsculas)."""
+    def __init__(self):
+        self._used: set[str] = set()
+
+    def __call__(self, name: str) -> str:
+        base = _SHEET_BAD.sub("_", str(name)).strip("'") or "_"
+        cand, i = base[:31], 2
+        while cand.lower() in self._used:
+            suffix = f" ({i})"
+            cand = base[:31 - len(suffix)] + suffix
+            i += 1
+        self._used.add(cand.lower())
+        return cand
+
+
+class XLSXExporter:
+    """
+    Libro Excel con TODO el resultado XSECI: una hoja por sección (o por tiempo) + hoja "Q" resumen.
+    xlsxwriter en modo constant_memory: cada fila se vuelca a disco al escribir la siguiente, así
+    que las hojas se llenan de una en una (orden sección→tiempo o tiempo→sección) y la memoria no
+    crece con el número de filas. Una hoja que supera el límite de Excel sigue en "nombre (2)", ...
+    """
+    def __init__(self, sheet_by: str = "section"):
+        if sheet_by not in ("section", "time"):
+            raise ValueError(f"sheet_by inválido: {sheet_by!r}")
+        self.sheet_by = sheet_by
+        self.name = {"section": "Excel (hoja por sección)", "time": "Excel (hoja por tiempo)"}[sheet_by]
+        self.extension = ".xlsx"
+
+    def supports(self, result: ParseResult) -> bool:
+        return result.meta.get("type") == "XSECI"
+
+    @traced(cat="export")
+    def export(self, result: ParseResult, state: Flow2DState, out_path: str,
+               progress_cb=None, cancel_cb=None) -> None:
+        xlsxwriter = _require_xlsxwriter()
+        if not self.supports(result):
+            raise ValueError("La exportación Excel completa solo aplica a resultados XSECI.")
+        if not os.path.splitext(out_path)[1]:
+            out_path += self.extension
+        tick = _Ticker(count_blocks(result), progress_cb, cancel_cb)
+        wb = xlsxwriter.Workbook(out_path, {"constant_memory": True})
+        wb.use_zip64()   # libros > 4 GB sin comprimir (millones de filas)
+        try:
+            n_sheets, n_rows = self._write(wb, result, tick)
+            wb.close()
+        except BaseException:
+            try:
+                wb.close()   # libera los temporales de cada hoja
+            except Exception:
+                pass
+            _remove_output(out_path)
+            raise
+        print(f"[EXPORT] {self.name} -> {out_path} ({n_sheets} hojas, {n_rows} filas)")
+
+    @traced(cat="export")
+    def _write(self, wb, result: ParseResult, tick: _Ticker) -> tuple[int, int]:
+        times = result.meta.get("times") or list(result.data.keys())
+        ids = result.meta.get("ids") or sorted({sid for t in result.data for sid in result.data[t]})
+        hours = result.hours_by_label()
+        hours.update((t, time_label_to_hours(t)) for t in times if t not in hours)
+        n_planned = 1 + (len(ids) if self.sheet_by == "section" else len(times))
+        if not _can_close_sheets():
+            import xlsxwriter  # type: ignore
+            if n_planned > XLSX_MAX_OPEN_SHEETS:
+                raise RuntimeError(
+                    f"xlsxwriter {xlsxwriter.__version__} no permite cerrar hojas terminadas y este libro "
+                    f"tendría {n_planned} hojas abiertas a la vez (límite {XLSX_MAX_OPEN_SHEETS}). "
+                    f"Instala la versión de requirements.txt o exporta a CSV/Parquet.")
+            print(f"[EXPORT] Aviso: xlsxwriter {xlsxwriter.__version__} sin Worksheet._opt_close; "
+                  f"cada hoja mantiene su temporal abierto ({n_planned} hojas)")
+        namer = _SheetNamer()
+        bold = wb.add_format({"bold": True})
+        n_sheets = 1
+        self._write_q_summary(wb.add_worksheet(namer("Q")), result, times, ids, hours, bold)
+
+        if self.sheet_by == "section":
+            groups = ((str(sid), [(t, (result.data.get(t) or {}).get(sid)) for t in times]) for sid in ids)
+            header = ["time", "time_hours", "Q", "row", *WANTED]
+        else:
+            groups = ((t, list((result.data.get(t) or {}).items())) for t in times)
+            header = ["section", "Q", "row", *WANTED]
+
+        n_rows = 0
+        for name, blocks in groups:
+            ws, part, r = None, 1, XLSX_MAX_ROWS
+            for key, sec in blocks:
+                if sec is None:
+                    continue
+                tick()
+                df = sec.get("df")
+                if df is None or df.empty:
+                    continue
+                mat = float_matrix(df, WANTED)
+                if self.sheet_by == "section":
+                    prefix = [key, hours.get(key), sec.get("Q")]
+                else:
+                    prefix = [str(key), sec.get("Q")]
+                start = 0
+                while start < len(mat):
+                    if r >= XLSX_MAX_ROWS:   # hoja nueva (primera, o la actual llena)
+                        if ws is not None:
+                            _close_sheet(ws)
+                        ws = wb.add_worksheet(namer(name if part == 1 else f"{name} ({part})"))
+                        ws.write_row(0, 0, header, bold)
+                        ws.freeze_panes(1, 0)
+                        part, r, n_sheets = part + 1, 1, n_sheets + 1
+                    stop = min(len(mat), start + XLSX_MAX_ROWS - r)
+                    _write_rows(ws, r, prefix, start, mat[start:stop])
+                    r += stop - start
+                    n_rows += stop - start
+                    start = stop
+            if ws is not None:
+                _close_sheet(ws)
+        return n_sheets, n_rows
+
+    @staticmethod
+    def _write_q_summary(ws, result: ParseResult, times, ids, hours, bold):
+        """Caudal por (tiempo, sección): matriz tiempos × secciones (o larga si no caben las columnas)."""
+        q_units = next((sec.get("Q_units") for _t, _sid, sec in _xseci_blocks(result, times)
+                        if sec.get("Q_units")), None)
+        q_head = f"Q [{q_units}]" if q_units else "Q"
+        ws.freeze_panes(1, 2)
+        if len(ids) + 2 <= XLSX_MAX_COLS and len(times) < XLSX_MAX_ROWS:
+            ws.write_row(0, 0, [f"time \\ {q_head}", "time_hours", *map(str, ids)], bold)
+            col_of = {sid: j + 2 for j, sid in enumerate(ids)}
+            for i, t in enumerate(times, start=1):
+                ws.write_string(i, 0, t)
+                ws.write_number(i, 1, hours[t])
+                row = result.data.get(t) or {}
+                for sid in ids:   # orden de columnas: constant_memory exige escribir la fila en orden
+                    q = _finite((row.get(sid) or {}).get("Q"))
+                    if q is not None:
+                        ws.write_number(i, col_of[sid], q)
+        else:
+            ws.write_row(0, 0, ["time", "time_hours", "section", q_head], bold)
+            r = 1
+            for t, sid, sec in _xseci_blocks(result, times):
+                if r >= XLSX_MAX_ROWS:
+                    break
+                ws.write_string(r, 0, t)
+                ws.write_number(r, 1, hours[t])
+                ws.write_string(r, 2, str(sid))
+                q = _finite(sec.get("Q"))
+                if q is not None:
+                    ws.write_number(r, 3, q)
+                r += 1
+        _close_sheet(ws)
+
+
+def _finite(v) -> float | None:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return f if np.isfinite(f) else None
+
+
+def _write_rows(ws, row0: int, prefix: list, row_base: int, mat: np.ndarray):
+    """Filas [prefijo constante, nº de fila, valores]; NaN → celda vacía (no se escribe)."""
+    write_number, write_string = ws.write_number, ws.write_string
+    n_pre = len(prefix)
+    pre = [(j, v if isinstance(v, str) else _finite(v)) for j, v in enumerate(prefix)]
+    pre = [(j, v) for j, v in pre if v is not None]
+    c0 = n_pre + 1
+    for i, vals in enumerate(mat.tolist()):
+        r = row0 + i
+        for j, v in pre:
+            if isinstance(v, str):
+                write_string(r, j, v)
+            else:
+                write_number(r, j, v)
+        write_number(r, n_pre, row_base + i)
+        for k, v in enumerate(vals):
+            if -_INF < v < _INF:   # falso para NaN e ±inf
+                write_number(r, c0 + k, v)
+
+
+def _close_sheet(ws):
+    """
+    Hoja terminada: cierra su temporal de constant_memory (xlsxwriter lo reabre al empaquetar).
+    Sin esto cada hoja mantiene un descriptor abierto y cientos de hojas agotan el límite del SO
+    (XLSXExporter._write comprueba antes con _can_close_sheets y limita las hojas si no se puede).
+    """
+    close = getattr(ws, "_opt_close", None)
+    if close is not None:
+        close()
+
 
 class JSONSummaryExporter:
+    """
+    Resumen liviano en JSON: metadatos, variables derivadas (Flow2DState) y una entrada por sección.
+    - XSECI: máximos sobre todos los tiempos (Q, DEPTH, WSEL, VEL_NORM) con el tiempo en que ocurren.
+    - XSECS: nº de vértices y extensión (xmin, xmax, ymin, ymax).
+    Valores no finitos → null (JSON estricto).
+    """
     name = "JSON (resumen)"
-    def export(self, result: ParseResult, state: Flow2DState, out_path: str) -> None:
-        print(f"[EXPORT] {self.name} -> {out_path}")
-        print(f"[EXPORT] variables={state.variables}")
-        print(f"[EXPORT] (stub) escribiría un JSON con resumen/variables")
+    extension = ".json"
+    PEAK_VARS = ("DEPTH", "WSEL", "VEL_NORM")
+
+    def supports(self, result: ParseResult) -> bool:
+        return result.meta.get("type") in ("XSECI", "XSECS")
+
+    @traced(cat="export")
+    def export(self, result: ParseResult, state: Flow2DState, out_path: str,
+               progress_cb=None, cancel_cb=None) -> None:
+        if not self.supports(result):
+            raise ValueError(f"Resumen JSON no soportado para tipo {result.meta.get('type')!r}")
+        if not os.path.splitext(out_path)[1]:
+            out_path += self.extension
+        tick = _Ticker(count_blocks(result), progress_cb, cancel_cb)
+        kind = result.meta.get("type")
+        sections = self._xseci_sections(result, tick) if kind == "XSECI" else self._xsecs_sections(result, tick)
+        times = result.meta.get("times") or []
+        doc = {
+            "type": kind,
+            "source": str(result.meta.get("source") or ""),
+            "n_times": len(times),
+            "times": list(times),
+            "n_sections": len(sections),
+            "variables": (state.variables if state is not None else {}),
+            "sections": sections,
+        }
+        try:
+            with open(out_path, "w", encoding="utf-8") as f:
+                json.dump(doc, f, ensure_ascii=False, indent=2, allow_nan=False, default=str)
+        except BaseException:
+            _remove_output(out_path)
+            raise
+        print(f"[EXPORT] {self.name} -> {out_path} ({len(sections)} secciones)")
+
+    def _xseci_sections(self, result: ParseResult, tick: _Ticker) -> dict:
+        cols = list(self.PEAK_VARS)
+        peaks: dict[str, dict] = {}
+        for t, sid, sec in _xseci_blocks(result):
+            tick()
+            p = peaks.get(str(sid))
+            if p is None:
+                p = peaks[str(sid)] = dict.fromkeys(
+                    [f"{c}_{k}" for c in ("Q", *cols) for k in ("max", "max_time")])
+            q = _finite(sec.get("Q"))
+            if q is not None and (p["Q_max"] is None or q > p["Q_max"]):
+                p["Q_max"], p["Q_max_time"] = q, t
+            df = sec.get("df")
+            if df is None or df.empty:
+                continue
+            mat = float_matrix(df, cols)
+            with np.errstate(invalid="ignore"):
+                hi = np.where(np.isfinite(mat), mat, -np.inf).max(axis=0)
+            for c, v in zip(cols, hi.tolist()):
+                if np.isfinite(v) and (p[f"{c}_max"] is None or v > p[f"{c}_max"]):
+                    p[f"{c}_max"], p[f"{c}_max_time"] = v, t
+        return peaks
+
+    @staticmethod
+    def _xsecs_sections(result: ParseResult, tick: _Ticker) -> dict:
+        out: dict[str, dict] = {}
+        for sid in result.meta.get("ids") or sorted(result.data.keys()):
+            tick()
+            sec = result.data.get(sid) or {}
+            coords = sec.get("coords")
+            xy = float_matrix(coords, ["x", "y"]) if coords is not None and not coords.empty else np.empty((0, 2))
+            ok = np.isfinite(xy).all(axis=1)
+            xy = xy[ok]
+            out[str(sid)] = {
+                "n_vertices": int(len(xy)),
+                "n_vertices_ctrl": _int_or_none(sec.get("n_vertices_ctrl")),
+                "n_vertices_xsec": _int_or_none(sec.get("n_vertices_xsec")),
+                "extent": ([float(xy[:, 0].min()), float(xy[:, 0].max()),
+                            float(xy[:, 1].min()), float(xy[:, 1].max())] if len(xy) else None),
+            }
+        return out
+
+
+def _int_or_none(v) -> int | None:
+    try:
+        return None if v is None else int(v)
+    except (TypeError, ValueError):
+        return None
@@ -1,9 +1,11 @@
 # modules/flow2d/flow2d_factory.py
 from .flow2d_parsers import XSECSParser, XSECIParser, XSECHParser, BaseParser
+from utils.tracing import instant
 
 def get_parser(ext: str) -> BaseParser:
     e = ext.upper().lstrip(".")
     print(f"[FACTORY] parser para: {e}")
+    instant("get_parser", "parse", ext=e)
     if e == "XSECS":
         return XSECSParser()
     if e == "XSECI":
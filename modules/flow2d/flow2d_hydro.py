@@ -0,0 +1,242 @@
+# modules/flow2d/flow2d_hydro.py
+"""
+Operaciones sobre hidrogramas en bloque: matriz Q (T×S) = tiempos × secciones.
+Todo es NumPy sobre la matriz completa (sin bucles por sección), así recalcular
+miles de secciones al mover un control sigue siendo interactivo.
+- Ajuste de caudales ("Caudales ajustados" en XSECH): relleno de huecos, suavizado,
+  recorte de negativos y escalado a pico/volumen objetivo.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SMOOTH_METHODS = ("none", "mean", "savgol")
+SCALE_MODES = ("none", "peak", "volume")
+
+
+def trapezoid_weights(times_hours: np.ndarray) -> np.ndarray:
+    """
+    Pesos w (T,) tales que Σ w·q = ∫ q dt (regla trapezoidal con pasos irregulares), en segundos:
+    w_i = (Δt_{i-1} + Δt_i) / 2 · 3600.  Volumen de todas las secciones: w @ Q.
+    """
+    t = np.asarray(times_hours, dtype=float) * 3600.0
+    w = np.zeros_like(t)
+    if t.shape[0] > 1:
+        dt = np.diff(t)
+        w[:-1] += dt / 2.0
+        w[1:] += dt / 2.0
+    return w
+
+
+# ---------------- huecos ----------------
+def fill_gaps(times_hours: np.ndarray, Q: np.ndarray, max_gap: int | None = None,
+              extrapolate: bool = False) -> np.ndarray:
+    """
+    Interpolación lineal en el tiempo de los NaN de cada columna (vectorizado sobre T×S):
+    índice del último dato válido (acumulado hacia delante) y del siguiente (hacia atrás).
+    - max_gap: solo rellena huecos de hasta ese nº de pasos (None = todos).
+    - extrapolate: bordes sin dato a un lado → se repite el valor más cercano (si no, quedan NaN).
+    """
+    Q = np.array(Q, dtype=float, copy=True)
+    T = Q.shape[0]
+    if T == 0:
+        return Q
+    t = np.asarray(times_hours, dtype=float)
+    valid = np.isfinite(Q)
+    if valid.all():
+        return Q
+    rows = np.arange(T)[:, None]
+    prev = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+    nxt = np.minimum.accumulate(np.where(valid, rows, T)[::-1], axis=0)[::-1]
+    # solo se evalúan las celdas vacías (no se crean matrices T×S de trabajo extra)
+    ti, si = np.nonzero(~valid)
+    p, n = prev[ti, si], nxt[ti, si]
+    has_prev, has_next = p >= 0, n < T
+    inner = has_prev & has_next
+    if max_gap is not None:
+        inner &= (n - p - 1) <= max_gap
+    pi, ni = p[inner], n[inner]
+    tp, tn = t[pi], t[ni]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = np.where(tn > tp, (t[ti[inner]] - tp) / (tn - tp), 0.0)
+    qp, qn = Q[pi, si[inner]], Q[ni, si[inner]]
+    Q[ti[inner], si[inner]] = qp + frac * (qn - qp)
+    if extrapolate:
+        lead = ~has_prev & has_next
+        trail = has_prev & ~has_next
+        Q[ti[lead], si[lead]] = Q[n[lead], si[lead]]
+        Q[ti[trail], si[trail]] = Q[p[trail], si[trail]]
+    return Q
+
+
+# ---------------- suavizado ----------------
+def _pad_edges(Q: np.ndarray, half: int) -> np.ndarray:
+    return np.pad(Q, ((half, half), (0, 0)), mode="edge")
+
+
+def moving_average(Q: np.ndarray, window: int) -> np.ndarray:
+    """
+    Media móvil centrada (ventana impar, en nº de pasos) que ignora NaN: sumas acumuladas de
+    valores y de conteos → O(T·S) sin depender del tamaño de ventana. NaN original se mantiene.
+    """
+    Q = np.asarray(Q, dtype=float)
+    window = max(1, int(window) | 1)
+    if window == 1 or Q.shape[0] == 0:
+        return Q.copy()
+    half = window // 2
+    P = _pad_edges(Q, half)
+    valid = np.isfinite(P)
+    zeros = np.zeros((1, Q.shape[1]))
+    csum = np.concatenate([zeros, np.cumsum(np.where(valid, P, 0.0), axis=0)])
+    ccnt = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+    s = csum[window:] - csum[:-window]
+    c = ccnt[window:] - ccnt[:-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = s / c
+    out[~np.isfinite(Q)] = np.nan
+    return out
+
+
+def savgol_coeffs(window: int, polyorder: int) -> np.ndarray:
+    """Coeficientes de Savitzky–Golay (valor suavizado en el centro) por mínimos cuadrados."""
+    half = window // 2
+    x = np.arange(-half, half + 1, dtype=float)
+    A = np.vander(x, polyorder + 1, increasing=True)   # (window, p+1)
+    return np.linalg.pinv(A)[0]                         # fila del término independiente
+
+
+def savgol(Q: np.ndarray, window: int, polyorder: int = 2) -> np.ndarray:
+    """
+    Filtro de Savitzky–Golay a lo largo del tiempo (pasos de muestra; bordes replicados).
+    Vectorizado: vista de ventanas deslizantes (T, S, window) @ coeficientes. Los NaN se rellenan
+    antes (fill_gaps) y vuelven a NaN después, para que no contaminen la ventana.
+    """
+    Q = np.asarray(Q, dtype=float)
+    window = max(3, int(window) | 1)
+    polyorder = int(min(max(polyorder, 0), window - 1))
+    if Q.shape[0] < window:
+        return Q.copy()
+    nan = ~np.isfinite(Q)
+    base = fill_gaps(np.arange(Q.shape[0], dtype=float), Q, extrapolate=True) if nan.any() else Q
+    base = np.where(np.isfinite(base), base, 0.0)
+    P = _pad_edges(base, window // 2)
+    win = sliding_window_view(P, window, axis=0)        # (T, S, window) sin copiar
+    out = win @ savgol_coeffs(window, polyorder)
+    out[nan] = np.nan
+    return out
+
+
+# ---------------- escalado ----------------
+def scale_factors(times_hours: np.ndarray, Q: np.ndarray, mode: str, target) -> np.ndarray:
+    """
+    Factor por sección (S,) para llevar el pico (nanmax) o el volumen (trapecio) a `target`
+    (escalar o (S,)). Columnas sin dato o con pico/volumen 0 → factor 1.
+    """
+    S = Q.shape[1]
+    if mode == "none" or target is None:
+        return np.ones(S)
+    target = np.broadcast_to(np.asarray(target, dtype=float), (S,))
+    finite = np.isfinite(Q)
+    if mode == "peak":
+        current = np.where(finite, Q, -np.inf).max(axis=0, initial=-np.inf)
+    elif mode == "volume":
+        current = trapezoid_weights(times_hours) @ np.where(finite, Q, 0.0)
+    else:
+        raise ValueError(f"Modo de escalado inválido: {mode!r}")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f = target / current
+    return np.where(np.isfinite(f) & (current > 0) & np.isfinite(target), f, 1.0)
+
+
+# ---------------- pipeline ----------------
+@dataclass
+class AdjustParams:
+    """Parámetros del ajuste (se aplican en este orden: huecos → suavizado → negativos → escala)."""
+    fill_gaps: bool = True
+    max_gap: int | None = None          # pasos; None = sin límite
+    extrapolate: bool = False
+    smooth: str = "none"                # none | mean | savgol
+    window: int = 5                     # pasos (impar)
+    polyorder: int = 2
+    clip_negative: bool = True
+    scale: str = "none"                 # none | peak | volume
+    target: float | np.ndarray | None = None
+    columns: np.ndarray | None = None   # secciones a las que se aplica el escalado (None = todas)
+
+
+def adjust_discharges(times_hours: np.ndarray, Q: np.ndarray, params: AdjustParams) -> np.ndarray:
+    """Q ajustado (T×S) según `params`; no modifica la matriz de entrada."""
+    if params.smooth not in SMOOTH_METHODS:
+        raise ValueError(f"Suavizado inválido: {params.smooth!r}")
+    out = np.array(Q, dtype=float, copy=True)
+    if out.size == 0:
+        return out
+    if params.fill_gaps:
+        out = fill_gaps(times_hours, out, params.max_gap, params.extrapolate)
+    if params.smooth == "mean":
+        out = moving_average(out, params.window)
+    elif params.smooth == "savgol":
+        out = savgol(out, params.window, params.polyorder)
+    if params.clip_negative:
+        np.maximum(out, 0.0, out=out, where=np.isfinite(out))
+    if params.scale != "none" and params.target is not None:
+        f = scale_factors(times_hours, out, params.scale, params.target)
+        if params.columns is not None:
+            keep = np.ones(out.shape[1], dtype=bool)
+            keep[np.asarray(params.columns, dtype=int)] = False
+            f[keep] = 1.0
+        out *= f[None, :]
+    return out
+
+
+# ---------------- resumen por sección ----------------
+SUMMARY_BLOCK_ELEMS = 8 * 1024 * 1024   # celdas por bloque de columnas (memoria de trabajo acotada)
+
+
+@dataclass
+class HydroSummary:
+    """Pico, hora del pico y volumen de cada sección (arreglos (S,); NaN si la sección no tiene datos)."""
+    sections: list[str]
+    peak: np.ndarray
+    t_peak: np.ndarray
+    volume: np.ndarray          # ∫ Q dt  [m³ si Q en m³/s]
+    n_valid: np.ndarray         # nº de tiempos con dato
+
+    def as_columns(self) -> tuple[list[str], list[np.ndarray]]:
+        headers = ["Sección", "Q pico", "t pico (h)", "Volumen", "N datos"]
+        return headers, [np.array(self.sections, dtype=object), self.peak, self.t_peak, self.volume,
+                         self.n_valid]
+
+
+def hydrograph_summary(times_hours: np.ndarray, Q: np.ndarray, sections: list[str]) -> HydroSummary:
+    """
+    Una pasada vectorizada por bloques de columnas:
+    - pico / hora del pico: argmax con NaN → −inf (secciones sin dato → NaN);
+    - volumen: pesos trapezoidales (pasos irregulares) @ Q con NaN → 0.
+    Los bloques evitan duplicar la matriz completa (10k × 10k ya ocupa 800 MB).
+    """
+    t = np.asarray(times_hours, dtype=float)
+    Q = np.asarray(Q, dtype=float)
+    T, S = Q.shape
+    w = trapezoid_weights(t)
+    peak = np.full(S, np.nan)
+    t_peak = np.full(S, np.nan)
+    volume = np.full(S, np.nan)
+    n_valid = np.zeros(S, dtype=np.int64)
+    if T == 0:
+        return HydroSummary(list(sections), peak, t_peak, volume, n_valid)
+    block = max(1, SUMMARY_BLOCK_ELEMS // T)
+    for s0 in range(0, S, block):
+        s1 = min(S, s0 + block)
+        Qb = Q[:, s0:s1]
+        finite = np.isfinite(Qb)
+        cnt = finite.sum(axis=0)
+        idx = np.where(finite, Qb, -np.inf).argmax(axis=0)
+        has = cnt > 0
+        n_valid[s0:s1] = cnt
+        peak[s0:s1] = np.where(has, Qb[idx, np.arange(s1 - s0)], np.nan)
+        t_peak[s0:s1] = np.where(has, t[idx], np.nan)
+        volume[s0:s1] = np.where(has, w @ np.where(finite, Qb, 0.0), np.nan)
+    return HydroSummary(list(sections), peak, t_peak, volume, n_valid)
@@ -0,0 +1,75 @@
+# modules/flow2d/flow2d_index.py
+"""
+Índice de navegación tiempo × sección (se arma una vez al parsear, XSECIParser.parse):
+- sections: unión global ordenada de IDs; times: eje de tiempos ya ordenado.
+- present (T, S) bool: la sección existe en ese tiempo → "¿qué secciones hay en t?" y
+  "siguiente sección disponible" sin re-ordenar claves ni recorrer el dict de datos.
+La interfaz usa modelos compartidos (flow2d_models.LabelListModel) sobre times/sections: pasar de
+un tiempo a otro solo cambia la fila de `present` que se consulta, nunca la lista de IDs.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+@dataclass
+class NavIndex:
+    times: list[str]
+    sections: list[str]
+    present: np.ndarray                      # (T, S) bool
+    time_pos: dict[str, int] = field(default_factory=dict, repr=False)
+    section_pos: dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        if not self.time_pos:
+            self.time_pos = {t: i for i, t in enumerate(self.times)}
+        if not self.section_pos:
+            self.section_pos = {s: j for j, s in enumerate(self.sections)}
+
+    def nbytes(self) -> int:
+        return self.present.nbytes
+
+    def sections_at(self, t: int) -> np.ndarray:
+        """Índices (en sections) de las secciones presentes en el tiempo t."""
+        if not 0 <= t < len(self.times):
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.present[t])
+
+    def has(self, t: int, s: int) -> bool:
+        return 0 <= t < len(self.times) and 0 <= s < len(self.sections) and bool(self.present[t, s])
+
+    def step_section(self, t: int, s: int, step: int = 1) -> int | None:
+        """Siguiente (step=+1) o anterior (−1) sección presente en t a partir de s (excluida)."""
+        if not 0 <= t < len(self.times):
+            return None
+        row = self.present[t]
+        if step > 0:
+            nxt = np.flatnonzero(row[s + 1:])
+            return int(s + 1 + nxt[0]) if len(nxt) else None
+        prv = np.flatnonzero(row[:max(s, 0)])
+        return int(prv[-1]) if len(prv) else None
+
+    def nearest_section(self, t: int, s: int) -> int | None:
+        """s si está presente en t; si no, la presente más cercana (primero hacia adelante)."""
+        if self.has(t, s):
+            return s
+        nxt = self.step_section(t, s, +1)
+        return nxt if nxt is not None else self.step_section(t, s, -1)
+
+
+def build_nav_index(data: dict, times: list[str]) -> NavIndex:
+    """Una pasada por las claves (tiempo → secciones): unión ordenada de IDs + matriz de presencia."""
+    pos: dict[str, int] = {}
+    ti, si = [], []
+    for i, t in enumerate(times):
+        for sid in data.get(t) or ():
+            ti.append(i)
+            si.append(pos.setdefault(sid, len(pos)))
+    sections = sorted(pos)
+    remap = np.empty(len(pos), dtype=np.intp)
+    remap[[pos[s] for s in sections]] = np.arange(len(sections))
+    present = np.zeros((len(times), len(sections)), dtype=bool)
+    if ti:
+        present[np.asarray(ti), remap[np.asarray(si)]] = True
+    return NavIndex(list(times), sections, present)
@@ -0,0 +1,230 @@
+# modules/flow2d/flow2d_models.py
+"""
+Modelos de tabla virtualizados: leen de arreglos NumPy bajo demanda (solo celdas visibles).
+Modelos de lista compartidos (tiempos / IDs de sección) para combos y listas con filtro.
+"""
+from __future__ import annotations
+from typing import Callable, Sequence
+
+import numpy as np
+from PyQt6.QtCore import Qt, QAbstractTableModel, QAbstractListModel, QIdentityProxyModel, QModelIndex  # type: ignore
+
+
+def format_cell(val) -> str:
+    """Formato por defecto: NaN/None → vacío, floats con repr corto, resto str()."""
+    if val is None:
+        return ""
+    if isinstance(val, (float, np.floating)):
+        return "" if np.isnan(val) else repr(float(val))
+    if isinstance(val, np.integer):
+        return str(int(val))
+    return str(val)
+
+
+def fixed_format(decimals: int) -> Callable[[object], str]:
+    """Devuelve un formateador con decimales fijos (NaN → vacío)."""
+    def _fmt(val) -> str:
+        if val is None:
+            return ""
+        try:
+            f = float(val)
+        except (TypeError, ValueError):
+            return str(val)
+        return "" if np.isnan(f) else f"{f:.{decimals}f}"
+    return _fmt
+
+
+class _ReadOnlyArrayModel(QAbstractTableModel):
+    """
+    Base común: solo lectura, sin items por celda.
+    La vista solo pide DisplayRole de las celdas visibles → el formateo es perezoso.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._headers: list[str] = []
+        self._formats: list[Callable[[object], str]] = []
+        self._n_rows = 0
+
+    # --- API Qt ---
+    def rowCount(self, parent=QModelIndex()) -> int:  # noqa: N802 (API Qt)
+        return 0 if parent.isValid() else self._n_rows
+
+    def columnCount(self, parent=QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):  # noqa: N802
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._headers[section] if 0 <= section < len(self._headers) else None
+        return str(section + 1)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            r, c = index.row(), index.column()
+            return self._formats[c](self._value(r, c))
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    # --- A implementar ---
+    def _value(self, row: int, col: int):
+        raise NotImplementedError
+
+    def _set_formats(self, n_cols: int, formats):
+        if formats is None:
+            self._formats = [format_cell] * n_cols
+        elif callable(formats):
+            self._formats = [formats] * n_cols
+        else:
+            self._formats = [f or format_cell for f in formats]
+
+    def clear(self, headers: Sequence[str] | None = None):
+        """Deja el modelo vacío (conserva encabezados salvo que se pasen otros)."""
+        self.beginResetModel()
+        self._n_rows = 0
+        if headers is not None:
+            self._headers = list(headers)
+            self._set_formats(len(self._headers), None)
+        self._clear_data()
+        self.endResetModel()
+
+    def _clear_data(self):
+        pass
+
+
+class ColumnsTableModel(_ReadOnlyArrayModel):
+    """
+    Tabla por columnas: cada columna es un arreglo 1D (vista NumPy, sin copia) o None (vacía).
+    Ideal para df de XSECI/XSECS: se pasa `df[col].to_numpy()` sin tocar el DataFrame.
+    """
+    def __init__(self, headers: Sequence[str] = (), parent=None):
+        super().__init__(parent)
+        self._headers = list(headers)
+        self._cols: list[np.ndarray | None] = [None] * len(self._headers)
+        self._set_formats(len(self._headers), None)
+
+    def set_columns(self, headers: Sequence[str], columns: Sequence[np.ndarray | None], formats=None):
+        """Reemplaza los datos (reset O(1): no recorre filas)."""
+        if len(headers) != len(columns):
+            raise ValueError("headers y columns deben tener la misma longitud")
+        self.beginResetModel()
+        self._headers = list(headers)
+        self._cols = [None if c is None else np.asarray(c) for c in columns]
+        self._n_rows = max((len(c) for c in self._cols if c is not None), default=0)
+        self._set_formats(len(self._headers), formats)
+        self.endResetModel()
+
+    def _value(self, row, col):
+        arr = self._cols[col]
+        if arr is None or row >= len(arr):
+            return None
+        return arr[row]
+
+    def _clear_data(self):
+        self._cols = [None] * len(self._headers)
+
+
+class MatrixTableModel(_ReadOnlyArrayModel):
+    """
+    Tabla 'eje + matriz': columna 0 = eje (p.ej. tiempo en horas), columnas 1.. = matrix[:, j].
+    Pensada para hidrogramas T×S: no crea T×S items, solo formatea lo visible.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._axis: np.ndarray | None = None
+        self._matrix: np.ndarray | None = None
+
+    def set_matrix(self, axis_header: str, axis: np.ndarray, col_headers: Sequence[str],
+                   matrix: np.ndarray, axis_format=None, value_format=None):
+        axis = np.asarray(axis)
+        matrix = np.asarray(matrix)
+        if matrix.ndim != 2 or matrix.shape[0] != axis.shape[0] or matrix.shape[1] != len(col_headers):
+            raise ValueError(f"Dimensiones incompatibles: axis={axis.shape}, matrix={matrix.shape}")
+        self.beginResetModel()
+        self._headers = [axis_header, *col_headers]
+        self._axis = axis
+        self._matrix = matrix
+        self._n_rows = int(axis.shape[0])
+        self._formats = [axis_format or format_cell] + [value_format or format_cell] * len(col_headers)
+        self.endResetModel()
+
+    def _value(self, row, col):
+        if col == 0:
+            return self._axis[row]
+        return self._matrix[row, col - 1]
+
+    def _clear_data(self):
+        self._axis = None
+        self._matrix = None
+
+
+class LabelListModel(QAbstractListModel):
+    """
+    Lista de etiquetas (tiempos o IDs de sección) compartida por varios combos/listas: se carga una
+    vez por archivo y cada vista la filtra/enmascara con su propio proxy (sin copiar items).
+    """
+    def __init__(self, labels: Sequence[str] = (), parent=None):
+        super().__init__(parent)
+        self._labels: list[str] = []
+        self._row_of: dict[str, int] = {}
+        self.set_labels(labels)
+
+    def set_labels(self, labels: Sequence[str]):
+        self.beginResetModel()
+        self._labels = list(labels)
+        self._row_of = {s: i for i, s in enumerate(self._labels)}
+        self.endResetModel()
+
+    def labels(self) -> list[str]:
+        return self._labels
+
+    def label(self, row: int) -> str:
+        return self._labels[row] if 0 <= row < len(self._labels) else ""
+
+    def row_of(self, label: str) -> int:
+        """Fila de una etiqueta en O(1) (−1 si no existe); findText recorre toda la lista."""
+        return self._row_of.get(label, -1)
+
+    def rowCount(self, parent=QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self._labels)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self._labels[index.row()]
+        return None
+
+
+class PresenceProxyModel(QIdentityProxyModel):
+    """
+    Misma lista, con las filas ausentes deshabilitadas según una máscara booleana (p.ej. las secciones
+    que no existen en el tiempo actual = fila de NavIndex.present). Cambiar la máscara no reconstruye
+    nada: solo avisa a las vistas que repinten.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._mask: np.ndarray | None = None
+
+    def set_mask(self, mask: np.ndarray | None):
+        self._mask = mask
+        n = self.rowCount()
+        if n:
+            self.dataChanged.emit(self.index(0, 0), self.index(n - 1, 0))
+
+    def is_enabled(self, row: int) -> bool:
+        return self._mask is None or (0 <= row < len(self._mask) and bool(self._mask[row]))
+
+    def flags(self, index):
+        f = super().flags(index)
+        if index.isValid() and not self.is_enabled(index.row()):
+            f &= ~(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)
+        return f
@@ -4,16 +4,93 @@ from dataclasses import dataclass
 from typing import Any, Dict
 import os
 
+import numpy as np
+
+from utils.tracing import span
+
 # Import real del lector XSECS (ya actualizado por ti)
 from .flow2d_xsecs import parse_xsecs  # debe estar en el PYTHONPATH del proyecto
 
-from .flow2d_xseci import parse_xseci, ParseCancelled  # ⬅️ NUEVO
+from .flow2d_xseci import parse_xseci, ParseCancelled, time_label_to_hours, time_label_to_seconds  # ⬅️ NUEVO
+from .flow2d_index import NavIndex, build_nav_index
+from .flow2d_xsech import parse_xsech, seconds_to_time_label
 
 @dataclass
 class ParseResult:
-    """Resultado normalizado del parseo."""
+    """
+    Resultado normalizado del parseo.
+    time_seconds: eje de tiempo numérico (int64, segundos, creciente) alineado 1:1 con meta["times"]
+    (XSECI y XSECH). Búsquedas por valor con searchsorted: time_index / time_range.
+    nav: índice tiempo × sección (flow2d_index.NavIndex) para navegar sin recorrer data (solo XSECI).
+    """
     meta: Dict[str, Any]
     data: Any  # p.ej., dict[str, dict[str, Any]] con "coords" (DataFrame), etc.
+    time_seconds: np.ndarray | None = None
+    nav: NavIndex | None = None
+
+    @property
+    def time_hours(self) -> np.ndarray | None:
+        """Eje de tiempo en horas (float) o None si el resultado no tiene tiempos."""
+        return None if self.time_seconds is None else self.time_seconds / 3600.0
+
+    def hours_by_label(self) -> dict[str, float]:
+        """etiqueta → horas, sin volver a parsear etiquetas si existe time_seconds."""
+        times = self.meta.get("times") or []
+        if self.time_seconds is not None and len(self.time_seconds) == len(times):
+            return dict(zip(times, (self.time_seconds / 3600.0).tolist()))
+        return {t: time_label_to_hours(t) for t in times}
+
+    def time_index(self, seconds: float, side: str = "nearest") -> int:
+        """
+        Índice en meta["times"] para un tiempo dado (s):
+        side="left" → primer tiempo ≥ valor, "right" → último ≤ valor, "nearest" → el más cercano.
+        Devuelve -1 si no hay tiempos (o si "left"/"right" cae fuera del rango).
+        """
+        ts = self.time_seconds
+        if ts is None or len(ts) == 0:
+            return -1
+        i = int(np.searchsorted(ts, seconds, side="left"))
+        if side == "left":
+            return i if i < len(ts) else -1
+        if side == "right":
+            return int(np.searchsorted(ts, seconds, side="right")) - 1
+        if i == 0:
+            return 0
+        if i == len(ts):
+            return len(ts) - 1
+        return i if (ts[i] - seconds) < (seconds - ts[i - 1]) else i - 1
+
+    def time_range(self, start_s: float, end_s: float) -> slice:
+        """slice de meta["times"] con start_s ≤ t ≤ end_s (dos searchsorted, sin recorrer etiquetas)."""
+        ts = self.time_seconds
+        if ts is None:
+            return slice(0, 0)
+        return slice(int(np.searchsorted(ts, start_s, side="left")),
+                     int(np.searchsorted(ts, end_s, side="right")))
+
+    def q_matrix(self) -> np.ndarray:
+        """
+        Caudales (T, S) alineados con meta["times"] × meta["ids"], NaN sin dato.
+        XSECH ya trae la matriz (data["Q"]); en XSECI se arma con el Q de cada bloque.
+        """
+        Q = self.data.get("Q") if self.meta.get("type") == "XSECH" else None
+        if Q is not None:
+            return Q
+        times = list(self.meta.get("times") or self.data.keys())
+        ids = list(self.meta.get("ids") or sorted({sid for t in self.data for sid in self.data[t]}))
+        col_of = {sid: j for j, sid in enumerate(ids)}
+        Q = np.full((len(times), len(ids)), np.nan, dtype=float)
+        for i, t in enumerate(times):
+            for sid, sec in (self.data.get(t) or {}).items():
+                j = col_of.get(sid)
+                q = sec.get("Q")
+                if j is None or q is None:
+                    continue
+                try:
+                    Q[i, j] = float(q)
+                except (TypeError, ValueError):
+                    pass
+        return Q
 
 
 class BaseParser:
@@ -35,12 +112,37 @@ class XSECIParser(BaseParser):
         if not os.path.isfile(path):
             raise FileNotFoundError(f"[{self.tipo}] No existe el archivo: {path}")
 
-        data = parse_xseci(path, progress_cb=progress_cb, cancel_cb=cancel_cb)
-        times = list(data.keys())
-        ids = sorted({sid for t in times for sid in data[t].keys()})
+        with span("XSECI.parse", "parse", path=path) as sp:
+            with span("XSECI.read", "parse") as sp_read:
+                stats: dict = {}
+                data = parse_xseci(path, progress_cb=progress_cb, cancel_cb=cancel_cb, stats=stats)
+                sp_read.set(**stats)
+            with span("XSECI.index", "parse"):
+                times, seconds = self._time_axis(data)
+                nav = build_nav_index(data, times)
+                ids = nav.sections
+            sp.set(times=len(times), sections=len(ids))
         meta = {"type": self.tipo, "source": path, "times": times, "ids": ids}
         print(f"[{self.tipo}] OK: tiempos={len(times)}, secciones únicas={len(ids)}")
-        return ParseResult(meta=meta, data=data)
+        return ParseResult(meta=meta, data=data, time_seconds=seconds, nav=nav)
+
+    @staticmethod
+    def _time_axis(data) -> tuple[list[str], np.ndarray]:
+        """
+        Etiquetas ordenadas por tiempo + segundos (int64) alineados. Usa los segundos que el lector
+        guardó al leer cada TIME:; un bloque sin TIME ('Unknown') queda primero con -1.
+        """
+        labels = list(data.keys())
+        known = getattr(data, "time_seconds", {})
+        secs = []
+        for t in labels:
+            s = known.get(t)
+            if s is None:
+                s = time_label_to_seconds(t)
+            secs.append(-1 if s is None else s)
+        seconds = np.asarray(secs, dtype=np.int64)
+        order = np.argsort(seconds, kind="stable")
+        return [labels[i] for i in order], seconds[order]
 
 class XSECSParser(BaseParser):
     """Parser para archivos .XSECS (secciones transversales)."""
@@ -56,7 +158,8 @@ class XSECSParser(BaseParser):
             raise FileNotFoundError(f"[{self.tipo}] No existe el archivo: {path}")
 
         try:
-            sections = parse_xsecs(path)  # ← tu implementación real
+            with span("XSECS.parse", "parse", path=path):
+                sections = parse_xsecs(path)  # ← tu implementación real
             if not isinstance(sections, dict):
                 raise TypeError(f"[{self.tipo}] El parser devolvió un tipo inesperado: {type(sections)!r}")
 
@@ -84,9 +187,25 @@ class XSECSParser(BaseParser):
 
 
 class XSECHParser(BaseParser):
-    """Parser para .XSECH (stub por ahora)."""
+    """
+    Parser para .XSECH (hidrogramas): eje de tiempo + matriz Q (T×S) directa, sin bloques por estación.
+    data = {"Q": ndarray (T, S)}; meta["times"] con el mismo formato de etiqueta que XSECI.
+    """
     tipo = "XSECH"
 
-    def parse(self, path: str) -> ParseResult:
-        print(f"[{self.tipo}] (stub) parseo no implementado aún: {path}")
-        raise NotImplementedError(f"[{self.tipo}] Parser pendiente de implementación")
+    def parse(self, path: str, progress_cb=None, cancel_cb=None) -> ParseResult:
+        print(f"[{self.tipo}] Iniciando parseo: {path}")
+        if not isinstance(path, str) or not path.strip():
+            raise ValueError(f"[{self.tipo}] Ruta inválida: {path!r}")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"[{self.tipo}] No existe el archivo: {path}")
+
+        with span("XSECH.parse", "parse", path=path) as sp:
+            h = parse_xsech(path, progress_cb=progress_cb, cancel_cb=cancel_cb)
+            seconds = np.rint(h.time_seconds).astype(np.int64)
+            times = [seconds_to_time_label(int(s)) for s in seconds]
+            sp.set(times=len(times), sections=len(h.sections))
+        meta = {"type": self.tipo, "source": path, "times": times, "ids": list(h.sections),
+                "n_sections": len(h.sections), "Q_units": h.q_units}
+        print(f"[{self.tipo}] OK: tiempos={len(times)}, secciones={len(h.sections)}")
+        return ParseResult(meta=meta, data={"Q": h.Q}, time_seconds=seconds)
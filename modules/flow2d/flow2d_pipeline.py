@@ -2,11 +2,13 @@
 from dataclasses import dataclass
 from typing import Dict, Any
 from .flow2d_parsers import ParseResult
+from utils.tracing import traced
 
 @dataclass
 class Flow2DState:
     variables: Dict[str, Any]
 
+@traced("compute_variables", "derive")
 def compute_variables(result: ParseResult) -> Flow2DState:
     #print(f"[PIPELINE] compute_variables(meta={result.meta})")
     # Fantasma: deriva variables mínimas
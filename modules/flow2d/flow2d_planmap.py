@@ -0,0 +1,249 @@
+# modules/flow2d/flow2d_planmap.py
+"""
+Mapa en planta: geometría de las secciones (XSECS) unida por ID con los resultados (XSECI).
+- Geometría: polilíneas del XSECS; si no hay XSECS, los extremos de cada sección que trae el XSECI
+  (coords_text "x1 y1 x2 y2", convertido una vez por sección, no por tiempo).
+- Métricas: matrices (T, S) de máximos por bloque armadas desde el índice de consultas
+  (flow2d_query.ZoneMapIndex, ya construido al cargar): sin volver a recorrer los DataFrames.
+- Render: UNA LineCollection para todo el modelo; cambiar tiempo o métrica solo cambia el arreglo
+  de colores (set_array), nunca los segmentos → repintado inmediato aunque haya miles de secciones.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+import warnings
+
+import numpy as np
+import matplotlib  # type: ignore
+from matplotlib.collections import LineCollection  # type: ignore
+
+from .flow2d_parsers import ParseResult
+from .flow2d_query import ZoneMapIndex
+from utils.tracing import traced
+
+# (etiqueta, columna del índice, ¿por tiempo?) — "máx." = máximo en todos los tiempos
+PLAN_METRICS = (
+    ("Profundidad máx. (m)", "DEPTH", False),
+    ("Velocidad máx. (m/s)", "VEL_NORM", False),
+    ("Q pico (m³/s)", "Q", False),
+    ("Profundidad en t (m)", "DEPTH", True),
+    ("Velocidad en t (m/s)", "VEL_NORM", True),
+    ("Q en t (m³/s)", "Q", True),
+)
+
+
+# ---------------- geometría ----------------
+@dataclass
+class PlanGeometry:
+    ids: list[str]
+    segments: list[np.ndarray]      # (n_i, 2) por sección, en el orden de ids
+    source: str                     # "XSECS" | "XSECI"
+
+    def __len__(self):
+        return len(self.ids)
+
+    def bounds(self) -> tuple[float, float, float, float] | None:
+        """(xmin, xmax, ymin, ymax) de todas las polilíneas (None si no hay vértices)."""
+        if not self.segments:
+            return None
+        P = np.concatenate(self.segments)
+        if not len(P):
+            return None
+        return float(P[:, 0].min()), float(P[:, 0].max()), float(P[:, 1].min()), float(P[:, 1].max())
+
+    def nbytes(self) -> int:
+        return sum(s.nbytes for s in self.segments)
+
+
+def geometry_from_xsecs(result: ParseResult | None) -> PlanGeometry | None:
+    """Polilíneas del XSECS (data[id]["coords"] con columnas x, y)."""
+    if result is None or result.meta.get("type") != "XSECS":
+        return None
+    ids, segs = [], []
+    for sid in result.meta.get("ids") or sorted(result.data):
+        df = (result.data.get(sid) or {}).get("coords")
+        if df is None or len(df) < 2:
+            continue
+        ids.append(sid)
+        segs.append(df[["x", "y"]].to_numpy(dtype=float))
+    return PlanGeometry(ids, segs, "XSECS") if ids else None
+
+
+def _xy_from_text(text: str) -> np.ndarray | None:
+    v = np.array(text.replace(",", " ").split(), dtype=float) if text else np.empty(0)
+    if len(v) < 4 or len(v) % 2:
+        return None
+    return v.reshape(-1, 2)
+
+
+def geometry_from_xseci(result: ParseResult | None) -> PlanGeometry | None:
+    """
+    Extremos de cada sección desde coords_text del XSECI (el mismo texto se repite en cada tiempo:
+    se toma el primer tiempo en que aparece la sección, vía NavIndex si existe).
+    """
+    if result is None or result.meta.get("type") != "XSECI":
+        return None
+    times = list(result.meta.get("times") or result.data.keys())
+    nav = result.nav
+    if nav is not None and nav.present.size:
+        first = nav.present.argmax(axis=0)   # primer tiempo con la sección
+        where = [(nav.times[i], sid) for sid, i in zip(nav.sections, first.tolist())]
+    else:
+        seen: dict[str, str] = {}
+        for t in times:
+            for sid in result.data.get(t) or {}:
+                seen.setdefault(sid, t)
+        where = [(t, sid) for sid, t in sorted(seen.items())]
+    ids, segs = [], []
+    for t, sid in where:
+        sec = (result.data.get(t) or {}).get(sid) or {}
+        try:
+            xy = _xy_from_text(sec.get("coords_text", ""))
+        except ValueError:
+            xy = None
+        if xy is not None:
+            ids.append(sid)
+            segs.append(xy)
+    return PlanGeometry(ids, segs, "XSECI") if ids else None
+
+
+# ---------------- métricas ----------------
+def _nanmax0(M: np.ndarray) -> np.ndarray:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)   # columnas todo NaN → NaN sin aviso
+        return np.nanmax(M, axis=0) if M.shape[0] else np.full(M.shape[1], np.nan)
+
+
+@dataclass
+class SectionMetrics:
+    """Valor por (tiempo, sección) de cada columna: máximo del bloque (DEPTH, VEL_NORM) o Q del bloque."""
+    times: list[str]
+    sections: list[str]
+    fields: dict[str, np.ndarray]                   # col → (T, S) float32, NaN sin bloque
+    _peak: dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.fields.values()) + sum(a.nbytes for a in self._peak.values())
+
+    def peak(self, col: str) -> np.ndarray:
+        """(S,) máximo en todos los tiempos (cacheado: cambiar de métrica no recalcula)."""
+        if col not in self._peak:
+            self._peak[col] = _nanmax0(self.fields[col])
+        return self._peak[col]
+
+    def values(self, metric: int, t: int) -> np.ndarray:
+        """(S,) valores de PLAN_METRICS[metric] (t solo se usa en las métricas por tiempo)."""
+        _label, col, per_time = PLAN_METRICS[metric]
+        if not per_time:
+            return self.peak(col)
+        M = self.fields[col]
+        return M[t] if 0 <= t < M.shape[0] else np.full(M.shape[1], np.nan, dtype=M.dtype)
+
+    def limits(self, metric: int) -> tuple[float, float] | None:
+        """Rango de color fijo por variable (el del máximo): los colores son comparables entre tiempos."""
+        v = self.peak(PLAN_METRICS[metric][1])
+        fin = v[np.isfinite(v)]
+        if not len(fin):
+            return None
+        M = self.fields[PLAN_METRICS[metric][1]]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            lo = float(np.nanmin(M))
+        return lo, float(fin.max())
+
+
+@traced("section_metrics", "derive")
+def section_metrics(index: ZoneMapIndex | None) -> SectionMetrics | None:
+    """Dispersa los zone maps (mín/máx por bloque) en matrices (T, S): una asignación por columna."""
+    if index is None:
+        return None
+    T, S = len(index.times), len(index.sections)
+    ok = index.block_sec >= 0
+    bt, bs = index.block_time[ok], index.block_sec[ok]
+    fields = {}
+    for col, src in (("DEPTH", index.zmax["DEPTH"]), ("VEL_NORM", index.zmax["VEL_NORM"]), ("Q", index.Q)):
+        M = np.full((T, S), np.nan, dtype=np.float32)
+        M[bt, bs] = src[ok]
+        fields[col] = M
+    return SectionMetrics(list(index.times), list(index.sections), fields)
+
+
+# ---------------- unión por ID ----------------
+@dataclass
+class PlanJoin:
+    cols: np.ndarray               # (G,) columna en metrics.sections de cada línea de geometría, −1 si no hay
+    only_geometry: list[str]
+    only_results: list[str]
+
+    @property
+    def matched(self) -> int:
+        return int((self.cols >= 0).sum())
+
+    def take(self, values: np.ndarray) -> np.ndarray:
+        """Valores por sección de resultados → valores por línea de geometría (NaN sin resultado)."""
+        out = np.full(len(self.cols), np.nan)
+        ok = self.cols >= 0
+        out[ok] = values[self.cols[ok]]
+        return out
+
+
+def join_geometry(geom: PlanGeometry, sections: list[str]) -> PlanJoin:
+    pos = {s: j for j, s in enumerate(sections)}
+    cols = np.fromiter((pos.get(i, -1) for i in geom.ids), dtype=np.intp, count=len(geom.ids))
+    in_geom = set(geom.ids)
+    return PlanJoin(cols, [i for i, c in zip(geom.ids, cols) if c < 0], [s for s in sections if s not in in_geom])
+
+
+# ---------------- render ----------------
+class PlanMapRenderer:
+    """
+    Todas las secciones en UNA LineCollection coloreada por valor (NaN → gris).
+    - set_geometry: crea la colección (solo al cambiar de geometría).
+    - set_values: set_array + límites del colorbar; no toca segmentos ni ejes.
+    """
+    def __init__(self, ax, cmap: str = "viridis"):
+        self.ax = ax
+        self._lc: LineCollection | None = None
+        self._cbar = None
+        self._cmap = matplotlib.colormaps[cmap].with_extremes(bad="lightgray")
+
+    @property
+    def collection(self) -> LineCollection | None:
+        return self._lc
+
+    def clear(self, title: str = ""):
+        if self._cbar is not None:
+            self._cbar.remove()
+            self._cbar = None
+        if self._lc is not None:
+            self._lc.remove()
+            self._lc = None
+        self.ax.set_title(title)
+
+    def set_geometry(self, geom: PlanGeometry | None):
+        self.clear()
+        if geom is None or not len(geom):
+            return
+        self._lc = LineCollection(geom.segments, cmap=self._cmap, linewidths=2.2, capstyle="round", picker=4)
+        self._lc.set_array(np.ma.masked_all(len(geom)))
+        self.ax.add_collection(self._lc)
+        b = geom.bounds()
+        if b is not None:
+            xmin, xmax, ymin, ymax = b
+            pad = 0.03 * max(xmax - xmin, ymax - ymin, 1e-9)
+            self.ax.set_xlim(xmin - pad, xmax + pad)
+            self.ax.set_ylim(ymin - pad, ymax + pad)
+        self.ax.set_aspect("equal", adjustable="datalim")
+        self._cbar = self.ax.figure.colorbar(self._lc, ax=self.ax, shrink=0.85)
+
+    def set_values(self, values: np.ndarray, label: str = "", clim: tuple[float, float] | None = None):
+        if self._lc is None:
+            return
+        v = np.ma.masked_invalid(np.asarray(values, dtype=float))
+        self._lc.set_array(v)
+        if clim is None and v.count():
+            clim = (float(v.min()), float(v.max()))
+        if clim is not None:
+            lo, hi = clim
+            self._lc.set_clim(lo, hi if hi > lo else lo + 1e-9)
+        if self._cbar is not None:
+            self._cbar.set_label(label)
@@ -0,0 +1,681 @@
+# modules/flow2d/flow2d_profile.py
+"""Perfil XSECI (terreno/agua + cortina de velocidad) con reutilización de artistas y blitting."""
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import threading
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # type: ignore
+from matplotlib.collections import LineCollection  # type: ignore
+from matplotlib.colorbar import Colorbar  # type: ignore
+from matplotlib.figure import Figure  # type: ignore
+from mpl_toolkits.axes_grid1 import make_axes_locatable  # type: ignore
+
+WSEL_COLOR = "#00AEEF"   # celeste cielo
+BEDEL_COLOR = "#8B5A2B"  # marrón tierra
+
+
+class RenderCancelled(Exception):
+    """Señal interna para cortar un render/exportación por cancelación del usuario."""
+    pass
+
+
+def profile_title(sec_id: str, time_label: str, sec: dict | None) -> str:
+    """Título estándar del perfil: 'ID @ tiempo  (Q=... unidades)'."""
+    sec = sec or {}
+    return f"{sec_id} @ {time_label}  (Q={sec.get('Q')} {sec.get('Q_units') or ''})"
+
+
+# ---------------- lienzos ----------------
+class ProfileCanvasMixin:
+    """
+    Figura con eje principal y (opcional) eje de colorbar fijo a la derecha.
+    Compartido por PlotCanvas (Qt, en pantalla) y OffscreenProfileCanvas (Agg puro).
+    """
+    def _setup_figure(self, use_colorbar: bool, figsize=(5, 4), dpi: int = 100) -> Figure:
+        self.use_colorbar = use_colorbar
+
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        # Layout según necesidad
+        if self.use_colorbar:
+            self.fig.set_constrained_layout(False)   # lo controlamos manualmente
+        else:
+            self.fig.set_constrained_layout(True)    # bonito por defecto
+
+        self.ax = self.fig.add_subplot(111)
+
+        # Colorbar solo si aplica (XSECI)
+        self.cax = None
+        self._cbar: Colorbar | None = None
+        if self.use_colorbar:
+            divider = make_axes_locatable(self.ax)
+            self.cax = divider.append_axes("right", size="5%", pad=0.12)
+            # ✅ márgenes razonables (no los vuelvas a tocar en otro lado)
+            # left/right: deja sitio a colorbar fija; bottom: para xlabel + leyenda
+            self.fig.subplots_adjust(left=0.08, right=0.86, top=0.92, bottom=0.34)
+        return self.fig
+
+    def clear(self):
+        """Limpia el eje principal y gestiona el colorbar sin romper la geometría."""
+        if self.use_colorbar:
+            # colorbar
+            if self._cbar is not None:
+                try:
+                    self._cbar.remove()
+                except Exception:
+                    pass
+                finally:
+                    self._cbar = None
+
+            # cax: recrea si fue eliminado, o límpialo si existe
+            if self.cax is None or self.cax not in self.fig.axes:
+                divider = make_axes_locatable(self.ax)
+                self.cax = divider.append_axes("right", size="5%", pad=0.12)
+            else:
+                try:
+                    self.cax.cla()
+                except Exception:
+                    pass
+
+        # eje principal
+        self.ax.clear()
+        self.draw_idle()
+
+    def get_or_update_colorbar(self, mappable, label: str | None = None) -> Colorbar | None:
+        """Crea/actualiza el colorbar en cax fijo (si use_colorbar=True)."""
+        if not self.use_colorbar:
+            return None
+
+        # garantiza cax
+        if self.cax is None or self.cax not in self.fig.axes:
+            divider = make_axes_locatable(self.ax)
+            self.cax = divider.append_axes("right", size="5%", pad=0.12)
+
+        if self._cbar is None:
+            self._cbar = self.fig.colorbar(mappable, cax=self.cax)
+        else:
+            self._cbar.update_normal(mappable)
+
+        if label:
+            self._cbar.set_label(label)
+        return self._cbar
+
+
+class OffscreenProfileCanvas(ProfileCanvasMixin, FigureCanvasAgg):
+    """Lienzo Agg sin Qt (mismo layout que el perfil en pantalla): video, lotes, miniaturas."""
+    def __init__(self, figsize=(8.0, 5.6), dpi: int = 100):
+        fig = self._setup_figure(True, figsize=figsize, dpi=dpi)
+        super().__init__(fig)
+
+    def draw_idle(self, *args, **kwargs):
+        # Off-screen no hay bucle de eventos: el dibujo se hace explícito con draw()
+        self.figure.stale = True
+
+    def rgba(self) -> np.ndarray:
+        """Dibuja y devuelve el buffer RGBA (H, W, 4) como vista (sin copia)."""
+        self.draw()
+        return np.asarray(self.buffer_rgba())
+
+
+# ---------------- extracción de columnas ----------------
+def get_col(df, *candidates):
+    """Columna como ndarray float probando varios nombres (y prefijo como fallback)."""
+    for name in candidates:
+        if name in df.columns:
+            return df[name].astype(float).to_numpy()
+    # heurística: buscar por prefijo
+    for cand in candidates:
+        for col in df.columns:
+            if col.replace(" ", "").startswith(cand.replace(" ", "")):
+                try: return df[col].astype(float).to_numpy()
+                except Exception: pass
+    return None
+
+
+@dataclass
+class ProfileData:
+    """Series alineadas de un perfil (wsl/vel opcionales)."""
+    st: np.ndarray
+    bed: np.ndarray
+    wsl: np.ndarray | None = None
+    vel: np.ndarray | None = None
+
+    def segments(self) -> np.ndarray:
+        """Segmentos verticales terreno→agua (N, 2, 2) para la cortina de velocidad."""
+        return np.stack([np.column_stack([self.st, self.bed]),
+                         np.column_stack([self.st, self.wsl])], axis=1)
+
+
+def extract_profile(df) -> ProfileData | None:
+    """ProfileData desde el df de una sección; None si faltan STATION/BEDEL."""
+    st = get_col(df, "STATION(m)", "STATION")
+    bed = get_col(df, "BEDEL(m)", "BEDEL")
+    if (st is None) or (bed is None):
+        return None
+    wsl = get_col(df, "WSEL(m)", "WSEL")
+    vel = get_col(df, "VEL_NORM(m/s)", "VEL_NORM")
+    # Alinea longitudes (evita errores si alguna serie es más larga)
+    st = np.asarray(st, dtype=float)
+    bed = np.asarray(bed, dtype=float)
+    n = min(len(st), len(bed))
+    return ProfileData(
+        st=st[:n], bed=bed[:n],
+        wsl=None if wsl is None else np.asarray(wsl, dtype=float)[:n],
+        vel=None if vel is None else np.asarray(vel, dtype=float)[:n],
+    )
+
+
+# ---------------- aspecto ----------------
+def apply_pretty_aspect(ax):
+    """Vista estética: rectangular estable."""
+    try:
+        ax.set_aspect("auto")
+        ax.set_box_aspect(0.6)   # 0.5..0.8 a gusto
+    except Exception:
+        pass
+
+
+def apply_equal_aspect_custom(ax, x, y1, y2=None):
+    """
+    Escala 1:1 sin aplastar:
+    - X: [0, Xmax]
+    - Altura mínima en Y = 0.25 * Xmax (si los datos son más planos).
+    - Y centrado alrededor del centro de los datos.
+    """
+    # --- saneo de datos ---
+    x = np.asarray(x, float)
+    y1 = np.asarray(y1, float)
+    if y2 is not None:
+        y2 = np.asarray(y2, float)
+
+    x = x[np.isfinite(x)]
+    yvals = y1[np.isfinite(y1)]
+    if y2 is not None:
+        yvals = np.concatenate([yvals, y2[np.isfinite(y2)]])
+
+    if x.size == 0 or yvals.size == 0:
+        # fallback amable
+        ax.autoscale(enable=True, tight=True)
+        try: ax.set_aspect("equal", adjustable="box")
+        except Exception: pass
+        return ax.get_xlim(), ax.get_ylim()
+
+    # --- eje X ---
+    xmin = 0.0
+    xmax = float(np.nanmax(x))
+    if not np.isfinite(xmax) or xmax <= 0:
+        xmax = 1.0  # evita rango 0 en X
+
+    # --- eje Y ---
+    y_min = float(np.nanmin(yvals))
+    y_max = float(np.nanmax(yvals))
+    y_mid = 0.5 * (y_min + y_max)
+    y_span_data = max(y_max - y_min, 0.0)
+
+    y_span_target = max(0.25 * xmax, y_span_data)  # ≥ 25% de Xmax
+    # si quedara 0 por algún caso extremo, abre un epsilon
+    if y_span_target <= 0:
+        y_span_target = 1.0
+
+    y_lower = y_mid - y_span_target / 2.0
+    y_upper = y_mid + y_span_target / 2.0
+    if y_lower == y_upper:
+        y_lower -= 0.5
+        y_upper += 0.5
+
+    ax.set_xlim(xmin, xmax)
+    ax.set_ylim(y_lower, y_upper)
+    try:
+        ax.set_aspect("equal", adjustable="box")
+    except Exception:
+        pass
+    # Devuelve límites para uso posterior
+    return (xmin, xmax), (y_lower, y_upper)
+
+
+def _data_bounds(data: ProfileData):
+    ys = data.bed if data.wsl is None else np.concatenate([data.bed, data.wsl])
+    with np.errstate(all="ignore"):
+        return (float(np.nanmin(data.st)), float(np.nanmax(data.st)),
+                float(np.nanmin(ys)), float(np.nanmax(ys)))
+
+
+# ---------------- artistas ----------------
+class ProfileArtists:
+    """
+    Dueño de los artistas del perfil sobre un lienzo tipo PlotCanvas
+    (atributos fig/ax, métodos clear()/get_or_update_colorbar()/draw_idle()).
+
+    - build(): reconstrucción completa (limpia ejes, líneas, cortina, colorbar, leyenda, aspecto).
+    - update(): reusa los artistas y solo cambia datos (set_data/set_segments/set_array + norma).
+      Si la vista actual aún contiene los datos (misma sección) no toca límites y usa blitting:
+      se restaura el fondo y se dibujan solo los artistas dinámicos.
+      Tras un breve reposo se "asienta": los artistas dejan de ser animados y se hace un
+      draw normal, así savefig/portapapeles/toolbar siempre ven la figura completa.
+    """
+    SETTLE_MS = 250
+
+    def __init__(self, canvas, blit: bool = True):
+        self.canvas = canvas
+        self.use_blit = blit
+        # Límites/escala fijos opcionales (p.ej. video: ejes estables en toda la secuencia)
+        self.fixed_bounds: tuple[float, float, float, float] | None = None
+        self.fixed_clim: tuple[float, float] | None = None
+        self.bed_line = None
+        self.wsl_line = None
+        self.lc: LineCollection | None = None
+        self._aspect_mode: str | None = None
+        self._st: np.ndarray | None = None
+        self._bg = None
+        self._scrubbing = False
+        self._settle_timer = None
+        # Caché opcional de frames ya rasterizados (ver FrameCache)
+        self.frame_cache: FrameCache | None = None
+        self._frame_key = None     # clave del frame en curso (se captura en el próximo draw completo)
+        self._auto_lims = None     # límites calculados por nosotros (≠ → el usuario hizo zoom/pan)
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    # --------- API ---------
+    def render(self, data: ProfileData, title: str, aspect_mode: str, full: bool = False,
+               cache_key=None):
+        """
+        Punto de entrada: usa update() si es posible, build() si no.
+        cache_key (p.ej. (tiempo, sección, tema)): si el frame ya está en frame_cache se
+        restaura su imagen sin redibujar; si no, se guarda tras el próximo draw completo.
+        """
+        self._frame_key = None
+        if cache_key is not None and self.frame_cache is not None and not full:
+            key = (*cache_key, aspect_mode, *self._canvas_size())
+            if self._restore_frame(key, data, title, aspect_mode):
+                return
+            self._frame_key = key
+        if full or not self._compatible(data, aspect_mode):
+            self.build(data, title, aspect_mode)
+        else:
+            self.update(data, title)
+
+    def build(self, data: ProfileData, title: str, aspect_mode: str):
+        """Dibujo completo (equivale al antiguo _plot_profile)."""
+        self._stop_scrub()
+        c = self.canvas
+        c.clear()
+        ax = c.ax
+        st, bed, wsl, vel = data.st, data.bed, data.wsl, data.vel
+
+        # Trazos base: primero agua (debajo), luego terreno (encima)
+        self.wsl_line = None
+        if wsl is not None:
+            self.wsl_line, = ax.plot(st, wsl, linewidth=2, color=WSEL_COLOR, label="Nivel (WSEL)", zorder=2)
+        self.bed_line, = ax.plot(st, bed, linewidth=2.5, color=BEDEL_COLOR, label="Terreno (BEDEL)", zorder=3)
+
+        # Cortina coloreada por velocidad (si hay wsl y vel)
+        self.lc = None
+        if (wsl is not None) and (vel is not None):
+            self.lc = LineCollection(data.segments(), cmap="viridis", array=vel,
+                                     linewidths=2, alpha=0.85, zorder=1)
+            ax.add_collection(self.lc)
+            if self.fixed_clim is not None:
+                self._apply_clim(data)
+            # crea/actualiza el colorbar en el cax fijo, sin cambiar layout
+            c.get_or_update_colorbar(self.lc, label="Velocidad (m/s)")
+        elif getattr(c, "_cbar", None):
+            # Si no hay velocidad, no dejar colorbar “huérfano”
+            try:
+                c._cbar.remove()
+            except Exception:
+                pass
+            c._cbar = None
+
+        # Títulos y etiquetas de ejes
+        ax.set_title(title or "Perfil XSECI")
+        ax.set_xlabel("Distancia (m)", labelpad=10)  # un poco más de espacio
+        ax.set_ylabel("Elevación (m)")
+
+        self._apply_limits(data, aspect_mode)
+
+        # Mostrar leyenda solo si hay al menos 1 línea con label
+        handles, _labels = ax.get_legend_handles_labels()
+        if handles:
+            ax.legend(
+                loc="upper center",
+                bbox_to_anchor=(0.5, -0.25),
+                bbox_transform=ax.transAxes,
+                ncol=2,
+                fontsize=8,
+                frameon=True,
+                borderaxespad=0.3,
+            )
+
+        # Cuadrícula y render final
+        ax.grid(True, linestyle=":", alpha=0.6)
+        self._aspect_mode = aspect_mode
+        self._st = st
+        c.draw_idle()
+
+    def update(self, data: ProfileData, title: str):
+        """Solo datos: reusa artistas. Blitting si la vista no cambia."""
+        ax = self.canvas.ax
+        st = data.st
+        if self.wsl_line is not None:
+            self.wsl_line.set_data(st, data.wsl)
+        self.bed_line.set_data(st, data.bed)
+        ax.title.set_text(title or "Perfil XSECI")
+
+        same_section = self._st is not None and self._st.shape == st.shape and np.array_equal(self._st, st)
+        view_ok = same_section and self._fits_view(data)
+        if not view_ok:
+            self._apply_limits(data, self._aspect_mode or "pretty")
+        self._st = st
+
+        if self.lc is not None:
+            self.lc.set_segments(data.segments())
+            self.lc.set_array(data.vel)
+            self._apply_clim(data)   # el colorbar escucha a la norma (update_normal)
+
+        if view_ok and self._can_blit():
+            self._blit()
+        else:
+            self._bg = None
+            self.canvas.draw_idle()
+        self._arm_settle()
+
+    def settle(self):
+        """Sale del modo scrub: artistas normales y draw completo (para exportar/copiar)."""
+        if self._scrubbing:
+            self._stop_scrub()
+            self.canvas.draw()
+
+    # --------- caché de frames ---------
+    def _canvas_size(self) -> tuple[int, int, float]:
+        w, h = self.canvas.fig.bbox.size
+        return int(w), int(h), float(self.canvas.fig.dpi)
+
+    def _current_lims(self):
+        ax = self.canvas.ax
+        return ax.get_xlim(), ax.get_ylim()
+
+    def _restore_frame(self, key, data: ProfileData, title: str, aspect_mode: str) -> bool:
+        """
+        Acierto en caché: deja los artistas en el estado del frame (solo datos, barato) y pinta
+        los píxeles guardados con restore_region + blit, sin pasar por draw().
+        Solo si la estructura es la misma y el usuario no tiene un zoom/pan propio.
+        """
+        entry = self.frame_cache.get(key)
+        if entry is None or not self._can_blit() or not self._compatible(data, aspect_mode):
+            return False
+        if self._auto_lims is not None and self._current_lims() != self._auto_lims:
+            return False
+        region, xlim, ylim = entry
+        self._stop_scrub()
+        ax = self.canvas.ax
+        if self.wsl_line is not None:
+            self.wsl_line.set_data(data.st, data.wsl)
+        self.bed_line.set_data(data.st, data.bed)
+        ax.title.set_text(title or "Perfil XSECI")
+        if self.lc is not None:
+            self.lc.set_segments(data.segments())
+            self.lc.set_array(data.vel)
+            self._apply_clim(data)
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
+        self._auto_lims = (xlim, ylim)
+        self._st = data.st
+        c = self.canvas
+        c.restore_region(region)
+        c.blit(c.fig.bbox)
+        return True
+
+    def _store_frame(self):
+        """Tras un draw completo: guarda los píxeles del frame actual (si no hay zoom del usuario)."""
+        if self._frame_key is None or self.frame_cache is None:
+            return
+        lims = self._current_lims()
+        if lims != self._auto_lims:
+            return
+        c = self.canvas
+        w, h = c.fig.bbox.size
+        self.frame_cache.put(self._frame_key, (c.copy_from_bbox(c.fig.bbox), *lims),
+                             int(w) * int(h) * 4)
+        self._frame_key = None
+
+    # --------- internos ---------
+    def _compatible(self, data: ProfileData, aspect_mode: str) -> bool:
+        ax = self.canvas.ax
+        if self.bed_line is None or self.bed_line not in ax.lines:
+            return False   # alguien limpió el eje
+        if aspect_mode != self._aspect_mode:
+            return False
+        if (data.wsl is None) != (self.wsl_line is None):
+            return False
+        has_curtain = data.wsl is not None and data.vel is not None
+        if has_curtain != (self.lc is not None):
+            return False
+        return True
+
+    def _apply_clim(self, data: ProfileData):
+        if self.fixed_clim is not None:
+            vmin, vmax = self.fixed_clim
+        else:
+            with np.errstate(all="ignore"):
+                vmin, vmax = float(np.nanmin(data.vel)), float(np.nanmax(data.vel))
+        if np.isfinite(vmin) and np.isfinite(vmax):
+            self.lc.set_clim(vmin, vmax)
+
+    def _apply_limits(self, data: ProfileData, aspect_mode: str):
+        self._set_limits(data, aspect_mode)
+        self._auto_lims = self._current_lims()
+
+    def _set_limits(self, data: ProfileData, aspect_mode: str):
+        ax = self.canvas.ax
+        if self.fixed_bounds is not None:
+            # límites de toda la secuencia: se calculan como si fuera un perfil "envolvente"
+            x0, x1, y0, y1 = self.fixed_bounds
+            data = ProfileData(st=np.array([x0, x1]), bed=np.array([y0, y1]))
+        st, bed, wsl = data.st, data.bed, data.wsl
+        # Altura mínima visible (por si el perfil es muy "plano")
+        _x0, _x1, y_min, y_max = _data_bounds(data)
+        if np.isfinite(y_min) and np.isfinite(y_max):
+            span = y_max - y_min
+            min_span = 1.0  # mínimo en unidades de elevación (m)
+            if span < min_span:
+                pad = (min_span - span) / 2 or 0.5
+                ax.set_ylim(y_min - pad, y_max + pad)
+
+        # Aspecto (proporción). Modo 1:1 vs “pretty”
+        if aspect_mode == "equal":
+            apply_equal_aspect_custom(ax, st, bed, wsl)
+            ax.set_autoscale_on(False)
+            ax.set_autoscalex_on(False)
+            ax.set_autoscaley_on(False)
+        else:
+            # Vista “bonita”: relación caja estable y márgenes suaves
+            apply_pretty_aspect(ax)
+            if self.fixed_bounds is not None:
+                x0, x1, y0, y1 = _data_bounds(data)
+                dx, dy = (x1 - x0) * 0.05 or 0.5, (y1 - y0) * 0.05 or 0.5
+                ax.set_xlim(x0 - dx, x1 + dx)
+                ax.set_ylim(y0 - dy, y1 + dy)
+                return
+            ax.relim()
+            ax.autoscale(enable=True, tight=True)
+            ax.margins(0.05)
+            ax.autoscale_view()
+
+    def _fits_view(self, data: ProfileData) -> bool:
+        x0, x1, y0, y1 = _data_bounds(data)
+        if not all(np.isfinite(v) for v in (x0, x1, y0, y1)):
+            return False
+        (vx0, vx1), (vy0, vy1) = self.canvas.ax.get_xlim(), self.canvas.ax.get_ylim()
+        return vx0 <= x0 and x1 <= vx1 and vy0 <= y0 and y1 <= vy1
+
+    def _dynamic_artists(self) -> list:
+        ax = self.canvas.ax
+        arts = [a for a in (self.lc, self.wsl_line, self.bed_line) if a is not None]
+        arts.append(ax.title)
+        cax = getattr(self.canvas, "cax", None)
+        if self.lc is not None and cax is not None:
+            arts.append(cax)   # el colorbar cambia con la norma en cada paso
+        return arts
+
+    def _can_blit(self) -> bool:
+        return self.use_blit and getattr(self.canvas, "supports_blit", False)
+
+    def _blit(self):
+        c = self.canvas
+        if not self._scrubbing:
+            # 1er paso del scrub: fondo sin artistas dinámicos (draw síncrono → _on_draw)
+            self._scrubbing = True
+            self._set_animated(True)
+            c.draw()
+            return
+        if self._bg is None:
+            c.draw_idle()
+            return
+        c.restore_region(self._bg)
+        self._draw_dynamic()
+        c.blit(c.fig.bbox)
+
+    def _on_draw(self, _event):
+        if not self._scrubbing:
+            self._store_frame()
+            return
+        c = self.canvas
+        self._bg = c.copy_from_bbox(c.fig.bbox)
+        self._draw_dynamic()
+
+    def _draw_dynamic(self):
+        fig = self.canvas.fig
+        for a in self._dynamic_artists():
+            fig.draw_artist(a)
+
+    def _set_animated(self, on: bool):
+        for a in self._dynamic_artists():
+            a.set_animated(on)
+
+    def _stop_scrub(self):
+        if self._settle_timer is not None:
+            self._settle_timer.stop()
+        if self._scrubbing:
+            self._set_animated(False)
+        cax = getattr(self.canvas, "cax", None)
+        if cax is not None:
+            cax.set_animated(False)
+        self._scrubbing = False
+        self._bg = None
+
+    def _arm_settle(self):
+        if not self._scrubbing:
+            return
+        if self._settle_timer is None:
+            self._settle_timer = self.canvas.new_timer(interval=self.SETTLE_MS)
+            self._settle_timer.single_shot = True
+            self._settle_timer.add_callback(self._on_settle)
+        self._settle_timer.stop()
+        self._settle_timer.start()
+
+    def _on_settle(self):
+        if self._scrubbing:
+            self._stop_scrub()
+            self.canvas.draw_idle()
+
+
+# ---------------- caché de frames ----------------
+class FrameCache:
+    """
+    LRU de frames rasterizados (regiones Agg de copy_from_bbox) acotada por bytes.
+    La clave la arma ProfileArtists: (tiempo, sección, tema, modo de aspecto, ancho, alto, dpi),
+    así un cambio de tamaño/aspecto/tema simplemente no acierta y lo viejo sale por LRU.
+    Al cargar datos nuevos hay que llamar a clear().
+    """
+    def __init__(self, max_bytes: int = 192 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict = OrderedDict()   # key -> (entry, nbytes)
+        self._bytes = 0
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            return None
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key, entry, nbytes: int):
+        if nbytes > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._items[key] = (entry, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            _k, (_e, n) = self._items.popitem(last=False)
+            self._bytes -= n
+
+    def clear(self):
+        self._items.clear()
+        self._bytes = 0
+
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# ---------------- prefetch ----------------
+class ProfilePrefetcher:
+    """
+    Extrae ProfileData por adelantado en un hilo de fondo (p.ej. próximos tiempos en reproducción).
+    - request(items): items = [(key, df)], encola solo lo que no está ni en caché ni en curso.
+    - get(key): ProfileData listo o None (nunca bloquea la GUI).
+    Caché acotada (LRU) para no crecer sin límite.
+    """
+    def __init__(self, max_items: int = 256):
+        self.max_items = max_items
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xseci-prefetch")
+        self._cache: OrderedDict = OrderedDict()
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def request(self, items):
+        with self._lock:
+            gen = self._generation
+            todo = [(k, df) for k, df in items if k not in self._cache and k not in self._pending]
+            self._pending.update(k for k, _ in todo)
+        for key, df in todo:
+            self._pool.submit(self._work, gen, key, df)
+
+    def get(self, key) -> ProfileData | None:
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+            return data
+
+    def clear(self):
+        """Invalida todo (datos nuevos); lo que esté en curso se descarta al terminar."""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+            self._pending.clear()
+
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(sum(a.nbytes for a in (d.st, d.bed, d.wsl, d.vel) if a is not None)
+                       for d in self._cache.values())
+
+    def _work(self, gen: int, key, df):
+        try:
+            data = extract_profile(df) if df is not None and not df.empty else None
+        except Exception:
+            data = None
+        with self._lock:
+            self._pending.discard(key)
+            if data is None or gen != self._generation:
+                return
+            self._cache[key] = data
+            while len(self._cache) > self.max_items:
+                self._cache.popitem(last=False)
@@ -0,0 +1,66 @@
+# modules/flow2d/flow2d_qimage.py
+"""
+Puente Agg → QImage sin codificar/decodificar PNG.
+El buffer RGBA del renderer Agg se envuelve tal cual como QImage (Format_RGBA8888);
+solo se copia cuando Qt necesita ser dueño de los píxeles (portapapeles, caché de miniaturas).
+"""
+from __future__ import annotations
+
+import numpy as np
+from PyQt6.QtGui import QImage  # type: ignore
+
+
+def rgba_to_qimage(rgba: np.ndarray, copy: bool = False) -> QImage:
+    """
+    (H, W, 4) uint8 → QImage que apunta a la misma memoria (stride respetado, sin copia).
+    El arreglo queda referenciado por la imagen; con copy=True se devuelve una imagen independiente.
+    """
+    arr = np.asarray(rgba)
+    if arr.ndim != 3 or arr.shape[2] != 4 or arr.dtype != np.uint8:
+        raise ValueError(f"Se esperaba RGBA uint8 (H, W, 4), llegó {arr.dtype} {arr.shape}")
+    if arr.strides[1:] != (4, 1):
+        arr = np.ascontiguousarray(arr)   # filas con píxeles no contiguos: QImage no los admite
+    h, w = arr.shape[:2]
+    img = QImage(arr.data, w, h, arr.strides[0], QImage.Format.Format_RGBA8888)
+    if copy:
+        return img.copy()
+    img._buffer = arr   # mantiene viva la memoria mientras exista la imagen
+    return img
+
+
+def canvas_to_qimage(canvas, copy: bool = False) -> QImage:
+    """Frame actual de un lienzo Agg (en pantalla o off-screen) tal como quedó tras el último draw."""
+    return rgba_to_qimage(np.asarray(canvas.buffer_rgba()), copy=copy)
+
+
+class _RawSink:
+    """'Archivo' que recibe el buffer del renderer en print_raw y se queda con la vista (sin copiar)."""
+    def __init__(self):
+        self.buffer = None
+
+    def write(self, data):
+        self.buffer = data   # memoryview (H, W, 4) del renderer temporal
+        return len(data) if hasattr(data, "__len__") else 0
+
+    def seek(self, *_):   # requisito de matplotlib para aceptar un objeto archivo
+        return 0
+
+    def flush(self):
+        pass
+
+
+def figure_to_qimage(fig, dpi: float | None = None, bbox_inches: str | None = "tight",
+                     copy: bool = True, **savefig_kw) -> QImage:
+    """
+    Renderiza la figura a los DPI pedidos (mismo recorte que savefig) y devuelve un QImage.
+    Usa el formato 'raw' de Agg: el renderer escribe su buffer y lo envolvemos sin PNG intermedio.
+    copy=True (por defecto) entrega una imagen dueña de sus píxeles (p.ej. para el portapapeles).
+    """
+    sink = _RawSink()
+    fig.savefig(sink, format="raw", dpi=dpi or fig.dpi, bbox_inches=bbox_inches,
+                facecolor=savefig_kw.pop("facecolor", fig.get_facecolor()),
+                edgecolor=savefig_kw.pop("edgecolor", fig.get_edgecolor()),
+                **savefig_kw)
+    if sink.buffer is None:
+        raise RuntimeError("El backend no entregó el buffer RGBA")
+    return rgba_to_qimage(np.asarray(sink.buffer), copy=copy)
@@ -0,0 +1,259 @@
+# modules/flow2d/flow2d_query.py
+"""
+Consultas sobre todo un resultado XSECI, p.ej. "DEPTH > 1.5 o VEL_NORM > 3":
+¿qué secciones superan un umbral, en qué tiempos y en qué estaciones?
+- Índice columnar (build_zone_maps, al cargar): cada variable de todos los bloques (tiempo, sección)
+  en un solo arreglo + offsets por bloque, y "zone maps" = mín/máx por bloque (np.*.reduceat).
+  Es una copia aparte de los DataFrames: variables en float32 (~4 B × 6 columnas por fila) y
+  STATION en float64 (8 B/fila), ≈ 32 B por fila del XSECI además del resultado cargado.
+- query(): los zone maps descartan los bloques que no pueden cumplir; solo las filas de los bloques
+  candidatos se evalúan, todo con NumPy (sin recorrer DataFrames).
+- Sintaxis: predicados "COLUMNA op valor" (op: > >= < <= = == !=) unidos con y/and/& y o/or/|
+  ("y" tiene precedencia: A y B o C = (A y B) o C).
+Sin Qt: el panel está en flow2d_widget.py (XSECITab ▸ Consultar).
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+import re
+import time
+
+import numpy as np
+
+from .flow2d_parsers import ParseResult
+from .flow2d_xseci import WANTED, float_matrix
+from utils.tracing import span, traced
+
+QUERY_COLUMNS = ("DEPTH", "WSEL", "VEL_NORM", "FROUDE", "BEDEL", "QS_NORM", "Q")   # Q = caudal del bloque
+OPERATORS = {
+    ">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal,
+    "==": np.equal, "=": np.equal, "!=": np.not_equal,
+}
+# bloque candidato según (mín, máx) del bloque: ¿alguna fila puede cumplir "col op v"?
+_ZONE_TEST = {
+    ">": lambda lo, hi, v: hi > v,
+    ">=": lambda lo, hi, v: hi >= v,
+    "<": lambda lo, hi, v: lo < v,
+    "<=": lambda lo, hi, v: lo <= v,
+    "==": lambda lo, hi, v: (lo <= v) & (v <= hi),
+    "=": lambda lo, hi, v: (lo <= v) & (v <= hi),
+    "!=": lambda lo, hi, v: (lo != v) | (hi != v),
+}
+_ROW_COLS = [c for c in QUERY_COLUMNS if c != "Q"]
+_PRED_RE = re.compile(r"^\s*([A-Za-z_]+)\s*(>=|<=|==|!=|>|<|=)\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*$")
+
+
+class QueryCancelled(Exception):
+    """Señal interna para cortar la construcción del índice por cancelación del usuario."""
+    pass
+
+
+# ---------------- expresión ----------------
+@dataclass(frozen=True)
+class Predicate:
+    column: str
+    op: str
+    value: float
+
+    def __str__(self):
+        return f"{self.column} {self.op} {self.value:g}"
+
+
+def parse_query(text: str) -> list[list[Predicate]]:
+    """'DEPTH > 1.5 y WSEL < 101 o VEL_NORM >= 3' → [[DEPTH>1.5, WSEL<101], [VEL_NORM>=3]] (OR de ANDs)."""
+    text = (text or "").strip()
+    if not text:
+        raise ValueError("Consulta vacía")
+    disjuncts = []
+    for part in re.split(r"\s+(?:o|or)\s+|\|", text, flags=re.IGNORECASE):
+        conj = []
+        for term in re.split(r"\s+(?:y|and)\s+|&", part, flags=re.IGNORECASE):
+            m = _PRED_RE.match(term)
+            if not m:
+                raise ValueError(f"Condición inválida: {term.strip()!r} (formato: COLUMNA > valor)")
+            col = m.group(1).upper()
+            if col not in QUERY_COLUMNS:
+                raise ValueError(f"Columna desconocida: {col} (disponibles: {', '.join(QUERY_COLUMNS)})")
+            conj.append(Predicate(col, m.group(2), float(m.group(3))))
+        disjuncts.append(conj)
+    return disjuncts
+
+
+def query_columns(dnf: list[list[Predicate]]) -> list[str]:
+    """Columnas usadas por la consulta, en orden de aparición (para mostrar sus valores)."""
+    return list(dict.fromkeys(p.column for conj in dnf for p in conj))
+
+
+# ---------------- índice ----------------
+@dataclass
+class QueryResult:
+    """Filas (tiempo, sección, estación) que cumplen la consulta + estadísticas del recorrido."""
+    expression: str
+    times: list[str]
+    sections: list[str]
+    t_idx: np.ndarray          # (n,) índice en times
+    s_idx: np.ndarray          # (n,) índice en sections
+    station: np.ndarray        # (n,)
+    values: dict[str, np.ndarray]
+    blocks_total: int
+    blocks_scanned: int
+    blocks_matched: int
+    elapsed: float
+
+    def __len__(self):
+        return len(self.t_idx)
+
+    @property
+    def n_sections(self) -> int:
+        return int(np.unique(self.s_idx).size)
+
+    def as_columns(self) -> tuple[list[str], list[np.ndarray]]:
+        times = np.array(self.times, dtype=object)
+        sections = np.array(self.sections, dtype=object)
+        headers = ["Tiempo", "Sección", "Estación", *self.values.keys()]
+        return headers, [times[self.t_idx], sections[self.s_idx], self.station, *self.values.values()]
+
+
+@dataclass
+class ZoneMapIndex:
+    """
+    Columnas de todos los bloques concatenadas (orden tiempo → sección) y mín/máx por bloque.
+    Bloque b = filas offsets[b]:offsets[b+1]; block_time/block_sec → índices en times/sections.
+    """
+    times: list[str]
+    sections: list[str]
+    block_time: np.ndarray     # (B,) int32
+    block_sec: np.ndarray      # (B,) int32
+    offsets: np.ndarray        # (B+1,) int64
+    station: np.ndarray        # (N,) float64
+    columns: dict[str, np.ndarray]   # col → (N,) float32 (≈7 cifras: suficiente para umbrales)
+    Q: np.ndarray              # (B,) caudal del bloque
+    zmin: dict[str, np.ndarray]      # col → (B,)  (NaN si el bloque no tiene datos en esa columna)
+    zmax: dict[str, np.ndarray]
+
+    @property
+    def n_blocks(self) -> int:
+        return len(self.block_time)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.station)
+
+    def nbytes(self) -> int:
+        arrays = [self.block_time, self.block_sec, self.offsets, self.station, self.Q,
+                  *self.columns.values(), *self.zmin.values(), *self.zmax.values()]
+        return sum(a.nbytes for a in arrays)
+
+    def _row_values(self, col: str, rows: np.ndarray | None, blocks_of_rows: np.ndarray | None) -> np.ndarray:
+        if col == "Q":
+            lens = np.diff(self.offsets)
+            return np.repeat(self.Q, lens) if blocks_of_rows is None else self.Q[blocks_of_rows]
+        return self.columns[col] if rows is None else self.columns[col][rows]
+
+    def candidates(self, dnf: list[list[Predicate]]) -> np.ndarray:
+        """Máscara (B,) de bloques que podrían cumplir (NaN en los zone maps → nunca cumple)."""
+        out = np.zeros(self.n_blocks, dtype=bool)
+        with np.errstate(invalid="ignore"):
+            for conj in dnf:
+                m = np.ones(self.n_blocks, dtype=bool)
+                for p in conj:
+                    m &= _ZONE_TEST[p.op](self.zmin[p.column], self.zmax[p.column], p.value)
+                out |= m
+        return out
+
+    @traced("query", "query")
+    def query(self, text: str) -> QueryResult:
+        t0 = time.perf_counter()
+        dnf = parse_query(text)
+        cand = np.flatnonzero(self.candidates(dnf))
+        B = self.n_blocks
+        lens = np.diff(self.offsets)
+        if len(cand) > B // 2:
+            rows, brow = None, None      # casi todo es candidato: evaluar las columnas completas
+            n = self.n_rows
+        else:
+            cl = lens[cand]
+            n = int(cl.sum())
+            # filas de los bloques candidatos sin bucle: inicio de bloque repetido + posición dentro
+            starts = np.repeat(self.offsets[cand] - np.concatenate([[0], np.cumsum(cl)[:-1]]), cl)
+            rows = starts + np.arange(n)
+            brow = np.repeat(cand, cl)
+        hit = np.zeros(n, dtype=bool)
+        with np.errstate(invalid="ignore"):
+            for conj in dnf:
+                m = np.ones(n, dtype=bool)
+                for p in conj:
+                    v = self._row_values(p.column, rows, brow)
+                    m &= OPERATORS[p.op](v, p.value) & np.isfinite(v)
+                hit |= m
+        sel = np.flatnonzero(hit)
+        if rows is not None:
+            hit_rows, hit_blocks = rows[sel], brow[sel]
+        else:
+            hit_rows = sel
+            hit_blocks = np.searchsorted(self.offsets, sel, side="right") - 1
+        values = {c: self._row_values(c, hit_rows, hit_blocks) for c in query_columns(dnf)}
+        res = QueryResult(text, self.times, self.sections,
+                          self.block_time[hit_blocks], self.block_sec[hit_blocks], self.station[hit_rows],
+                          values, B, len(cand), int(np.unique(hit_blocks).size), time.perf_counter() - t0)
+        print(f"[QUERY] {text!r}: {len(res)} filas en {res.blocks_matched} bloques "
+              f"({res.blocks_scanned}/{B} bloques evaluados) en {res.elapsed * 1000:.1f} ms")
+        return res
+
+
+def _reduce_blocks(values: np.ndarray, starts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Mín/máx por bloque ignorando NaN (bloques sin dato → NaN)."""
+    finite = np.isfinite(values)
+    lo = np.minimum.reduceat(np.where(finite, values, np.inf), starts)
+    hi = np.maximum.reduceat(np.where(finite, values, -np.inf), starts)
+    empty = ~np.isfinite(lo)
+    lo[empty] = np.nan
+    hi[empty] = np.nan
+    return lo, hi
+
+
+@traced("build_zone_maps", "derive")
+def build_zone_maps(result: ParseResult, progress_cb=None, cancel_cb=None) -> ZoneMapIndex | None:
+    """
+    Índice columnar + zone maps de un resultado XSECI (None si no es XSECI o no tiene filas).
+    - progress_cb(done:int, total:int) ; cancel_cb() -> bool (mismo contrato que parse_xseci).
+    """
+    if result is None or result.meta.get("type") != "XSECI":
+        return None
+    times = list(result.meta.get("times") or result.data.keys())
+    sections = list(result.meta.get("ids") or sorted({s for t in result.data for s in result.data[t]}))
+    sec_of = {s: j for j, s in enumerate(sections)}
+    pos = [WANTED.index("STATION"), *(WANTED.index(c) for c in _ROW_COLS)]
+    bt, bs, q, stations, mats = [], [], [], [], []
+    for i, t in enumerate(times):
+        for sid, sec in (result.data.get(t) or {}).items():
+            df = sec.get("df")
+            if df is None or df.empty:
+                continue
+            m = float_matrix(df, WANTED)[:, pos]
+            stations.append(m[:, 0])
+            mats.append(m[:, 1:].astype(np.float32))   # float32 por bloque: sin pico de una copia float64
+            bt.append(i)
+            bs.append(sec_of.get(sid, -1))
+            qv = sec.get("Q")
+            q.append(np.nan if qv is None else float(qv))
+        if cancel_cb and cancel_cb():
+            raise QueryCancelled()
+        if progress_cb:
+            progress_cb(i + 1, len(times))
+    if not mats:
+        return None
+    with span("build_zone_maps.reduce", "derive", blocks=len(mats)):
+        lens = np.fromiter((len(m) for m in mats), dtype=np.int64, count=len(mats))
+        offsets = np.concatenate([[0], np.cumsum(lens)])
+        M = np.concatenate(mats)
+        starts = offsets[:-1]
+        del mats
+        columns = {c: np.ascontiguousarray(M[:, k]) for k, c in enumerate(_ROW_COLS)}
+        del M
+        zmin, zmax = {}, {}
+        for c, v in columns.items():
+            zmin[c], zmax[c] = _reduce_blocks(v, starts)
+        Q = np.asarray(q, dtype=float)
+        zmin["Q"], zmax["Q"] = Q, Q
+    return ZoneMapIndex(times, sections, np.asarray(bt, dtype=np.int32), np.asarray(bs, dtype=np.int32),
+                        offsets, np.concatenate(stations), columns, Q, zmin, zmax)
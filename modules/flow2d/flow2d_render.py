@@ -0,0 +1,238 @@
+# modules/flow2d/flow2d_render.py
+"""Render de alto volumen para hidrogramas: una sola LineCollection + decimación min/max por píxel."""
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Iterable
+import warnings
+
+import numpy as np
+import matplotlib  # type: ignore
+from matplotlib.collections import LineCollection  # type: ignore
+from matplotlib.lines import Line2D  # type: ignore
+
+
+def minmax_decimate(x: np.ndarray, Y: np.ndarray, x0: float, x1: float, n_buckets: int):
+    """
+    Decima varias series a resolución de pantalla (vectorizado sobre columnas).
+    - x: (T,) creciente; Y: (T, k)
+    - Para cada 'cubeta' (≈ 1 píxel) entre x0..x1 conserva el mínimo y el máximo (NaN-aware),
+      así los picos nunca se pierden.
+    - Incluye una muestra fuera de cada borde para que las líneas lleguen al marco.
+    Devuelve (xd, Yd) con xd: (M,), Yd: (M, k). Si no hace falta decimar, devuelve el tramo visible.
+    """
+    x = np.asarray(x, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    T = x.shape[0]
+    if T == 0:
+        return x, Y
+
+    i0 = max(int(np.searchsorted(x, x0, side="left")) - 1, 0)
+    i1 = min(int(np.searchsorted(x, x1, side="right")) + 1, T)
+    xv, Yv = x[i0:i1], Y[i0:i1]
+    n_buckets = max(int(n_buckets), 1)
+    if xv.shape[0] <= 2 * n_buckets:
+        return xv, Yv
+
+    # Inicio de cada cubeta (sin cubetas vacías)
+    edges = np.linspace(xv[0], xv[-1], n_buckets + 1)[:-1]
+    starts = np.unique(np.searchsorted(xv, edges, side="left"))
+    starts = starts[starts < xv.shape[0]]
+
+    with np.errstate(invalid="ignore"):
+        lo = np.fmin.reduceat(Yv, starts, axis=0)   # fmin/fmax ignoran NaN
+        hi = np.fmax.reduceat(Yv, starts, axis=0)
+
+    B, k = lo.shape
+    Yd = np.empty((2 * B, k), dtype=float)
+    Yd[0::2] = lo
+    Yd[1::2] = hi
+    xd = np.repeat(xv[starts], 2)
+    return xd, Yd
+
+
+class HydrographRenderer:
+    """
+    Dibuja las series seleccionadas como UNA LineCollection.
+    - Al cambiar la selección solo decima las series nuevas y quita las eliminadas.
+    - Al hacer zoom/pan o redimensionar, re-decima todo en una pasada vectorizada.
+    - Leyenda solo si hay pocas series (con cientos es ilegible y muy cara).
+    """
+    MAX_LEGEND = 12
+
+    def __init__(self, ax, title: str = "Hidrogramas",
+                 xlabel: str = "Tiempo (h)", ylabel: str = "Caudal (m³/s)"):
+        self.ax = ax
+        self._title, self._xlabel, self._ylabel = title, xlabel, ylabel
+        self._lc: LineCollection | None = None
+        self._x: np.ndarray | None = None
+        self._Q: np.ndarray | None = None
+        self._names: list[str] = []
+        self._col_min: np.ndarray | None = None
+        self._col_max: np.ndarray | None = None
+        self._segs: dict[int, np.ndarray] = {}     # col -> (n, 2) decimado
+        self._order: list[int] = []                # columnas seleccionadas (orden estable)
+        self._view: tuple[float, float, int] | None = None
+        self._fit_pending = True                   # ajustar límites en la próxima selección (datos nuevos)
+        self._auto_lims: tuple | None = None       # (xlim, ylim) puestos por _autoscale
+        self._cmap = matplotlib.colormaps["tab10"]
+        self._cid_xlim = None
+        self._cid_resize = None
+        self._busy = False
+
+    # ---------------- datos ----------------
+    def set_data(self, x: np.ndarray, Q: np.ndarray, names: list[str]):
+        """Nuevo eje/matriz: invalida todo lo decimado (la selección se vuelve a aplicar aparte)."""
+        self._x = np.asarray(x, dtype=float)
+        self._Q = np.asarray(Q, dtype=float)
+        self._names = list(names)
+        with _quiet_nan():
+            self._col_min = np.nanmin(self._Q, axis=0) if self._Q.size else np.empty(0)
+            self._col_max = np.nanmax(self._Q, axis=0) if self._Q.size else np.empty(0)
+        self._segs.clear()
+        self._order = []
+        self._view = None
+        self._fit_pending = True
+
+    def nbytes(self) -> int:
+        """Bytes de las series decimadas en caché (diagnóstico de memoria)."""
+        return sum(seg.nbytes for seg in self._segs.values())
+
+    def clear(self, title: str | None = None):
+        """Quita la colección y deja los ejes vacíos (con título opcional)."""
+        self._segs.clear()
+        self._order = []
+        if self._artist_alive():
+            self._lc.set_segments([])
+        leg = self.ax.get_legend()
+        if leg is not None:
+            leg.remove()
+        if title is not None:
+            self.ax.set_title(title)
+
+    # ---------------- selección ----------------
+    def set_selection(self, cols: Iterable[int]):
+        """Aplica la selección (índices de columna) tocando solo las series que cambian."""
+        if self._x is None or self._Q is None:
+            return
+        self._ensure_artist()
+        new_order = [int(c) for c in cols if 0 <= int(c) < self._Q.shape[1]]
+        new_set = set(new_order)
+        for c in [c for c in self._segs if c not in new_set]:
+            del self._segs[c]
+        self._order = new_order
+        # límites automáticos solo con datos nuevos o si el usuario no cambió la vista (zoom/pan)
+        if self._fit_pending or self._at_auto_limits():
+            self._autoscale()
+
+        view = self._current_view()
+        if view != self._view:
+            # la vista cambió (zoom/tamaño/límites): re-decima todo en una pasada
+            self._view = view
+            pending = new_order
+        else:
+            pending = [c for c in new_order if c not in self._segs]
+        if pending:
+            self._decimate_into(pending, view)
+        self._push_segments()
+        self._update_legend()
+
+    # ---------------- internos ----------------
+    def _ensure_artist(self):
+        ax = self.ax
+        if not self._artist_alive():
+            # ax.clear() externo elimina la colección y los callbacks: se recrean
+            self._cid_xlim = None
+            self._lc = LineCollection([], linewidths=1.8)
+            ax.add_collection(self._lc, autolim=False)
+            self._segs.clear()
+            self._fit_pending = True
+            ax.set_title(self._title)
+            ax.set_xlabel(self._xlabel)
+            ax.set_ylabel(self._ylabel)
+            ax.grid(True, linestyle=":", alpha=0.6)
+            self._connect_view_callbacks()
+
+    def _artist_alive(self) -> bool:
+        return self._lc is not None and self._lc in self.ax.collections
+
+    def _connect_view_callbacks(self):
+        if self._cid_xlim is None:
+            self._cid_xlim = self.ax.callbacks.connect("xlim_changed", lambda _ax: self._on_view_changed())
+        canvas = self.ax.figure.canvas
+        if self._cid_resize is None and canvas is not None:
+            self._cid_resize = canvas.mpl_connect("resize_event", lambda _ev: self._on_view_changed())
+
+    def _current_view(self) -> tuple[float, float, int]:
+        x0, x1 = self.ax.get_xlim()
+        if self._x is not None and self._x.size and (x0, x1) == (0.0, 1.0):
+            x0, x1 = float(self._x[0]), float(self._x[-1])
+        width_px = int(max(self.ax.bbox.width, 50))
+        return (float(min(x0, x1)), float(max(x0, x1)), width_px)
+
+    def _decimate_into(self, cols: list[int], view: tuple[float, float, int]):
+        x0, x1, npx = view
+        xd, Yd = minmax_decimate(self._x, self._Q[:, cols], x0, x1, npx)
+        for k, c in enumerate(cols):
+            self._segs[c] = np.column_stack([xd, Yd[:, k]])
+
+    def _push_segments(self):
+        segs = [self._segs[c] for c in self._order]
+        colors = [self._cmap(c % self._cmap.N) for c in self._order]
+        self._lc.set_segments(segs)
+        self._lc.set_color(colors)
+
+    def _at_auto_limits(self) -> bool:
+        return self._auto_lims is not None and (self.ax.get_xlim(), self.ax.get_ylim()) == self._auto_lims
+
+    def _autoscale(self):
+        if not self._order or self._x is None or not self._x.size:
+            return
+        cols = np.asarray(self._order)
+        with _quiet_nan():
+            y0 = float(np.nanmin(self._col_min[cols]))
+            y1 = float(np.nanmax(self._col_max[cols]))
+        if not np.isfinite(y0) or not np.isfinite(y1):
+            return
+        pad = (y1 - y0) * 0.05 or 0.5
+        self._busy = True
+        try:
+            self.ax.set_xlim(float(self._x[0]), float(self._x[-1]) if self._x.size > 1 else float(self._x[0]) + 1.0)
+            self.ax.set_ylim(y0 - pad, y1 + pad)
+        finally:
+            self._busy = False
+        self._fit_pending = False
+        self._auto_lims = (self.ax.get_xlim(), self.ax.get_ylim())
+
+    def _update_legend(self):
+        leg = self.ax.get_legend()
+        if leg is not None:
+            leg.remove()
+        n = len(self._order)
+        if 0 < n <= self.MAX_LEGEND:
+            handles = [Line2D([], [], color=self._cmap(c % self._cmap.N), linewidth=1.8) for c in self._order]
+            labels = [self._names[c] for c in self._order]
+            self.ax.legend(handles, labels, loc="upper right", fontsize=9, frameon=False)
+            self.ax.set_title(self._title)
+        else:
+            self.ax.set_title(f"{self._title} ({n} secciones)" if n else self._title)
+
+    def _on_view_changed(self):
+        if self._busy or not self._order or self._x is None:
+            return
+        view = self._current_view()
+        if view == self._view:
+            return
+        self._view = view
+        self._decimate_into(self._order, view)
+        self._push_segments()
+        self.ax.figure.canvas.draw_idle()
+
+
+@contextmanager
+def _quiet_nan():
+    """Silencia 'All-NaN slice' de nanmin/nanmax (columnas sin datos son válidas)."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        yield
@@ -0,0 +1,275 @@
+# modules/flow2d/flow2d_thumbs.py
+"""
+Miniaturas ("small multiples") de todas las secciones de un tiempo XSECI.
+- QListView en modo icono: solo pide datos de lo visible (scroll virtualizado).
+- Cada miniatura se renderiza en hilos de fondo con un lienzo Agg propio (sin Qt en el render)
+  y llega a la GUI como QImage por señal; lo último pedido (lo visible) se dibuja primero.
+- Los hilos arrancan con el primer pedido y se detienen al cerrar la ventana (shutdown).
+"""
+from __future__ import annotations
+from collections import OrderedDict
+import queue
+import threading
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # type: ignore
+from matplotlib.collections import LineCollection  # type: ignore
+from matplotlib.figure import Figure  # type: ignore
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QObject, QSize, pyqtSignal  # type: ignore
+from PyQt6.QtGui import QColor, QImage, QPainter  # type: ignore
+from PyQt6.QtWidgets import QDialog, QLabel, QListView, QVBoxLayout  # type: ignore
+
+from .flow2d_profile import BEDEL_COLOR, WSEL_COLOR, ProfileData, extract_profile
+from .flow2d_qimage import rgba_to_qimage
+
+THUMB_SIZE = QSize(220, 150)   # px
+
+
+class ThumbnailRenderer:
+    """Perfil mínimo (sin ejes rotulados, leyenda ni colorbar) en un lienzo Agg pequeño. Uno por hilo."""
+    def __init__(self, width: int = THUMB_SIZE.width(), height: int = THUMB_SIZE.height(), dpi: int = 72):
+        self.fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_axes((0.03, 0.04, 0.94, 0.80))
+        self.ax.set_xticks([])
+        self.ax.set_yticks([])
+        self.title = self.fig.text(0.5, 0.93, "", ha="center", va="center", fontsize=9)
+        self.lc = LineCollection([], cmap="viridis", linewidths=1.5, alpha=0.85, zorder=1)
+        self.ax.add_collection(self.lc)
+        self.wsl_line, = self.ax.plot([], [], linewidth=1.2, color=WSEL_COLOR, zorder=2)
+        self.bed_line, = self.ax.plot([], [], linewidth=1.5, color=BEDEL_COLOR, zorder=3)
+
+    def render(self, data: ProfileData, title: str) -> np.ndarray:
+        """Devuelve el RGBA (H, W, 4) del lienzo (vista: válida hasta el siguiente render)."""
+        st = data.st
+        self.bed_line.set_data(st, data.bed)
+        has_wsl = data.wsl is not None
+        self.wsl_line.set_data(st if has_wsl else [], data.wsl if has_wsl else [])
+        ys = [data.bed]
+        if has_wsl and data.vel is not None:
+            self.lc.set_segments(data.segments())
+            self.lc.set_array(data.vel)
+            with np.errstate(all="ignore"):
+                vmin, vmax = float(np.nanmin(data.vel)), float(np.nanmax(data.vel))
+            if np.isfinite(vmin) and np.isfinite(vmax):
+                self.lc.set_clim(vmin, vmax)
+                title = f"{title}  v≤{vmax:.2f}"
+        else:
+            self.lc.set_segments([])
+        if has_wsl:
+            ys.append(data.wsl)
+        with np.errstate(all="ignore"):
+            x0, x1 = float(np.nanmin(st)), float(np.nanmax(st))
+            yv = np.concatenate(ys)
+            y0, y1 = float(np.nanmin(yv)), float(np.nanmax(yv))
+        if all(np.isfinite(v) for v in (x0, x1, y0, y1)):
+            dx, dy = (x1 - x0) * 0.03 or 0.5, (y1 - y0) * 0.08 or 0.5
+            self.ax.set_xlim(x0 - dx, x1 + dx)
+            self.ax.set_ylim(y0 - dy, y1 + dy)
+        self.title.set_text(title)
+        self.canvas.draw()
+        return np.asarray(self.canvas.buffer_rgba())
+
+
+class _ThumbSignals(QObject):
+    ready = pyqtSignal(int, str, QImage)   # generación, sección, imagen
+    failed = pyqtSignal(int, str, str)     # generación, sección, motivo
+
+
+def _stop_workers(q: queue.LifoQueue, threads: list[threading.Thread]):
+    """Un centinela por hilo (LIFO: se atienden antes que lo pendiente) y espera breve."""
+    for _ in threads:
+        q.put(None)
+    for th in threads:
+        th.join(timeout=1.0)
+    threads.clear()
+
+
+class ThumbnailModel(QAbstractListModel):
+    """
+    Lista de secciones de un tiempo; DecorationRole = miniatura.
+    Al pedir una miniatura que falta se encola (LIFO: lo visible ahora va primero) y mientras
+    tanto se muestra un marcador. Caché LRU acotada; cambiar de tiempo invalida lo pendiente.
+    """
+    def __init__(self, parent=None, workers: int = 2, max_items: int = 512):
+        super().__init__(parent)
+        self.max_items = max_items
+        self._ids: list[str] = []
+        self._row_of: dict[str, int] = {}
+        self._blocks: dict = {}
+        self._time_label = ""
+        self._images: OrderedDict = OrderedDict()
+        self._requested: set[str] = set()
+        self._errors: dict[str, str] = {}
+        self._gen = 0
+        self._queue: queue.LifoQueue = queue.LifoQueue()
+        self._signals = _ThumbSignals()
+        self._signals.ready.connect(self._on_ready)
+        self._signals.failed.connect(self._on_failed)
+        self._placeholder = QImage(THUMB_SIZE, QImage.Format.Format_RGB32)
+        self._placeholder.fill(QColor("#e6e6e6"))
+        self._failed_img = QImage(THUMB_SIZE, QImage.Format.Format_RGB32)
+        self._failed_img.fill(QColor("#f4dede"))
+        painter = QPainter(self._failed_img)
+        painter.setPen(QColor("#a33"))
+        painter.drawText(self._failed_img.rect(), Qt.AlignmentFlag.AlignCenter, "Sin miniatura")
+        painter.end()
+        self._n_workers = max(1, workers)
+        self._threads: list[threading.Thread] = []
+        # si el modelo se destruye sin shutdown(), los hilos no deben quedar esperando en la cola
+        self.destroyed.connect(lambda *_a, q=self._queue, th=self._threads: _stop_workers(q, th))
+
+    def _ensure_workers(self):
+        if self._threads:
+            return
+        for i in range(self._n_workers):
+            th = threading.Thread(target=self._worker_loop, name=f"xseci-thumbs-{i}", daemon=True)
+            th.start()
+            self._threads.append(th)
+
+    def shutdown(self):
+        """Descarta lo pendiente y detiene los hilos (vuelven a arrancar con el próximo pedido)."""
+        self._gen += 1
+        _stop_workers(self._queue, self._threads)
+
+    # --- datos ---
+    def set_time(self, time_label: str, ids: list[str], blocks: dict):
+        """blocks = result.data[time_label] ({sid: {df, Q, ...}})."""
+        self.beginResetModel()
+        self._gen += 1
+        self._time_label = time_label
+        self._ids = list(ids)
+        self._row_of = {sid: i for i, sid in enumerate(self._ids)}
+        self._blocks = blocks or {}
+        self._images.clear()
+        self._requested.clear()
+        self._errors.clear()
+        self.endResetModel()
+
+    def section_at(self, row: int) -> str | None:
+        return self._ids[row] if 0 <= row < len(self._ids) else None
+
+    # --- API Qt ---
+    def rowCount(self, parent=QModelIndex()) -> int:  # noqa: N802 (API Qt)
+        return 0 if parent.isValid() else len(self._ids)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        sid = self._ids[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return sid
+        if role == Qt.ItemDataRole.ToolTipRole:
+            sec = self._blocks.get(sid) or {}
+            tip = f"{sid} @ {self._time_label}  (Q={sec.get('Q')} {sec.get('Q_units') or ''})"
+            err = self._errors.get(sid)
+            return f"{tip}\nSin miniatura: {err}" if err else tip
+        if role == Qt.ItemDataRole.DecorationRole:
+            if sid in self._errors:
+                return self._failed_img
+            img = self._images.get(sid)
+            if img is not None:
+                self._images.move_to_end(sid)
+                return img
+            self._request(sid)
+            return self._placeholder
+        return None
+
+    # --- render en segundo plano ---
+    def _request(self, sid: str):
+        if sid in self._requested:
+            return
+        sec = self._blocks.get(sid)
+        df = sec.get("df") if sec else None
+        if df is None or df.empty:
+            return
+        self._requested.add(sid)
+        self._ensure_workers()
+        self._queue.put((self._gen, sid, df))
+
+    def _worker_loop(self):
+        renderer = None
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            gen, sid, df = item
+            if gen != self._gen:
+                continue   # tiempo cambiado: trabajo obsoleto
+            try:
+                data = extract_profile(df)
+                if data is None:
+                    self._signals.failed.emit(gen, sid, "faltan STATION/BEDEL")
+                    continue
+                if renderer is None:
+                    renderer = ThumbnailRenderer()
+                img = rgba_to_qimage(renderer.render(data, sid), copy=True)
+            except Exception as e:
+                print(f"[THUMBS] {sid}: {type(e).__name__}: {e}")
+                self._signals.failed.emit(gen, sid, f"{type(e).__name__}: {e}")
+                continue
+            self._signals.ready.emit(gen, sid, img)   # cola → hilo de la GUI
+
+    def _on_failed(self, gen: int, sid: str, msg: str):
+        if gen != self._gen:
+            return
+        self._errors[sid] = msg   # queda en _requested: no se reintenta hasta cambiar de tiempo
+        row = self._row_of.get(sid)
+        if row is not None:
+            idx = self.index(row, 0)
+            self.dataChanged.emit(idx, idx, [Qt.ItemDataRole.DecorationRole, Qt.ItemDataRole.ToolTipRole])
+
+    def _on_ready(self, gen: int, sid: str, img: QImage):
+        if gen != self._gen:
+            return
+        self._images[sid] = img
+        while len(self._images) > self.max_items:
+            old, _ = self._images.popitem(last=False)
+            self._requested.discard(old)   # se volverá a pedir si vuelve a verse
+        row = self._row_of.get(sid)
+        if row is not None:
+            idx = self.index(row, 0)
+            self.dataChanged.emit(idx, idx, [Qt.ItemDataRole.DecorationRole])
+
+
+class ThumbnailGridDialog(QDialog):
+    """Ventana no modal con la grilla de miniaturas del tiempo actual; clic → abre la sección."""
+    sectionActivated = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Miniaturas de secciones")
+        self.setModal(False)
+        self.resize(980, 680)
+
+        self.lbl = QLabel("")
+        self.model = ThumbnailModel(self)
+        self.view = QListView(self)
+        self.view.setViewMode(QListView.ViewMode.IconMode)
+        self.view.setIconSize(THUMB_SIZE)
+        self.view.setGridSize(QSize(THUMB_SIZE.width() + 12, THUMB_SIZE.height() + 28))
+        self.view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.view.setMovement(QListView.Movement.Static)
+        self.view.setUniformItemSizes(True)   # clave para que el scroll no consulte todas las filas
+        self.view.setSpacing(4)
+        self.view.setModel(self.model)
+        self.view.clicked.connect(self._on_clicked)
+        self.view.activated.connect(self._on_clicked)
+
+        lay = QVBoxLayout(self)
+        lay.addWidget(self.lbl)
+        lay.addWidget(self.view)
+
+    def show_time(self, time_label: str, ids: list[str], blocks: dict):
+        self.lbl.setText(f"Tiempo: {time_label}  —  {len(ids)} secciones (clic para abrir)")
+        self.model.set_time(time_label, ids, blocks)
+
+    def _on_clicked(self, index):
+        sid = self.model.section_at(index.row())
+        if sid:
+            self.sectionActivated.emit(sid)
+
+    def closeEvent(self, ev):
+        self.model.set_time("", [], {})   # libera imágenes y descarta lo pendiente
+        self.model.shutdown()
+        super().closeEvent(ev)
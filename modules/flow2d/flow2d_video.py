@@ -0,0 +1,242 @@
+# modules/flow2d/flow2d_video.py
+"""
+Exportación de la evolución temporal de una sección a MP4/GIF.
+Pipeline off-screen (no toca el lienzo en pantalla):
+  [hilo prep] df → ProfileData  →  [render Agg] → RGBA  →  [hilo escritor] ffmpeg / Pillow
+Cada etapa trabaja en paralelo con colas acotadas (memoria constante). Antes de arrancar, una pasada
+de mín/máx por columna fija los ejes de toda la secuencia (sin guardar las series).
+"""
+from __future__ import annotations
+from pathlib import Path
+import os
+import queue
+import subprocess
+import threading
+
+import numpy as np
+import matplotlib  # type: ignore
+
+from .flow2d_parsers import ParseResult
+from .flow2d_profile import (OffscreenProfileCanvas, ProfileArtists, RenderCancelled, extract_profile,
+                             get_col, profile_title)
+
+_END = object()   # marca de fin de cola
+QUEUE_DEPTH = 8
+
+
+def _drain(q: queue.Queue):
+    try:
+        while True:
+            q.get_nowait()
+    except queue.Empty:
+        pass
+
+
+def _sequence_bounds(sec_id: str, blocks: list, check_cancel=None):
+    """
+    Límites y rango de velocidad envolventes de toda la secuencia (ejes estables en el video).
+    Solo acumula mín/máx por columna (fmin/fmax ignoran NaN): las series se extraen frame a frame.
+    """
+    rng = np.array([[np.inf, -np.inf]] * 3)     # filas: estación, cota (fondo/lámina), velocidad
+    for _t, sec in blocks:
+        if check_cancel:
+            check_cancel()
+        df = sec["df"]
+        st, bed = get_col(df, "STATION(m)", "STATION"), get_col(df, "BEDEL(m)", "BEDEL")
+        if st is None or bed is None:
+            raise ValueError(f"Faltan columnas STATION/BEDEL en {sec_id}")
+        for row, col in ((0, st), (1, bed), (1, get_col(df, "WSEL(m)", "WSEL")),
+                         (2, get_col(df, "VEL_NORM(m/s)", "VEL_NORM"))):
+            v = None if col is None else np.asarray(col, dtype=float)
+            if v is not None and len(v):
+                rng[row, 0] = np.fmin(rng[row, 0], np.fmin.reduce(v))
+                rng[row, 1] = np.fmax(rng[row, 1], np.fmax.reduce(v))
+    rng[~np.isfinite(rng)] = np.nan
+    bounds = (float(rng[0, 0]), float(rng[0, 1]), float(rng[1, 0]), float(rng[1, 1]))
+    clim = (float(rng[2, 0]), float(rng[2, 1])) if np.isfinite(rng[2]).all() else None
+    return bounds, clim
+
+
+class _FFmpegSink:
+    """Escribe frames RGBA crudos al stdin de ffmpeg (sin pasar por PNG)."""
+    def __init__(self, out_path: str, width: int, height: int, fps: float):
+        exe = matplotlib.rcParams.get("animation.ffmpeg_path") or "ffmpeg"
+        cmd = [
+            exe, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", f"{fps}",
+            "-i", "-",
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",   # yuv420p exige dimensiones pares
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", out_path,
+        ]
+        try:
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        except FileNotFoundError as e:
+            raise RuntimeError(
+                "No se encontró ffmpeg. Instálalo o configura rcParams['animation.ffmpeg_path'], "
+                "o exporta como GIF."
+            ) from e
+
+    def write(self, frame: np.ndarray):
+        self._proc.stdin.write(frame.tobytes())
+
+    def close(self, ok: bool):
+        try:
+            self._proc.stdin.close()
+        except Exception:
+            pass
+        if not ok:
+            self._proc.kill()
+        rc = self._proc.wait()
+        if ok and rc != 0:
+            err = self._proc.stderr.read().decode("utf-8", errors="ignore") if self._proc.stderr else ""
+            raise RuntimeError(f"ffmpeg terminó con código {rc}:\n{err.strip()}")
+
+
+class _GifSink:
+    """
+    GIF con Pillow (dependencia de matplotlib) escrito en streaming: cada frame se cuantiza y se
+    codifica (paleta local + LZW) al llegar y se descarta → memoria constante con cualquier nº de frames.
+    (Image.save(save_all=True) retiene todos los frames hasta el final.)
+    """
+    def __init__(self, out_path: str, fps: float):
+        self._out = out_path
+        self._duration = int(round(1000.0 / max(fps, 0.1)))
+        self._fp = open(out_path, "wb")
+        self._n = 0
+
+    def write(self, frame: np.ndarray):
+        from PIL import GifImagePlugin, Image  # type: ignore
+        img = Image.fromarray(frame).convert("RGB")   # (H, W, 4) uint8 RGBA → RGB (GIF no lleva alfa)
+        pal = img.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+        if self._n == 0:
+            header, _used = GifImagePlugin.getheader(pal, info={"loop": 0, "duration": self._duration})
+            self._fp.write(b"".join(header))
+        self._fp.write(b"".join(GifImagePlugin.getdata(pal, duration=self._duration, include_color_table=True)))
+        self._n += 1
+
+    def close(self, ok: bool):
+        try:
+            if ok and self._n:
+                self._fp.write(b";")   # trailer GIF
+        finally:
+            self._fp.close()
+        if not (ok and self._n):
+            try:
+                os.remove(self._out)
+            except OSError:
+                pass
+
+
+def export_profile_animation(result: ParseResult, sec_id: str, times: list[str], out_path: str,
+                             fps: float = 5.0, dpi: int = 100, aspect_mode: str = "pretty",
+                             progress_cb=None, cancel_cb=None) -> int:
+    """
+    Renderiza la sección `sec_id` para cada tiempo de `times` y escribe MP4 o GIF (según extensión).
+    - progress_cb(done:int, total:int) ; cancel_cb() -> bool (mismo contrato que parse_xseci)
+    Devuelve el número de frames escritos.
+    """
+    ext = Path(out_path).suffix.lower()
+    if ext not in (".mp4", ".gif"):
+        raise ValueError(f"Formato no soportado: {ext or '(sin extensión)'} (usa .mp4 o .gif)")
+
+    # Frames disponibles (la sección puede faltar en algunos tiempos)
+    blocks = [(t, (result.data.get(t) or {}).get(sec_id)) for t in times]
+    blocks = [(t, sec) for t, sec in blocks if sec and sec.get("df") is not None and not sec["df"].empty]
+    total = len(blocks)
+    if total == 0:
+        raise ValueError(f"La sección {sec_id} no tiene datos en los tiempos elegidos.")
+
+    def _check_cancel():
+        if cancel_cb and cancel_cb():
+            raise RenderCancelled()
+
+    # Límites envolventes (mín/máx por columna; también valida STATION/BEDEL de cada frame)
+    bounds, clim = _sequence_bounds(sec_id, blocks, _check_cancel)
+
+    canvas = OffscreenProfileCanvas(dpi=dpi)
+    artists = ProfileArtists(canvas, blit=False)
+    artists.fixed_bounds = bounds
+    artists.fixed_clim = clim
+    width, height = canvas.get_width_height()
+
+    sink = _FFmpegSink(out_path, width, height, fps) if ext == ".mp4" else _GifSink(out_path, fps)
+
+    # --- etapa 1: preparar (título + datos) en un hilo ---
+    prep_q: queue.Queue = queue.Queue(maxsize=QUEUE_DEPTH)
+    out_q: queue.Queue = queue.Queue(maxsize=QUEUE_DEPTH)
+    stop = threading.Event()
+    errors: list[BaseException] = []
+
+    def _put(q: queue.Queue, item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _prep():
+        try:
+            for t, sec in blocks:
+                data = extract_profile(sec["df"])   # columnas ya validadas en _sequence_bounds
+                if not _put(prep_q, (profile_title(sec_id, t, sec), data)):
+                    return
+        except BaseException as e:   # noqa: BLE001 (se re-lanza en el hilo llamador)
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(prep_q, _END)
+
+    # --- etapa 3: escribir frames en otro hilo (codificación en paralelo al render) ---
+    def _write():
+        try:
+            while True:
+                frame = out_q.get()
+                if frame is _END:
+                    return
+                sink.write(frame)
+        except BaseException as e:   # noqa: BLE001 (se re-lanza en el hilo llamador)
+            errors.append(e)
+            stop.set()
+
+    th_prep = threading.Thread(target=_prep, name="anim-prep", daemon=True)
+    th_write = threading.Thread(target=_write, name="anim-write", daemon=True)
+    th_prep.start(); th_write.start()
+
+    # --- etapa 2: render Agg en el hilo llamador ---
+    done = 0
+    ok = False
+    try:
+        while True:
+            try:
+                item = prep_q.get(timeout=0.1)
+            except queue.Empty:
+                if stop.is_set():   # falló el prep o el escritor: no llegará la marca de fin
+                    break
+                continue
+            if item is _END:
+                break
+            _check_cancel()
+            if errors:
+                break
+            title, data = item
+            artists.render(data, title, aspect_mode)
+            frame = canvas.rgba().copy()    # el buffer Agg se reutiliza en el siguiente draw
+            if not _put(out_q, frame):
+                break
+            done += 1
+            if progress_cb:
+                progress_cb(done, total)
+        ok = not errors and done == total
+    finally:
+        if not ok:
+            stop.set()
+            _drain(out_q)        # libera hueco para la marca de fin aunque el escritor haya fallado
+        out_q.put(_END)
+        th_write.join()
+        th_prep.join(timeout=1.0)
+        sink.close(ok and not errors)
+    if errors:
+        raise errors[0]
+    return done
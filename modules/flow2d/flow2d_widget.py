@@ -1,131 +1,236 @@
 # modules/flow2d/flow2d_widget.py
-"""Flow 2D: tabs XSECS, XSECI, XSECH (modo fantasma con prints)."""
+"""Flow 2D: tabs XSECS, XSECI, XSECH y Planta (modo fantasma con prints)."""
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QTabWidget, QToolBar, QFileDialog, QSplitter,
     QPlainTextEdit, QMessageBox, QToolButton, QPushButton, QMenu, QSpinBox,
-    QHBoxLayout, QLabel, QComboBox, QTableWidget, QTableWidgetItem, QProgressDialog, QApplication )  # type: ignore
-from PyQt6.QtWidgets import QListWidget, QListWidgetItem, QStyle   # type: ignore
+    QHBoxLayout, QLabel, QComboBox, QTableView, QHeaderView, QProgressDialog, QApplication )  # type: ignore
+from PyQt6.QtWidgets import QStyle   # type: ignore
 
-from PyQt6.QtWidgets import QDialog, QCheckBox
+from PyQt6.QtWidgets import QDialog, QCheckBox, QDoubleSpinBox, QLineEdit, QListView, QCompleter
 
-from PyQt6.QtCore import QSize, Qt, QSettings , QObject, QThread, pyqtSignal
+from PyQt6.QtCore import QSize, Qt, QSettings , QObject, QThread, QTimer, pyqtSignal
+from PyQt6.QtCore import QSortFilterProxyModel, QItemSelection, QItemSelectionModel  # type: ignore
 from PyQt6.QtGui import QAction  # type: ignore
 from PyQt6.QtGui import QKeySequence, QShortcut # type: ignore
-from PyQt6.QtGui import QImage, QPixmap, QGuiApplication # type: ignore
+from PyQt6.QtGui import QPixmap, QGuiApplication # type: ignore
 # matplotlib embebido
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas  # type: ignore
 from matplotlib.figure import Figure  # type: ignore
-from matplotlib.colorbar import Colorbar  # type: ignore
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
-from matplotlib.colorbar import Colorbar
-from mpl_toolkits.axes_grid1 import make_axes_locatable
 
 import numpy as np
 # modules/flow2d/flow2d_widget.py (añadir)
 from PyQt6.QtCore import Qt  # si no lo tenías
-from matplotlib.collections import LineCollection  # para “cortina” de velocidad
 import matplotlib.ticker as mticker
 import time
 
-import os, re, io
+import os, re
 
 from .flow2d_factory import get_parser
 from .flow2d_parsers import ParseResult
 from .flow2d_pipeline import compute_variables, Flow2DState
-from .flow2d_exporters import CSVAllLinesExporter, JSONSummaryExporter
+from .flow2d_exporters import (CSVAllLinesExporter, ExportCancelled, HDF5CubeExporter, JSONSummaryExporter,
+                               ParquetExporter, XLSXExporter)
 from .flow2d_parsers import XSECIParser, ParseCancelled
+from .flow2d_xseci import time_label_to_hours
+from .flow2d_models import ColumnsTableModel, LabelListModel, MatrixTableModel, PresenceProxyModel, fixed_format
+from .flow2d_index import NavIndex, build_nav_index
+from .flow2d_render import HydrographRenderer
+from .flow2d_profile import (FrameCache, ProfileArtists, ProfileCanvasMixin, ProfilePrefetcher,
+                             RenderCancelled, extract_profile, profile_title)
+from .flow2d_video import export_profile_animation
+from .flow2d_batch import export_profile_batch, plan_unique_paths
+from .flow2d_qimage import figure_to_qimage
+from .flow2d_thumbs import ThumbnailGridDialog
+from .flow2d_hydro import AdjustParams, HydroSummary, adjust_discharges, hydrograph_summary
+from .flow2d_compare import DIFF_VARS, CompareCancelled, ProfileDiff, RunComparison, compare_runs
+from .flow2d_query import QUERY_COLUMNS, QueryCancelled, QueryResult, ZoneMapIndex, build_zone_maps
+from .flow2d_planmap import (PLAN_METRICS, PlanGeometry, PlanJoin, PlanMapRenderer, SectionMetrics,
+                             geometry_from_xseci, geometry_from_xsecs, join_geometry, section_metrics)
+from utils.memory import MemoryUsage, measure, register_source
+from utils.tracing import name_thread, traced
 
 # FUNCIONES AUXILIARES
-def time_label_to_hours(label: str) -> float:
+def make_table_view(parent, model) -> QTableView:
+    """QTableView virtualizado: filas de alto fijo para no medir cada fila (tablas grandes)."""
+    view = QTableView(parent)
+    view.setModel(model)
+    vh = view.verticalHeader()
+    vh.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+    vh.setDefaultSectionSize(22)
+    view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+    view.setAlternatingRowColors(True)
+    return view
+
+
+class FilterComboBox(QComboBox):
     """
-    Asume formato consistente (lo generó tu _parse_time_label)
-     "dddd d hh h mm m ss s
+    Combo con búsqueda: lo que se escribe filtra los ítems ("contiene", sin mayúsculas) en el popup
+    del QCompleter. El texto editable es solo para buscar: currentText() siempre es el ítem elegido.
     """
-    parts = label.replace("d", " ").replace("h", " ").replace("m", " ").replace("s", " ").split()
-    d, h, m, s = map(int, parts)
-    return d * 24.0 + h + m / 60.0 + s / 3600.0
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        comp = QCompleter(self)
+        comp.setFilterMode(Qt.MatchFlag.MatchContains)
+        comp.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        comp.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+        comp.activated.connect(self._on_completed)
+        self.setCompleter(comp)
+        self.lineEdit().editingFinished.connect(self._restore_text)
+
+    def setModel(self, model):  # noqa: N802 (API Qt)
+        super().setModel(model)
+        self.completer().setModel(model)
+
+    def currentText(self) -> str:  # noqa: N802
+        i = self.currentIndex()
+        return self.itemText(i) if i >= 0 else ""
+
+    def _on_completed(self, text: str):
+        i = self.findText(text)
+        if i >= 0 and self.model().flags(self.model().index(i, 0)) & Qt.ItemFlag.ItemIsEnabled:
+            self.setCurrentIndex(i)
+        self._restore_text()
+
+    def _restore_text(self):
+        """Texto a medio escribir → vuelve a mostrar el ítem actual."""
+        text = self.currentText()
+        if self.lineEdit().text() != text:
+            self.lineEdit().setText(text)
+
+
+class FilterListView(QWidget):
+    """
+    Lista multi-selección sobre un modelo compartido (LabelListModel) + caja de filtro.
+    La selección se guarda por fila del modelo fuente: filtrar no pierde lo seleccionado que queda oculto.
+    API tipo QListWidget para lo que usan las pestañas (itemSelectionChanged, selected_rows…).
+    """
+    itemSelectionChanged = pyqtSignal()
+
+    def __init__(self, parent=None, placeholder: str = "Filtrar…",
+                 mode=QListView.SelectionMode.ExtendedSelection):
+        super().__init__(parent)
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(0, 0, 0, 0)
+        lay.setSpacing(2)
+        self.txt_filter = QLineEdit(self)
+        self.txt_filter.setPlaceholderText(placeholder)
+        self.txt_filter.setClearButtonEnabled(True)
+        lay.addWidget(self.txt_filter)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.view = QListView(self)
+        self.view.setUniformItemSizes(True)       # miles de filas sin medir cada una
+        self.view.setSelectionMode(mode)
+        self.view.setModel(self.proxy)
+        lay.addWidget(self.view, 1)
+        self._sel = np.zeros(0, dtype=bool)       # selección por fila fuente
+        self._syncing = False
+        self.txt_filter.textChanged.connect(self._apply_filter)
+        self.view.selectionModel().selectionChanged.connect(self._on_view_selection)
+
+    def set_source(self, model: LabelListModel):
+        self.proxy.setSourceModel(model)
+        model.modelReset.connect(self._on_source_reset)
+        self._on_source_reset()
+
+    def source(self) -> LabelListModel | None:
+        return self.proxy.sourceModel()
+
+    def count(self) -> int:
+        return len(self._sel)
+
+    # --- selección ---
+    def selected_rows(self) -> np.ndarray:
+        return np.flatnonzero(self._sel)
+
+    def selected_labels(self) -> list[str]:
+        src = self.source()
+        return [src.label(int(r)) for r in self.selected_rows()] if src is not None else []
+
+    def set_selected_rows(self, rows):
+        self._sel[:] = False
+        self._sel[np.asarray(rows, dtype=np.intp)] = True
+        self._reselect()
+        self.itemSelectionChanged.emit()
+
+    def select_all(self):
+        self._sel[:] = True
+        self._reselect()
+        self.itemSelectionChanged.emit()
+
+    def clear_selection(self):
+        self.set_selected_rows([])
+
+    def scroll_to_row(self, row: int):
+        src = self.source()
+        if src is not None:
+            ix = self.proxy.mapFromSource(src.index(row, 0))
+            if ix.isValid():
+                self.view.scrollTo(ix)
+
+    def _on_source_reset(self):
+        src = self.source()
+        self._sel = np.zeros(src.rowCount() if src is not None else 0, dtype=bool)
+
+    def _on_view_selection(self, selected, deselected):
+        if self._syncing:
+            return
+        for ix in deselected.indexes():
+            self._sel[self.proxy.mapToSource(ix).row()] = False
+        for ix in selected.indexes():
+            self._sel[self.proxy.mapToSource(ix).row()] = True
+        self.itemSelectionChanged.emit()
+
+    def _apply_filter(self, text: str):
+        self._syncing = True
+        try:
+            self.proxy.setFilterFixedString(text)
+        finally:
+            self._syncing = False
+        self._reselect()
+
+    def _reselect(self):
+        """Pinta en la vista (filas visibles) la selección guardada, en rangos contiguos."""
+        src = self.source()
+        sm = self.view.selectionModel()
+        if src is None:
+            return
+        if self.txt_filter.text():
+            rows = np.array([self.proxy.mapFromSource(src.index(int(r), 0)).row() for r in self.selected_rows()],
+                            dtype=np.intp)
+            rows = np.sort(rows[rows >= 0])
+        else:
+            rows = self.selected_rows()   # sin filtro: filas de la vista = filas fuente
+        sel = QItemSelection()
+        if len(rows):
+            breaks = np.flatnonzero(np.diff(rows) != 1)
+            starts = np.r_[rows[0], rows[breaks + 1]]
+            ends = np.r_[rows[breaks], rows[-1]]
+            for a, b in zip(starts, ends):
+                sel.select(self.proxy.index(int(a), 0), self.proxy.index(int(b), 0))
+        self._syncing = True
+        try:
+            sm.select(sel, QItemSelectionModel.SelectionFlag.ClearAndSelect)
+        finally:
+            self._syncing = False
 
 
 ## CLASES AUXILIARES
 
-class PlotCanvas(FigureCanvas):
+class PlotCanvas(ProfileCanvasMixin, FigureCanvas):
     """
     Lienzo único configurable.
     - use_colorbar=False: layout automático (XSECS).
     - use_colorbar=True : eje de colorbar fijo a la derecha (XSECI).
     """
     def __init__(self, parent=None, use_colorbar: bool = False):
-        self.use_colorbar = use_colorbar
-
-        self.fig = Figure(figsize=(5, 4), dpi=100)
-        # Layout según necesidad
-        if self.use_colorbar:
-            self.fig.set_constrained_layout(False)   # lo controlamos manualmente
-        else:
-            self.fig.set_constrained_layout(True)    # bonito por defecto
-
-        self.ax = self.fig.add_subplot(111)
-        super().__init__(self.fig)
+        fig = self._setup_figure(use_colorbar)
+        super().__init__(fig)
         self.setParent(parent)
 
-        # Colorbar solo si aplica (XSECI)
-        self.cax = None
-        self._cbar: Colorbar | None = None
-        if self.use_colorbar:
-            divider = make_axes_locatable(self.ax)
-            self.cax = divider.append_axes("right", size="5%", pad=0.12)
-            # ✅ márgenes razonables (no los vuelvas a tocar en otro lado)
-            # left/right: deja sitio a colorbar fija; bottom: para xlabel + leyenda
-            self.fig.subplots_adjust(left=0.08, right=0.86, top=0.92, bottom=0.34)
-
-
-
-    def clear(self):
-        """Limpia el eje principal y gestiona el colorbar sin romper la geometría."""
-        if self.use_colorbar:
-            # colorbar
-            if self._cbar is not None:
-                try:
-                    self._cbar.remove()
-                except Exception:
-                    pass
-                finally:
-                    self._cbar = None
-
-            # cax: recrea si fue eliminado, o límpialo si existe
-            if self.cax is None or self.cax not in self.fig.axes:
-                divider = make_axes_locatable(self.ax)
-                self.cax = divider.append_axes("right", size="5%", pad=0.12)
-            else:
-                try:
-                    self.cax.cla()
-                except Exception:
-                    pass
-
-        # eje principal
-        self.ax.clear()
-        self.draw_idle()
-
-    def get_or_update_colorbar(self, mappable, label: str | None = None) -> Colorbar | None:
-        """Crea/actualiza el colorbar en cax fijo (si use_colorbar=True)."""
-        if not self.use_colorbar:
-            return None
-
-        # garantiza cax
-        if self.cax is None or self.cax not in self.fig.axes:
-            divider = make_axes_locatable(self.ax)
-            self.cax = divider.append_axes("right", size="5%", pad=0.12)
-
-        if self._cbar is None:
-            self._cbar = self.fig.colorbar(mappable, cax=self.cax)
-        else:
-            self._cbar.update_normal(mappable)
-
-        if label:
-            self._cbar.set_label(label)
-        return self._cbar
-    
-         
     def plot_polyline(self, xs, ys, label=None):
         self.ax.plot(xs, ys, linewidth=1.6, alpha=0.95, label=label)
 
@@ -150,6 +255,7 @@ class _BaseSectionTab(QWidget):
 
         lay = QVBoxLayout(self)
         self.setWindowTitle(f"Flow 2D - {self.titulo}")
+        register_source(f"Flow 2D · {self.titulo}", self._memory_usage)
 
         # Toolbar con acciones
         self.toolbar = QToolBar(f"{self.titulo}")
@@ -164,10 +270,15 @@ class _BaseSectionTab(QWidget):
         self.menu_export = QMenu(self)
         self.btn_exportar.setMenu(self.menu_export)
 
-        self.exporters = [CSVAllLinesExporter(), JSONSummaryExporter()]
+        self.exporters = [CSVAllLinesExporter(), ParquetExporter(), ParquetExporter("time"),
+                          ParquetExporter("section"), HDF5CubeExporter(), XLSXExporter("section"),
+                          XLSXExporter("time"), JSONSummaryExporter()]
+        self._export_actions = []
         for exp in self.exporters:
             act = self.menu_export.addAction(exp.name)
             act.triggered.connect(lambda _, e=exp: self._run_exporter(e))
+            self._export_actions.append((act, exp))
+        self.menu_export.aboutToShow.connect(self._update_export_menu)
 
         self.toolbar.addAction(self.act_abrir)
         self.toolbar.addAction(self.act_limpiar)
@@ -208,16 +319,93 @@ class _BaseSectionTab(QWidget):
         self.state = None
         self._status(f"{self.titulo}: limpiado")
 
+    def _update_export_menu(self):
+        """Habilita solo los exportadores que soportan el resultado cargado."""
+        for act, exp in self._export_actions:
+            act.setEnabled(self.result is not None and exp.supports(self.result))
+
     def _run_exporter(self, exporter):
         if not (self.result and self.state):
             QMessageBox.information(self, "Exportar", "No hay datos cargados.")
             return
-        ruta, _ = QFileDialog.getSaveFileName(self, f"Guardar {exporter.name}", "", "Todos (*.*)")
+        if not exporter.supports(self.result):
+            QMessageBox.information(self, "Exportar",
+                                    f"{exporter.name} no admite resultados {self.result.meta.get('type')}.")
+            return
+        ext = exporter.extension
+        base = os.path.splitext(os.path.basename(self.archivo_actual or self.titulo))[0]
+        filtro = f"{exporter.name} (*{ext});;Todos (*.*)"
+        ruta, _ = QFileDialog.getSaveFileName(self, f"Guardar {exporter.name}",
+                                              os.path.join(self._last_dir(), base + ext), filtro)
         if not ruta:
             return
+        if not os.path.splitext(ruta)[1]:
+            ruta += ext
+        self._save_last_dir(ruta)
         print(f"[UI] Exportar {self.titulo} usando {exporter.name} -> {ruta}")
-        exporter.export(self.result, self.state, ruta)
-        self._status(f"{self.titulo}: exportado ({exporter.name})")
+
+        # Se capturan result/state: si el usuario carga otro archivo, el job sigue con los de ahora
+        result, state = self.result, self.state
+        self._start_job(
+            f"Exportar {exporter.name}", f"Exportando {os.path.basename(ruta)}…",
+            lambda progress_cb, cancel_cb: exporter.export(result, state, ruta,
+                                                           progress_cb=progress_cb, cancel_cb=cancel_cb),
+            on_finished=lambda _res: self._status(f"{self.titulo}: exportado ({exporter.name}) -> {ruta}"),
+        )
+
+    def _start_job(self, title: str, label: str, fn, on_finished=None, total: int = 0):
+        """
+        Lanza fn(progress_cb, cancel_cb) en un QThread con diálogo de progreso cancelable.
+        on_finished(resultado) se llama en el hilo de la GUI.
+        """
+        prog = QProgressDialog(label, "Cancelar", 0, max(total, 0), self)
+        prog.setWindowTitle(title)
+        prog.setWindowModality(Qt.WindowModality.WindowModal)
+        prog.setAutoClose(False)
+        prog.setAutoReset(False)
+        prog.setMinimumDuration(300)  # ms
+
+        thr = QThread(self)
+        wk = JobWorker(fn)
+        wk.moveToThread(thr)
+        job = (thr, wk, prog)
+        self._jobs = getattr(self, "_jobs", [])
+        self._jobs.append(job)   # mantener referencias vivas mientras corre
+
+        def _progress(done: int, tot: int):
+            if tot > 0 and prog.maximum() != tot:
+                prog.setMaximum(tot)
+            prog.setValue(done)
+
+        def _finish():
+            prog.close()
+            thr.quit()
+            thr.wait(1500)
+            if job in self._jobs:
+                self._jobs.remove(job)
+
+        def _ok(res):
+            _finish()
+            self._status(f"{self.titulo}: {title} terminado")
+            if on_finished:
+                on_finished(res)
+
+        def _fail(msg: str):
+            _finish()
+            QMessageBox.critical(self, "Error", f"{title} falló:\n{msg}")
+
+        def _cancelled():
+            _finish()
+            self._status(f"{self.titulo}: {title} cancelado")
+
+        thr.started.connect(wk.run)
+        wk.progress.connect(_progress)
+        wk.finished.connect(_ok)
+        wk.failed.connect(_fail)
+        wk.cancelled.connect(_cancelled)
+        prog.canceled.connect(wk.request_cancel)
+        thr.start()
+        return wk
 
     # ---- Para sobreescribir en tabs concretas si hace falta ----
     def _cargar_y_mostrar(self, ruta: str):
@@ -229,6 +417,20 @@ class _BaseSectionTab(QWidget):
         self.viewer.setPlainText(texto)
 
     # ---- Util ----
+    def _memory_usage(self) -> MemoryUsage | None:
+        """ParseResult + variables derivadas (diagnóstico de memoria; None si no hay archivo)."""
+        if self.result is None:
+            return None
+        return measure((self.result, self.state))
+
+    def _last_dir(self) -> str:
+        s = QSettings("MyFriendTGI", "Flow2D")
+        return s.value("export_dir", os.path.expanduser("~"))
+
+    def _save_last_dir(self, path: str):
+        s = QSettings("MyFriendTGI", "Flow2D")
+        s.setValue("export_dir", os.path.dirname(path))
+
     def _status(self, msg: str):
         w = self.parent()
         while w is not None:
@@ -241,6 +443,8 @@ class _BaseSectionTab(QWidget):
 
 class XSECSSectionTab(_BaseSectionTab):
     """XSECS: añade combo de IDs y tabla de coords por sección."""
+    dataLoaded = pyqtSignal(object)  # ParseResult (o None al limpiar) → mapa en planta
+
     def __init__(self):
         super().__init__("XSECS", "XSECS")
 
@@ -249,15 +453,17 @@ class XSECSSectionTab(_BaseSectionTab):
         hl = QHBoxLayout(top)
         hl.setContentsMargins(0, 0, 0, 0)
         hl.addWidget(QLabel("Sección:"))
-        self.cbo_ids = QComboBox()
+        # Un solo modelo de IDs para el combo y la lista lateral (se carga una vez por archivo)
+        self._ids_model = LabelListModel(parent=self)
+        self.cbo_ids = FilterComboBox()
+        self.cbo_ids.setModel(self._ids_model)
         self.cbo_ids.currentIndexChanged.connect(self._on_select_id)
         hl.addWidget(self.cbo_ids)
         top.setLayout(hl)
 
-        # Tabla de coordenadas
-        self.table = QTableWidget(self)
-        self.table.setColumnCount(2)
-        self.table.setHorizontalHeaderLabels(["x", "y"])
+        # Tabla de coordenadas (modelo virtual: lee directo del DataFrame/arrays)
+        self.table_model = ColumnsTableModel(["x", "y"], self)
+        self.table = make_table_view(self, self.table_model)
 
         # Insertar panel y reemplazar el viewer por la tabla
         lay: QVBoxLayout = self.layout()  # type: ignore
@@ -270,8 +476,8 @@ class XSECSSectionTab(_BaseSectionTab):
         side_lay = QVBoxLayout(side)
         side_lay.setContentsMargins(0, 0, 0, 0)
 
-        self.lst_ids = QListWidget()
-        self.lst_ids.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.lst_ids = FilterListView(self, "Filtrar por ID…")
+        self.lst_ids.set_source(self._ids_model)
         side_lay.addWidget(QLabel("Filtrar secciones (multi-selección):"))
         side_lay.addWidget(self.lst_ids)
 
@@ -318,16 +524,16 @@ class XSECSSectionTab(_BaseSectionTab):
         self.btn_plot_clear.clicked.connect(lambda: self.canvas.clear())
 
 
+    @traced(cat="load")
     def _cargar_y_mostrar(self, ruta: str):
         # Parseo real + variables
         self.result = self.parser.parse(ruta)
         self.state = compute_variables(self.result)
 
-        # Poblar combo con IDs
+        # Poblar combo y lista lateral con IDs (modelo compartido)
         ids = self.result.meta.get("ids", [])
         self.cbo_ids.blockSignals(True)
-        self.cbo_ids.clear()
-        self.cbo_ids.addItems(ids)
+        self._ids_model.set_labels(ids)
         self.cbo_ids.blockSignals(False)
 
         # Cargar primera sección si existe
@@ -336,19 +542,17 @@ class XSECSSectionTab(_BaseSectionTab):
             self.cbo_ids.setCurrentIndex(0)
         else:
             # Si no hay IDs, limpiar tabla
-            self.table.clearContents()
-            self.table.setRowCount(0)
-        # Poblar lista lateral con IDs
-        # Poblar lista multiselección con todos los IDs
-        self.lst_ids.clear()
-        ids = self.result.meta.get("ids", [])
-        for sec_id in ids:
-            self.lst_ids.addItem(QListWidgetItem(sec_id))
+            self.table_model.clear()
 
         # Dibuja la primera sección como referencia (si existe)
         if ids:
             self._plot_single(ids[0])  # no borra otras curvas, solo añade
         self._status(f"XSECS: cargado {os.path.basename(ruta)} ({len(ids)} secciones)")
+        self.dataLoaded.emit(self.result)
+
+    def _limpiar(self):
+        super()._limpiar()
+        self.dataLoaded.emit(None)
 
 
     def _on_select_id(self, idx: int):
@@ -357,6 +561,7 @@ class XSECSSectionTab(_BaseSectionTab):
         sec_id = self.cbo_ids.currentText()
         self._load_section(sec_id)
 
+    @traced(cat="table")
     def _load_section(self, sec_id: str):
         """Llena la tabla con coords de la sección seleccionada."""
         if not self.result or not isinstance(self.result.data, dict):
@@ -372,13 +577,7 @@ class XSECSSectionTab(_BaseSectionTab):
             cols = list(df.columns)  # puede fallar si no es DataFrame
             if not {"x", "y"}.issubset(set(cols)):
                 raise ValueError("DataFrame sin columnas x/y")
-            n = len(df)
-            self.table.setRowCount(n)
-            self.table.setColumnCount(2)
-            self.table.setHorizontalHeaderLabels(["x", "y"])
-            for r, (_, row) in enumerate(df.iterrows()):
-                self.table.setItem(r, 0, QTableWidgetItem(str(row["x"])))
-                self.table.setItem(r, 1, QTableWidgetItem(str(row["y"])))
+            self.table_model.set_columns(["x", "y"], [df["x"].to_numpy(), df["y"].to_numpy()])
         except Exception:
             # Fallback: si coords es lista de pares/tuplas o lista de dicts
             data = df
@@ -390,14 +589,11 @@ class XSECSSectionTab(_BaseSectionTab):
                     elif isinstance(item, (tuple, list)) and len(item) >= 2:
                         rows.append((item[0], item[1]))
             # pintar
-            self.table.setRowCount(len(rows))
-            self.table.setColumnCount(2)
-            self.table.setHorizontalHeaderLabels(["x", "y"])
-            for r, (x, y) in enumerate(rows):
-                self.table.setItem(r, 0, QTableWidgetItem(str(x)))
-                self.table.setItem(r, 1, QTableWidgetItem(str(y)))
-
-        self._status(f"XSECS: sección {sec_id} cargada ({self.table.rowCount()} vértices)")
+            xs = np.asarray([r[0] for r in rows], dtype=object)
+            ys = np.asarray([r[1] for r in rows], dtype=object)
+            self.table_model.set_columns(["x", "y"], [xs, ys])
+
+        self._status(f"XSECS: sección {sec_id} cargada ({self.table_model.rowCount()} vértices)")
         # Dibuja solo esta sección (sin limpiar el resto del gráfico)
         self._plot_single(sec_id, clear=False)
     
@@ -442,7 +638,7 @@ class XSECSSectionTab(_BaseSectionTab):
         """Plotea todas las seleccionadas en la lista lateral."""
         if not self.result:
             return
-        selected = [it.text() for it in self.lst_ids.selectedItems()]
+        selected = self.lst_ids.selected_labels()
         if not selected:
             QMessageBox.information(self, "Graficar", "Selecciona una o más secciones en la lista.")
             return
@@ -451,6 +647,7 @@ class XSECSSectionTab(_BaseSectionTab):
             self._plot_single(sec_id, clear=False)
         self.canvas.finalize(show_legend=True)
 
+    @traced(cat="plot")
     def _plot_all(self):
         """Plotea todas las secciones del archivo."""
         if not self.result:
@@ -473,6 +670,8 @@ class XSECITab(_BaseSectionTab):
     """XSECI: selector de tiempo + ID, tabla y gráfico perfil (terreno/agua + velocidad)."""
     # ⬅️ nueva señal: manda el ParseResult (o None si vacías)
     dataLoaded = pyqtSignal(object)  # ParseResult
+    compareLoaded = pyqtSignal(object)  # RunComparison (o None al quitarla)
+    zoneMapsChanged = pyqtSignal(object)  # ZoneMapIndex (o None) → métricas del mapa en planta
     # bandera de cancelación a nivel de instancia
     
 
@@ -481,6 +680,27 @@ class XSECITab(_BaseSectionTab):
         self._cancel_flag = False #opcional?
         self.result = None   # asegúrate de tener este atributo
 
+        # --- Comparación de escenarios: el cargado es A, se elige B (toolbar superior del tab) ---
+        self._cmp: RunComparison | None = None
+        self._cmp_dlg: CompareDialog | None = None
+        self.act_compare = QAction("Comparar…", self)
+        self.act_compare.setToolTip("Abrir un segundo XSECI (escenario B) y comparar B − A")
+        self.act_compare.triggered.connect(self._compare_with)
+        self.act_uncompare = QAction("Quitar comparación", self)
+        self.act_uncompare.setEnabled(False)
+        self.act_uncompare.triggered.connect(lambda: self._set_comparison(None))
+        self.toolbar.addSeparator()
+        self.toolbar.addAction(self.act_compare)
+        self.toolbar.addAction(self.act_uncompare)
+
+        # --- Consultas sobre todo el resultado (índice columnar + zone maps, se arma al cargar) ---
+        self._zmaps: ZoneMapIndex | None = None
+        self._query_dlg: QueryDialog | None = None
+        self.act_query = QAction("Consultar…", self)
+        self.act_query.setToolTip("Buscar tiempos/secciones/estaciones que cumplan condiciones (p.ej. DEPTH > 1.5)")
+        self.act_query.triggered.connect(self._show_query_dialog)
+        self.toolbar.addAction(self.act_query)
+
         # Panel de selección (tiempo + id)
         sel = QWidget(self)
         sel_lay = QHBoxLayout(sel); 
@@ -500,7 +720,15 @@ class XSECITab(_BaseSectionTab):
 
         # --- Combo tiempos ---
         sel_lay.addWidget(QLabel("Tiempo:"))
-        self.cbo_time = QComboBox()
+        # Modelos compartidos de tiempos / IDs (NavIndex): se cargan una vez por archivo; el combo de
+        # secciones solo enmascara las ausentes en el tiempo actual (PresenceProxyModel)
+        self._nav: NavIndex | None = None
+        self._time_model = LabelListModel(parent=self)
+        self._id_model = LabelListModel(parent=self)
+        self._id_proxy = PresenceProxyModel(self)
+        self._id_proxy.setSourceModel(self._id_model)
+        self.cbo_time = FilterComboBox()
+        self.cbo_time.setModel(self._time_model)
         self.cbo_time.setMinimumWidth(180) # Ajustar al ancho del texto
         sel_lay.addWidget(self.cbo_time)
         #sel_lay.addSpacing(12)
@@ -518,11 +746,35 @@ class XSECITab(_BaseSectionTab):
         btn_next.clicked.connect(self._time_next)
         sel_lay.addWidget(btn_next)
 
+        # --- Reproducción temporal (play/pausa + velocidad) ---
+        self.btn_play = QToolButton()
+        self.btn_play.setCheckable(True)
+        self.btn_play.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MediaPlay))
+        self.btn_play.setToolTip("Reproducir / pausar tiempos (Espacio)")
+        self.btn_play.setFixedSize(28, 28)
+        self.btn_play.setIconSize(QSize(18, 18))
+        self.btn_play.toggled.connect(self._toggle_play)
+        sel_lay.addWidget(self.btn_play)
+
+        self.spin_fps = QSpinBox()
+        self.spin_fps.setRange(1, 30)
+        self.spin_fps.setValue(5)
+        self.spin_fps.setSuffix(" fps")
+        self.spin_fps.setToolTip("Velocidad de reproducción (también usada al exportar animación)")
+        self.spin_fps.valueChanged.connect(self._on_fps_changed)
+        sel_lay.addWidget(self.spin_fps)
+
+        self._play_timer = QTimer(self)
+        self._play_timer.timeout.connect(self._play_step)
+        # Prefetch en segundo plano de los próximos bloques (tiempo, sección)
+        self._prefetch = ProfilePrefetcher()
+
         sel_lay.addSpacing(12)
 
         # --- Sección ---
         sel_lay.addWidget(QLabel("Sección:"))
-        self.cbo_id = QComboBox()
+        self.cbo_id = FilterComboBox()
+        self.cbo_id.setModel(self._id_proxy)
         self.cbo_id.setMinimumWidth(140)
         sel_lay.addWidget(self.cbo_id)
 
@@ -543,10 +795,15 @@ class XSECITab(_BaseSectionTab):
         # Canvas + tabla
         self.canvas = PlotCanvas(self, use_colorbar=True)
         self.toolbar = NavigationToolbar(self.canvas, self)
-        self.table = QTableWidget(self)
-        self.table.setColumnCount(0)
+        self.table_model = ColumnsTableModel((), self)
+        self.table = make_table_view(self, self.table_model)
 
         self.aspect_mode = "pretty"  # "pretty" | "equal"
+        # Artistas del perfil reutilizables (cambio de tiempo/sección = solo datos)
+        self._profile = ProfileArtists(self.canvas)
+        self._frames = FrameCache()                 # frames ya vistos → ⏮/⏭ instantáneo al volver
+        self._profile.frame_cache = self._frames
+        self.fast_redraw = True
         
         # --- toggle 1:1 ---
         self.btn_aspect = QPushButton("Escala 1:1")
@@ -585,6 +842,13 @@ class XSECITab(_BaseSectionTab):
         btn_copy.clicked.connect(self._copy_to_clipboard)
         
 
+        # Exportar animación (video/GIF de la sección actual en todos los tiempos)
+        btn_anim = QToolButton()
+        btn_anim.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MediaSeekForward))
+        btn_anim.setIconSize(QSize(18, 18))
+        btn_anim.setToolTip("Exportar animación MP4/GIF de la sección actual")
+        btn_anim.clicked.connect(self._export_animation)
+
         # Exportar lote
         btn_batch = QToolButton()
         btn_batch.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon))
@@ -592,11 +856,21 @@ class XSECITab(_BaseSectionTab):
         btn_batch.setToolTip("Exportar lote (tiempos/secciones múltiples)")
         btn_batch.clicked.connect(self._export_batch)
 
+        # Miniaturas de todas las secciones del tiempo actual
+        btn_thumbs = QToolButton()
+        btn_thumbs.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileDialogContentsView))
+        btn_thumbs.setIconSize(QSize(18, 18))
+        btn_thumbs.setToolTip("Miniaturas de todas las secciones del tiempo actual")
+        btn_thumbs.clicked.connect(self._show_thumbnails)
+        self._thumbs: ThumbnailGridDialog | None = None
+
         # Añádelos a tu layout de selección, por ejemplo después de btn_png / btn_csv:
         sel_lay.addSpacing(12)
         sel_lay.addWidget(self.spin_dpi)
         sel_lay.addWidget(btn_copy)
+        sel_lay.addWidget(btn_anim)
         sel_lay.addWidget(btn_batch)
+        sel_lay.addWidget(btn_thumbs)
 
         # Disposición (gráfico sobre tabla)
         split = QSplitter(self)
@@ -640,6 +914,7 @@ class XSECITab(_BaseSectionTab):
         QShortcut(QKeySequence("0"),          self, activated=self._reset_view)
         QShortcut(QKeySequence("Ctrl+S"),     self, activated=self._export_png)
         QShortcut(QKeySequence("Ctrl+E"),     self, activated=self._export_csv)
+        QShortcut(QKeySequence(Qt.Key.Key_Space), self, activated=self.btn_play.toggle)
 
 
 ### Modificacion para lectura de proceso de abrir XSECI.
@@ -690,18 +965,18 @@ class XSECITab(_BaseSectionTab):
 
     def _on_load_finished(self, result):
         self._prog.close()
+        self._stop_playback()
+        self._set_comparison(None)
         self.result = result
         # opcional: computar variables derivadas
         self.state = compute_variables(self.result)
+        self._build_zone_maps()
         # poblar combos
-        times = self.result.meta.get("times", []) if isinstance(self.result, ParseResult) else sorted(self.result.keys())
-        self.cbo_time.blockSignals(True)
-        self.cbo_time.clear()
-        self.cbo_time.addItems(times)
-        self.cbo_time.blockSignals(False)
+        times = self._set_nav(self.result)
         if times:
             self.cbo_time.setCurrentIndex(0)
             self._populate_ids_for_time(times[0])
+        self.dataLoaded.emit(self.result)
 
     def _on_load_failed(self, msg: str):
         self._prog.close()
@@ -726,6 +1001,113 @@ class XSECITab(_BaseSectionTab):
 
 ### Fin de modificación
 
+    # --- Reproducción temporal ---
+    PREFETCH_AHEAD = 12   # bloques (tiempos) a preparar por delante
+
+    def _toggle_play(self, on: bool):
+        icon = QStyle.StandardPixmap.SP_MediaPause if on else QStyle.StandardPixmap.SP_MediaPlay
+        self.btn_play.setIcon(self.style().standardIcon(icon))
+        if not on:
+            self._play_timer.stop()
+            return
+        n = self.cbo_time.count()
+        if n == 0:
+            self.btn_play.setChecked(False)
+            return
+        if self.cbo_time.currentIndex() >= n - 1:
+            self.cbo_time.setCurrentIndex(0)   # al final: vuelve a empezar
+        self._prefetch_ahead(self.cbo_time.currentIndex() + 1)
+        self._play_timer.start(int(1000 / self.spin_fps.value()))
+
+    def _on_fps_changed(self, fps: int):
+        if self._play_timer.isActive():
+            self._play_timer.setInterval(int(1000 / max(fps, 1)))
+
+    def _play_step(self):
+        i = self.cbo_time.currentIndex()
+        if i >= self.cbo_time.count() - 1:
+            self.btn_play.setChecked(False)   # fin de la simulación
+            return
+        self._prefetch_ahead(i + 2)
+        self.cbo_time.setCurrentIndex(i + 1)
+
+    def _stop_playback(self):
+        if self.btn_play.isChecked():
+            self.btn_play.setChecked(False)
+        # se llama al cargar datos nuevos: lo pre-extraído y los frames cacheados ya no valen
+        self._prefetch.clear()
+        self._frames.clear()
+
+    def _prefetch_ahead(self, start: int):
+        """Pide al hilo de fondo los próximos PREFETCH_AHEAD bloques de la sección actual."""
+        s = self.cbo_id.currentText()
+        if not self.result or not s:
+            return
+        items = []
+        for j in range(max(start, 0), min(start + self.PREFETCH_AHEAD, self.cbo_time.count())):
+            t = self.cbo_time.itemText(j)
+            sec = (self.result.data.get(t) or {}).get(s)
+            if sec and sec.get("df") is not None:
+                items.append(((t, s), sec["df"]))
+        self._prefetch.request(items)
+
+    # --- Exportar animación (off-screen, hilo aparte) ---
+    def _export_animation(self):
+        if not self.result:
+            QMessageBox.information(self, "Exportar animación", "No hay datos cargados.")
+            return
+        s = self.cbo_id.currentText()
+        times = self.result.meta.get("times", [])
+        if not s or not times:
+            return
+        default_path = os.path.join(self._last_dir(), f"{self._slug(s)}__animacion.mp4")
+        path, filt = QFileDialog.getSaveFileName(
+            self, "Exportar animación", default_path, "MP4 (*.mp4);;GIF (*.gif)"
+        )
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += ".gif" if filt.startswith("GIF") else ".mp4"
+        self._save_last_dir(path)
+
+        fps, dpi, mode = self.spin_fps.value(), self.spin_dpi.value(), self.aspect_mode
+        result, sel_times = self.result, list(times)
+        self._start_job(
+            "Exportar animación", f"Renderizando {s}…",
+            lambda progress_cb, cancel_cb: export_profile_animation(
+                result, s, sel_times, path, fps=fps, dpi=dpi, aspect_mode=mode,
+                progress_cb=progress_cb, cancel_cb=cancel_cb),
+            on_finished=lambda _n: QMessageBox.information(
+                self, "Exportar animación", f"Animación guardada:\n{path}"),
+            total=len(sel_times),
+        )
+
+    # --- Miniaturas (small multiples) ---
+    def _show_thumbnails(self):
+        if not self.result:
+            QMessageBox.information(self, "Miniaturas", "No hay datos cargados.")
+            return
+        if self._thumbs is None:
+            self._thumbs = ThumbnailGridDialog(self)
+            self._thumbs.sectionActivated.connect(self._select_section)
+        self._thumbs.show()
+        self._thumbs.raise_()
+        self._sync_thumbnails()
+
+    def _sync_thumbnails(self):
+        """La grilla sigue al tiempo actual (mismo orden de secciones que cbo_id)."""
+        if self._thumbs is None or not self._thumbs.isVisible() or self._nav is None:
+            return
+        t = self.cbo_time.currentText()
+        nav = self._nav
+        ids = [nav.sections[j] for j in nav.sections_at(nav.time_pos.get(t, -1))]
+        self._thumbs.show_time(t, ids, self.result.data.get(t, {}) if self.result else {})
+
+    def _select_section(self, sec_id: str):
+        i = self._id_model.row_of(sec_id)
+        if i >= 0 and self._id_proxy.is_enabled(i):
+            self.cbo_id.setCurrentIndex(i)
+        self.raise_()
 
     def _time_prev(self):
         i = self.cbo_time.currentIndex()
@@ -738,14 +1120,19 @@ class XSECITab(_BaseSectionTab):
             self.cbo_time.setCurrentIndex(i + 1)
 
     def _section_prev(self):
-        i = self.cbo_id.currentIndex()
-        if i > 0:
-            self.cbo_id.setCurrentIndex(i - 1)
+        self._section_step(-1)
 
     def _section_next(self):
-        i = self.cbo_id.currentIndex()
-        if i < self.cbo_id.count() - 1:
-            self.cbo_id.setCurrentIndex(i + 1)
+        self._section_step(+1)
+
+    def _section_step(self, step: int):
+        """Sección anterior/siguiente presente en el tiempo actual (salta las ausentes)."""
+        if self._nav is None:
+            return
+        t = self._nav.time_pos.get(self.cbo_time.currentText(), -1)
+        j = self._nav.step_section(t, self.cbo_id.currentIndex(), step)
+        if j is not None:
+            self.cbo_id.setCurrentIndex(j)
 
 
 
@@ -828,6 +1215,7 @@ class XSECITab(_BaseSectionTab):
 
     def _save_current_figure(self, path: str, dpi: int = 180, transparent: bool = False):
         """Guarda la figura actual (respeta leyenda/cbar) con DPI elegidos."""
+        self._profile.settle()   # sin artistas "animados" pendientes del blitting
         fig = self.canvas.fig
         ax  = self.canvas.ax
         # asegura layout actualizado
@@ -850,13 +1238,9 @@ class XSECITab(_BaseSectionTab):
 
     def _copy_to_clipboard(self):
         try:
-            buf = io.BytesIO()
-            fig = self.canvas.fig
-            fig.canvas.draw()  # actualiza layout
-            fig.savefig(buf, format="png", dpi=self.spin_dpi.value(), bbox_inches="tight")
-            buf.seek(0)
-            data = buf.getvalue()
-            img = QImage.fromData(data, "PNG")
+            self._profile.settle()
+            # Buffer Agg → QImage directo (sin codificar/decodificar PNG); una sola copia para Qt
+            img = figure_to_qimage(self.canvas.fig, dpi=self.spin_dpi.value())
             if img.isNull():
                 # fallback: captura visual del canvas (DPI de pantalla)
                 pix = self.canvas.grab()
@@ -887,26 +1271,135 @@ class XSECITab(_BaseSectionTab):
         self._plot_profile(df, title=title)
 
 
-    def _ensure_unique_path(self, path: str) -> str:
-        """Si path existe, añade _1, _2, ... hasta que sea único."""
-        base, ext = os.path.splitext(path)
-        i = 1
-        out = path
-        while os.path.exists(out):
-            out = f"{base}_{i}{ext}"
-            i += 1
-        return out
+    def _limpiar(self):
+        super()._limpiar()
+        self._set_comparison(None)
+        self._set_zone_maps(None)
+        self._set_nav(None)
+
+    def _memory_usage(self) -> MemoryUsage | None:
+        usage = super()._memory_usage()
+        if usage is not None:
+            usage.add("Cachés", self._frames.nbytes() + self._prefetch.nbytes())
+            if self._cmp is not None:   # escenario B + matrices de diferencias (A ya está contado)
+                c = self._cmp
+                usage.merge(measure((c.result_b, c.Q_a, c.Q_b, c.max_abs, c.times, c.sections)))
+            if self._zmaps is not None:
+                usage.add("Índices", self._zmaps.nbytes())
+        return usage
+
+    # --- Consultas (flow2d_query) ---
+    def _build_zone_maps(self):
+        """Índice de consultas / mapa en planta en un JobWorker (cancelable); zoneMapsChanged al terminar."""
+        self._set_zone_maps(None)
+        result = self.result
+        if result is None or result.meta.get("type") != "XSECI":
+            return
+
+        def _done(index):
+            if self.result is result:    # se cargó otro archivo mientras tanto
+                self._set_zone_maps(index)
+
+        total = len(result.meta.get("times") or result.data)
+        self._start_job("Índice de consultas", "Indexando bloques (consultas y mapa en planta)…",
+                        lambda progress_cb, cancel_cb: build_zone_maps(result, progress_cb, cancel_cb),
+                        on_finished=_done, total=total)
+
+    def _set_zone_maps(self, index: ZoneMapIndex | None):
+        self._zmaps = index
+        if self._query_dlg is not None:
+            self._query_dlg.set_index(index)
+        self.zoneMapsChanged.emit(index)
+
+    def _show_query_dialog(self):
+        if self._query_dlg is None:
+            self._query_dlg = QueryDialog(self)
+            self._query_dlg.hit_activated.connect(self._goto_hit)
+            self._query_dlg.set_index(self._zmaps)
+        self._query_dlg.show()
+        self._query_dlg.raise_()
+        self._query_dlg.txt_query.setFocus()
+
+    def _goto_hit(self, time_label: str, sec_id: str, station: float):
+        i = self.cbo_time.findText(time_label)
+        if i >= 0 and i != self.cbo_time.currentIndex():
+            self.cbo_time.setCurrentIndex(i)
+        self._select_section(sec_id)
+        self._status(f"{self.titulo}: {sec_id} @ {time_label}, estación {station:.3f}")
+
+    # --- Comparación de escenarios (B − A) ---
+    def _compare_with(self):
+        if not self.result:
+            QMessageBox.information(self, "Comparar", "Primero carga el XSECI del escenario A.")
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "XSECI del escenario B", self._last_dir(),
+                                              "XSECI (*.XSECI *.xseci)")
+        if not path:
+            return
+        self._save_last_dir(os.path.dirname(path) + os.sep)
+        a = self.result
+
+        def _job(progress_cb, cancel_cb):
+            # lectura (0..50 %) + alineación/diferencias (50..100 %) en el mismo diálogo
+            b = XSECIParser().parse(path, progress_cb=lambda d, t: progress_cb(int(50 * d / max(t, 1)), 100),
+                                    cancel_cb=cancel_cb)
+            return compare_runs(a, b, progress_cb=lambda d, t: progress_cb(50 + int(50 * d / max(t, 1)), 100),
+                                cancel_cb=cancel_cb)
+
+        def _done(cmp):
+            if self.result is not a:     # A cambió mientras se comparaba
+                return
+            self._set_comparison(cmp)
+            self._show_compare_dialog()
+
+        self._start_job("Comparar escenarios", f"Comparando con {os.path.basename(path)}…", _job,
+                        on_finished=_done, total=100)
+
+    def _set_comparison(self, cmp: RunComparison | None):
+        if cmp is None and self._cmp is None:
+            return
+        self._cmp = cmp
+        self.act_uncompare.setEnabled(cmp is not None)
+        if self._cmp_dlg is not None:
+            self._cmp_dlg.set_comparison(cmp)
+            if cmp is None:
+                self._cmp_dlg.hide()
+            else:
+                self._sync_compare_profile()
+        self.compareLoaded.emit(cmp)
+
+    def _show_compare_dialog(self):
+        if self._cmp_dlg is None:
+            self._cmp_dlg = CompareDialog(self)
+            self._cmp_dlg.section_activated.connect(self._goto_compare_row)
+            self._cmp_dlg.set_comparison(self._cmp)
+        self._cmp_dlg.show()
+        self._cmp_dlg.raise_()
+        self._sync_compare_profile()
+
+    def _sync_compare_profile(self):
+        """El perfil de diferencias sigue al tiempo/sección visibles."""
+        dlg = self._cmp_dlg
+        if dlg is None or self._cmp is None or not dlg.isVisible():
+            return
+        t, s = self.cbo_time.currentText(), self.cbo_id.currentText()
+        dlg.show_profile(self._cmp.profile_diff(t, s) if t and s else None, s, t)
+
+    def _goto_compare_row(self, sec_id: str, time_label: str):
+        i = self.cbo_time.findText(time_label) if time_label else -1
+        if i >= 0 and i != self.cbo_time.currentIndex():
+            self.cbo_time.setCurrentIndex(i)    # repuebla las secciones de ese tiempo
+        self._select_section(sec_id)
+        if self.cbo_id.currentText() != sec_id:
+            self._status(f"{self.titulo}: {sec_id} no está en el escenario A en ese tiempo")
 
     def _export_batch(self):
         if not self.result:
             QMessageBox.information(self, "Exportar lote", "No hay datos cargados.")
             return
 
-        # Conjuntos disponibles
-        times = self.result.meta.get("times", [])
-        all_ids = sorted({sid for t in self.result.data for sid in self.result.data[t].keys()})
-
-        dlg = BatchExportDialog(self, times, all_ids)
+        # Conjuntos disponibles: los mismos modelos de los combos (sin copiar miles de items)
+        dlg = BatchExportDialog(self, self._time_model, self._id_model)
         if dlg.exec() != QDialog.DialogCode.Accepted:
             return
 
@@ -920,43 +1413,47 @@ class XSECITab(_BaseSectionTab):
         if not out_dir:
             return
 
-        dpi = self.spin_dpi.value()
-        count = 0
-
-        try:
-            # Recorremos SIEMPRE por (t, s) y exportamos si existe
-            for t in sel_times:
-                for s in sel_ids:
-                    sec = (self.result.data.get(t) or {}).get(s)
-                    if not sec:
-                        continue
-
-                    df = sec.get("df")
-                    title = f"{s} @ {t}  (Q={sec.get('Q')} {sec.get('Q_units') or ''})"
-
-                    # Renderizamos la vista (NO tocamos combos)
-                    self._plot_profile(df, title=title)
-
-                    # Nombre rico por cada (t, s)
-                    fname = self._default_image_filename("png", time_label=t, section_id=s, info=sec)
-                    out_path = os.path.join(out_dir, fname)
-                    out_path = self._ensure_unique_path(out_path)
-
-                    self._save_current_figure(out_path, dpi=dpi)
-                    count += 1
-
-            self._save_last_dir(out_dir + os.sep)
-            QMessageBox.information(self, "Exportar lote", f"Exportadas {count} imágenes en:\n{out_dir}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Fallo en exportación masiva:\n{e}")
+        # Trabajos (t, s) existentes con nombres únicos calculados de antemano
+        pairs = []
+        for t in sel_times:
+            for s in sel_ids:
+                sec = (self.result.data.get(t) or {}).get(s)
+                if sec:
+                    pairs.append((t, s, sec))
+        if not pairs:
+            QMessageBox.information(self, "Exportar lote", "No hay secciones en los tiempos elegidos.")
+            return
+        names = [self._default_image_filename("png", time_label=t, section_id=s, info=sec)
+                 for t, s, sec in pairs]
+        paths = plan_unique_paths(out_dir, names)
+        jobs = [(profile_title(s, t, sec), sec.get("df"), p) for (t, s, sec), p in zip(pairs, paths)]
+
+        # Render off-screen en paralelo (procesos); la GUI y el lienzo visible no se tocan
+        # mismo tamaño de figura que el lienzo visible y mismos DPI que "Guardar imagen"
+        dpi, mode = self.spin_dpi.value(), self.aspect_mode
+        figsize = tuple(self.canvas.fig.get_size_inches())
+        self._save_last_dir(out_dir + os.sep)
+
+        def _done(res):
+            count, errors = res
+            msg = f"Exportadas {count} imágenes en:\n{out_dir}"
+            if errors:
+                msg += f"\n\n{len(errors)} con errores:\n" + "\n".join(errors[:10])
+            QMessageBox.information(self, "Exportar lote", msg)
+
+        self._start_job(
+            "Exportar lote", f"Exportando {len(jobs)} imágenes…",
+            lambda progress_cb, cancel_cb: export_profile_batch(
+                jobs, dpi=dpi, aspect_mode=mode, figsize=figsize,
+                progress_cb=progress_cb, cancel_cb=cancel_cb),
+            on_finished=_done, total=len(jobs),
+        )
 
 
     
 
+    @traced(cat="load")
     def _cargar_y_mostrar(self, ruta: str):
-        self.result = self.parser.parse(ruta)
-               
-        
         parser = XSECIParser()
 
         # 1) Diálogo de progreso
@@ -999,12 +1496,11 @@ class XSECITab(_BaseSectionTab):
             dlg.close()
 
         # 4) Si todo OK, continuar como antes
+        self._stop_playback()
+        self._set_comparison(None)   # la comparación era contra el A anterior
         self.state = compute_variables(self.result)
-        times = self.result.meta.get("times", [])
-        self.cbo_time.blockSignals(True)
-        self.cbo_time.clear()
-        self.cbo_time.addItems(times)
-        self.cbo_time.blockSignals(False)
+        self._build_zone_maps()
+        times = self._set_nav(self.result)
         if times:
             self.cbo_time.setCurrentIndex(0)
             self._populate_ids_for_time(times[0])
@@ -1012,9 +1508,30 @@ class XSECITab(_BaseSectionTab):
         # 🔔 avisa a quien le interese (Flow2DWidget/XSECH)
         self.dataLoaded.emit(self.result)
 
+    def _set_nav(self, result) -> list[str]:
+        """Carga los modelos de tiempos/IDs desde el NavIndex del resultado (una vez por archivo)."""
+        nav = getattr(result, "nav", None)
+        if nav is None and result:
+            # resultados sin índice (p.ej. armados a mano): se arma aquí
+            nav = build_nav_index(result.data, result.meta.get("times") or list(result.data.keys()))
+        self._nav = nav
+        self._last_id_for_time = {}
+        for cbo in (self.cbo_time, self.cbo_id):
+            cbo.blockSignals(True)
+        self._id_proxy.set_mask(None)
+        self._time_model.set_labels(nav.times if nav else [])
+        self._id_model.set_labels(nav.sections if nav else [])
+        for cbo in (self.cbo_time, self.cbo_id):
+            cbo.blockSignals(False)
+        return nav.times if nav else []
+
     def _populate_ids_for_time(self, time_label: str, preferred_id: str | None = None) -> str | None:
-        """Llena el combo de IDs para el tiempo seleccionado y carga una sola vez."""
-        if not self.result:
+        """
+        Habilita en cbo_id las secciones presentes en ese tiempo (fila de NavIndex.present; la lista
+        de IDs no se reconstruye) y carga una sola vez.
+        """
+        nav = self._nav
+        if not self.result or nav is None:
             return None
 
         # estado previo y memoria por tiempo
@@ -1022,28 +1539,24 @@ class XSECITab(_BaseSectionTab):
         if not hasattr(self, "_last_id_for_time"):
             self._last_id_for_time: dict[str, str] = {}
 
-        ids = sorted((self.result.data.get(time_label) or {}).keys())
-        # Relleno del combo sin señales
-        self.cbo_id.blockSignals(True)
-        self.cbo_id.clear()
-        if ids:
-            self.cbo_id.addItems(ids)
+        ti = nav.time_pos.get(time_label, -1)
+        self._id_proxy.set_mask(nav.present[ti] if ti >= 0 else np.zeros(len(nav.sections), dtype=bool))
 
         # Decide el target de forma robusta
         target = None
-        if preferred_id and preferred_id in ids:
-            target = preferred_id
-        elif time_label in self._last_id_for_time and self._last_id_for_time[time_label] in ids:
-            target = self._last_id_for_time[time_label]
-        elif prev_id in ids:
-            target = prev_id
-        elif ids:
-            target = ids[0]
-
-        if target:
-            self.cbo_id.setCurrentText(target)
+        for cand in (preferred_id, self._last_id_for_time.get(time_label), prev_id):
+            if cand and nav.has(ti, nav.section_pos.get(cand, -1)):
+                target = cand
+                break
+        if target is None:
+            # la sección actual no existe en este tiempo: la presente más cercana
+            j = nav.nearest_section(ti, max(nav.section_pos.get(prev_id, 0), 0))
+            target = nav.sections[j] if j is not None else None
 
-        self.cbo_id.blockSignals(False)
+        if target and self.cbo_id.currentIndex() != nav.section_pos[target]:
+            self.cbo_id.blockSignals(True)
+            self.cbo_id.setCurrentIndex(nav.section_pos[target])
+            self.cbo_id.blockSignals(False)
 
         # Cargar y recordar una sola vez
         if target:
@@ -1052,8 +1565,7 @@ class XSECITab(_BaseSectionTab):
             return target
 
         # Si no hay IDs, limpia tabla/gráfico si quieres:
-        self.table.clearContents()
-        self.table.setRowCount(0)
+        self.table_model.clear()
         self.canvas.clear()
         self.canvas.ax.set_title(f"{time_label}: sin secciones")
         self.canvas.draw_idle()
@@ -1065,6 +1577,7 @@ class XSECITab(_BaseSectionTab):
         current_id = self.cbo_id.currentText()
         if t:
             self._populate_ids_for_time(t, preferred_id=current_id)  # <— mantiene la misma sección
+            self._sync_thumbnails()
 
     def _on_id_changed(self, _idx: int):
         t = self.cbo_time.currentText()
@@ -1084,185 +1597,55 @@ class XSECITab(_BaseSectionTab):
         # Tabla
         self._populate_table(df)
 
-        # Perfil
-        self._plot_profile(df, title=f"{sec_id} @ {time_label}  (Q={sec.get('Q')} {sec.get('Q_units') or ''})")
+        # Perfil (usa lo pre-extraído por el prefetch si ya está listo)
+        self._plot_profile(df, title=f"{sec_id} @ {time_label}  (Q={sec.get('Q')} {sec.get('Q_units') or ''})",
+                           data=self._prefetch.get((time_label, sec_id)),
+                           cache_key=(time_label, sec_id, self._theme_key()))
+        self._sync_compare_profile()
 
+    def _theme_key(self) -> int:
+        """Identifica el tema activo (hoja de estilo de la ventana) para la caché de frames."""
+        return hash(self.window().styleSheet())
+
+    @traced(cat="table")
     def _populate_table(self, df):
+        """Muestra el df en el modelo virtual (vistas NumPy por columna; no modifica df)."""
         # Siempre mostrar todas las columnas de interés
         col_order = ["ELEM", "STATION", "BEDEL", "DEPTH", "WSEL",
                      "VEL_NORM", "FROUDE", "QS_NORM"]
 
         if df is None or df.empty:
-            self.table.clearContents()
-            self.table.setRowCount(0)
-            self.table.setColumnCount(len(col_order))
-            self.table.setHorizontalHeaderLabels(col_order)
-            return
-
-        # Agregar columnas faltantes con NaN/None para completar el orden
-        for col in col_order:
-            if col not in df.columns:
-                df[col] = None
-
-        # Reordenar DataFrame según col_order
-        df = df[col_order]
-
-        # Configurar tabla
-        self.table.setColumnCount(len(col_order))
-        self.table.setHorizontalHeaderLabels(col_order)
-        self.table.setRowCount(len(df))
-
-        # Llenar tabla
-        for r, (_, row) in enumerate(df.iterrows()):
-            for c, name in enumerate(col_order):
-                val = row[name]
-                self.table.setItem(r, c, QTableWidgetItem("" if val is None else str(val)))
-    def _get_col(self, df, *candidates):
-        for name in candidates:
-            if name in df.columns:
-                return df[name].astype(float).to_numpy()
-        # heurística: buscar por prefijo
-        for cand in candidates:
-            for col in df.columns:
-                if col.replace(" ", "").startswith(cand.replace(" ", "")):
-                    try: return df[col].astype(float).to_numpy()
-                    except Exception: pass
-        return None
+            self.table_model.clear(col_order)
+            return
 
-    def _plot_profile(self, df, title: str = ""):
-        """Dibuja Terreno (STATION vs BEDEL), Agua (STATION vs WSEL) y cortina coloreada por VEL_NORM."""
-        # 1) Limpiar el lienzo y validar datos
-        self.canvas.clear()
-        ax = self.canvas.ax
-        if (df is None) or df.empty: 
-            ax.set_title(title or "Sin datos")
+        # Columnas faltantes → None (celdas vacías), sin escribir en el df cacheado
+        cols = [df[c].to_numpy() if c in df.columns else None for c in col_order]
+        self.table_model.set_columns(col_order, cols)
+    @traced(cat="plot")
+    def _plot_profile(self, df, title: str = "", full: bool = False, data=None, cache_key=None):
+        """
+        Dibuja Terreno (STATION vs BEDEL), Agua (STATION vs WSEL) y cortina coloreada por VEL_NORM.
+        Si la estructura del perfil no cambia, reusa los artistas (solo datos + blitting);
+        `full=True` fuerza la reconstrucción completa (reset de vista, exportación).
+        `cache_key`: frames ya vistos se restauran de la caché de imágenes sin redibujar.
+        """
+        if (df is None) or df.empty:
+            self.canvas.clear()
+            self.canvas.ax.set_title(title or "Sin datos")
             self.canvas.draw_idle()
             return
 
-        # 2) Obtener columnas de forma robusta (acepta variantes de encabezado)
-        #_get_col intenta con varios candidatos y fallback por prefijo
-        # Obtén columnas (robusto ante nombres ligeramente distintos)
-        st = self._get_col(df, "STATION(m)", "STATION")
-        bed = self._get_col(df, "BEDEL(m)", "BEDEL")
-        wsl = self._get_col(df, "WSEL(m)", "WSEL")
-        vel = self._get_col(df, "VEL_NORM(m/s)", "VEL_NORM")
-
-        # Terreno y estación son imprescindibles para dibujar el perfil
-        if (st is None) or (bed is None):
+        # Columnas robustas (acepta variantes de encabezado); STATION/BEDEL imprescindibles
+        if data is None:
+            data = extract_profile(df)
+        if data is None:
+            self.canvas.clear()
             self.canvas.ax.set_title("Faltan columnas STATION/BEDEL")
             self.canvas.draw_idle()
             return
 
-        # 3) Asegurar que las series sean arreglos NumPy y queden alineadas
-        # (evita errores si alguna serie es más larga)
-        st  = np.asarray(st,  dtype=float)
-        bed = np.asarray(bed, dtype=float)
-        n_common = min(len(st), len(bed))
-        st, bed = st[:n_common], bed[:n_common]
-        
-        if (wsl is not None):
-            wsl = np.asarray(wsl, dtype=float)[:n_common]
-        if (vel is not None):
-            vel = np.asarray(vel, dtype=float)[:n_common]
-
-        # 4) Trazos base: primero agua (debajo), luego terreno (encima)
-        #    — Colores definidos: WSEL celeste, BEDEL marrón
-        ax = self.canvas.ax
-        # Asegura que las longitudes coincidan
-        if (wsl is not None):
-            ax.plot(st, wsl, linewidth=2, color="#00AEEF", label="Nivel (WSEL)", zorder=2)   # celeste cielo
-        ax.plot(st, bed, linewidth=2.5, color="#8B5A2B", label="Terreno (BEDEL)", zorder=3)   # marrón tierra
-
-        # 5) Cortina coloreada por velocidad (si hay wsl y vel)
-        if (wsl is not None) and (vel is not None):
-            # Asegura longitudes compatibles
-            segs = np.stack([
-                np.column_stack([st, bed]),
-                np.column_stack([st, wsl])], 
-                axis=1
-            )
-
-            lc = LineCollection(segs, cmap="viridis", array=vel, linewidths=2, alpha=0.85, zorder=1)
-            ax.add_collection(lc)
-
-            # ✅ UNA sola línea: crea/actualiza el colorbar en el cax fijo, sin cambiar layout
-            self.canvas.get_or_update_colorbar(lc, label="Velocidad (m/s)")
-        else:
-            # Si no hay velocidad, asegúrate de no dejar colorbar “huérfano”
-            if getattr(self.canvas, "_cbar", None):
-                try:
-                    self.canvas._cbar.remove()
-                except Exception:
-                    pass
-                self.canvas._cbar = None
-
-        # 6) Títulos y etiquetas de ejes
-        ax.set_title(title or "Perfil XSECI")
-        ax.set_xlabel("Distancia (m)", labelpad=10)  # un poco más de espacio
-        ax.set_ylabel("Elevación (m)")
-
-
-        # 7) Altura mínima visible (por si el perfil es muy "plano")
-
-        y_vals = [*bed.tolist()]
-        if bed is not None: 
-            y_vals.extend(bed.tolist())
-        if wsl is not None: 
-            y_vals.extend(wsl.tolist())
-        if y_vals:
-            y_min, y_max = float(np.nanmin(y_vals)), float(np.nanmax(y_vals))
-            span = y_max - y_min
-            min_span = 1.0  # mínimo en unidades de elevación (m). Ajusta según tus datos
-            if span < min_span:
-                pad = (min_span - span) / 2 or 0.5
-                ax.set_ylim(y_min - pad, y_max + pad)
-
-        # 8) Aspecto (proporción). Modo 1:1 vs “pretty”
-        if getattr(self, "aspect_mode", "pretty") == "equal":
-            # 1:1 y límites coherentes sin aplastar
-            (xl, xu), (yl, yu) = self._apply_equal_aspect_custom(ax, st, bed, wsl)
-            ax.set_autoscale_on(False)
-            ax.set_autoscalex_on(False)
-            ax.set_autoscaley_on(False)
-        else:
-            # Vista “bonita”: relación caja estable y márgenes suaves
-            self._apply_pretty_aspect(ax)
-            try:
-                ax.set_aspect("auto")
-                ax.set_box_aspect(0.6)  # alto ≈ 60% del ancho (ajústalo si quieres)
-            except Exception:
-                pass
-            ax.autoscale(enable=True, tight=True)
-            ax.margins(0.05)
-
-        # Mostrar leyenda solo si hay al menos 1 línea con label
-        handles, labels = ax.get_legend_handles_labels()
-        if handles:
-            # Asegura que la leyenda no se superponga al gráfico
-            ax.legend(
-                loc="upper center",
-                bbox_to_anchor=(0.5, -0.25),
-                bbox_transform=ax.transAxes,        # << CLAVE: coordenadas de figura
-                ncol=2,
-                fontsize=8,
-                frameon=True,
-                borderaxespad=0.3,
-            )
-
-
-        # 9) Cuadrícula y render final
-        ax.grid(True, linestyle=":", alpha=0.6)
-        self.canvas.draw_idle()
-
-
-  
-    def _apply_pretty_aspect(self, ax):
-        """Vista estética: rectangular estable."""
-        try:
-            ax.set_aspect("auto")
-            ax.set_box_aspect(0.6)   # 0.5..0.8 a gusto
-        except Exception:
-            pass
+        self._profile.render(data, title, getattr(self, "aspect_mode", "pretty"),
+                             full=full or not self.fast_redraw, cache_key=cache_key)
 
     def _apply_equal_aspect_expand_y(self, ax, x, y1, y2=None):
         """
@@ -1293,65 +1676,6 @@ class XSECITab(_BaseSectionTab):
         except Exception:
             pass
 
-    def _apply_equal_aspect_custom(self, ax, x, y1, y2=None):
-        """
-        Escala 1:1 sin aplastar:
-        - X: [0, Xmax]
-        - Altura mínima en Y = 0.25 * Xmax (si los datos son más planos).
-        - Y centrado alrededor del centro de los datos.
-        """
-        import numpy as np
-
-        # --- saneo de datos ---
-        x = np.asarray(x, float)
-        y1 = np.asarray(y1, float)
-        if y2 is not None:
-            y2 = np.asarray(y2, float)
-
-        x = x[np.isfinite(x)]
-        yvals = y1[np.isfinite(y1)]
-        if y2 is not None:
-            yvals = np.concatenate([yvals, y2[np.isfinite(y2)]])
-
-        if x.size == 0 or yvals.size == 0:
-            # fallback amable
-            ax.autoscale(enable=True, tight=True)
-            try: ax.set_aspect("equal", adjustable="box")
-            except Exception: pass
-            return ax.get_xlim(), ax.get_ylim()
-
-        # --- eje X ---
-        xmin = 0.0
-        xmax = float(np.nanmax(x))
-        if not np.isfinite(xmax) or xmax <= 0:
-            xmax = 1.0  # evita rango 0 en X
-
-        # --- eje Y ---
-        y_min = float(np.nanmin(yvals))
-        y_max = float(np.nanmax(yvals))
-        y_mid = 0.5 * (y_min + y_max)
-        y_span_data = max(y_max - y_min, 0.0)
-
-        y_span_target = max(0.25 * xmax, y_span_data)  # ≥ 25% de Xmax
-        # si quedara 0 por algún caso extremo, abre un epsilon
-        if y_span_target <= 0:
-            y_span_target = 1.0
-
-        y_lower = y_mid - y_span_target / 2.0
-        y_upper = y_mid + y_span_target / 2.0
-        if y_lower == y_upper:
-            y_lower -= 0.5
-            y_upper += 0.5
-
-        ax.set_xlim(xmin, xmax)
-        ax.set_ylim(y_lower, y_upper)
-        try:
-            ax.set_aspect("equal", adjustable="box")
-        except Exception:
-            pass
-        # Devuelve límites para uso posterior
-        return (xmin, xmax), (y_lower, y_upper)
-
     def _reset_view(self):
         """Replotea la selección actual en modo 'pretty' (reset zoom/vista)."""
         self.aspect_mode = "pretty"
@@ -1370,7 +1694,7 @@ class XSECITab(_BaseSectionTab):
             return
         df = sec.get("df")
         title = f"{s} @ {t}  (Q={sec.get('Q')} {sec.get('Q_units') or ''})"
-        self._plot_profile(df, title=title)
+        self._plot_profile(df, title=title, full=True)
 
     # --- Bookmarks ---
     def _add_bookmark(self):
@@ -1390,18 +1714,14 @@ class XSECITab(_BaseSectionTab):
         t, s = self.cbo_bookmarks.currentData()
         # cambiar tiempo SIN perder sección (ya lo controlas en _on_time_changed)
         # pero como queremos ir directo a (t,s), lo forzamos:
+        i = self._time_model.row_of(t)
+        if i < 0:
+            return
         self.cbo_time.blockSignals(True)
-        self.cbo_time.setCurrentText(t)
+        self.cbo_time.setCurrentIndex(i)
         self.cbo_time.blockSignals(False)
-        # poblar ids para ese tiempo y seleccionar s
-        self._populate_ids_for_time(t)
-        # si existe s para ese tiempo, selecciona
-        i = self.cbo_id.findText(s)
-        if i >= 0:
-            self.cbo_id.setCurrentIndex(i)
-        else:
-            # si no existe, al menos dejamos el primero
-            pass
+        # habilitar ids de ese tiempo y seleccionar s (si no existe, la más cercana)
+        self._populate_ids_for_time(t, preferred_id=s)
 
     def _slug(self, s: str) -> str:
         # Seguro para nombres de archivo
@@ -1436,35 +1756,26 @@ class XSECITab(_BaseSectionTab):
             base += f"__Q={float(q):.3f}_{_slug(qu)}"
         return f"{base}.{ext}"
 
-    def _last_dir(self) -> str:
-        s = QSettings("MyFriendTGI", "Flow2D")
-        return s.value("export_dir", os.path.expanduser("~"))
-
-    def _save_last_dir(self, path: str):
-        s = QSettings("MyFriendTGI", "Flow2D")
-        s.setValue("export_dir", os.path.dirname(path))
-
 class BatchExportDialog(QDialog):
-    """Selector multi para tiempos/secciones. Permite cruzar ambos conjuntos."""
-    def __init__(self, parent, times: list[str], ids: list[str]):
+    """
+    Selector multi para tiempos/secciones. Permite cruzar ambos conjuntos.
+    Usa los modelos de tiempos/IDs de la pestaña (compartidos, con filtro por texto).
+    """
+    def __init__(self, parent, times_model: LabelListModel, ids_model: LabelListModel):
         super().__init__(parent)
         self.setWindowTitle("Exportar lote")
-        self.resize(500, 360)
+        self.resize(500, 420)
 
         lay = QVBoxLayout(self)
 
         lay.addWidget(QLabel("Selecciona tiempos:"))
-        self.lst_times = QListWidget()
-        self.lst_times.setSelectionMode(self.lst_times.SelectionMode.MultiSelection)
-        for t in times:
-            QListWidgetItem(t, self.lst_times)
+        self.lst_times = FilterListView(self, "Filtrar tiempos…", QListView.SelectionMode.MultiSelection)
+        self.lst_times.set_source(times_model)
         lay.addWidget(self.lst_times)
 
         lay.addWidget(QLabel("Selecciona secciones:"))
-        self.lst_ids = QListWidget()
-        self.lst_ids.setSelectionMode(self.lst_ids.SelectionMode.MultiSelection)
-        for s in ids:
-            QListWidgetItem(s, self.lst_ids)
+        self.lst_ids = FilterListView(self, "Filtrar secciones…", QListView.SelectionMode.MultiSelection)
+        self.lst_ids.set_source(ids_model)
         lay.addWidget(self.lst_ids)
 
         self.chk_cartesian = QCheckBox("Cruzar tiempos × secciones (cartesiano)")
@@ -1481,9 +1792,333 @@ class BatchExportDialog(QDialog):
         lay.addLayout(row)
 
     def selections(self):
-        ts = [i.text() for i in self.lst_times.selectedItems()]
-        ss = [i.text() for i in self.lst_ids.selectedItems()]
+        ts = self.lst_times.selected_labels()
+        ss = self.lst_ids.selected_labels()
         return ts, ss, self.chk_cartesian.isChecked()
+class HydroSummaryDialog(QDialog):
+    """Resumen por sección (Q pico, hora del pico, volumen) de la fuente XSECH actual; no modal."""
+    section_activated = pyqtSignal(int)   # fila = columna de Q
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setWindowTitle("Resumen de hidrogramas")
+        self.resize(560, 420)
+        self._summary: HydroSummary | None = None
+
+        lay = QVBoxLayout(self)
+        self.lbl_info = QLabel("")
+        lay.addWidget(self.lbl_info)
+        self.model = ColumnsTableModel()
+        self.view = make_table_view(self, self.model)
+        self.view.setToolTip("Doble clic: graficar solo esa sección")
+        self.view.doubleClicked.connect(lambda ix: self.section_activated.emit(ix.row()))
+        lay.addWidget(self.view, 1)
+
+        row = QHBoxLayout()
+        row.addStretch(1)
+        self.btn_export = QPushButton("Exportar…")
+        self.btn_export.setEnabled(False)
+        self.btn_export.clicked.connect(self._export)
+        row.addWidget(self.btn_export)
+        btn_close = QPushButton("Cerrar")
+        btn_close.clicked.connect(self.close)
+        row.addWidget(btn_close)
+        lay.addLayout(row)
+
+    def set_summary(self, summary: HydroSummary | None, source: str = "", elapsed: float = 0.0):
+        self._summary = summary
+        if summary is None:
+            self.model.clear([])
+            self.lbl_info.setText("Sin datos")
+            self.btn_export.setEnabled(False)
+            return
+        headers, cols = summary.as_columns()
+        self.model.set_columns(headers, cols, [None, fixed_format(3), fixed_format(3), fixed_format(1), None])
+        self.lbl_info.setText(f"{source}: {len(summary.sections)} secciones  —  "
+                              f"volumen = ∫Q dt (trapecios, m³ si Q en m³/s)  ({elapsed * 1000:.0f} ms)")
+        self.btn_export.setEnabled(True)
+
+    def _export(self):
+        import pandas as pd
+        if self._summary is None:
+            return
+        s = QSettings("MyFriendTGI", "Flow2D")
+        path, filt = QFileDialog.getSaveFileName(
+            self, "Guardar resumen", os.path.join(s.value("export_dir", os.path.expanduser("~")),
+                                                  "resumen_hidrogramas.csv"),
+            "CSV (*.csv);;Excel (*.xlsx)")
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += ".xlsx" if filt.startswith("Excel") else ".csv"
+        s.setValue("export_dir", os.path.dirname(path))
+        headers, cols = self._summary.as_columns()
+        df = pd.DataFrame(dict(zip(headers, cols)))
+        try:
+            if path.lower().endswith(".xlsx"):
+                with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+                    df.to_excel(writer, sheet_name="Resumen", index=False)
+            else:
+                df.to_csv(path, index=False)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo guardar:\n{e}")
+            return
+        print(f"[XSECH] Resumen -> {path}")
+
+
+class CompareDialog(QDialog):
+    """
+    Comparación de escenarios (B − A), no modal:
+      - Izquierda: ranking de secciones por máximo cambio en el evento (métrica elegible).
+      - Derecha: perfil de diferencias del tiempo/sección visibles en XSECI (A/B arriba, Δ abajo).
+    """
+    section_activated = pyqtSignal(str, str)   # (sección, tiempo del máximo cambio)
+    METRICS = (*DIFF_VARS, "Q")
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setWindowTitle("Comparación de escenarios")
+        self.resize(1100, 560)
+        self._cmp: RunComparison | None = None
+        self._ranking: tuple[list[str], list[np.ndarray]] | None = None
+
+        lay = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.lbl_info = QLabel("")
+        top.addWidget(self.lbl_info, 1)
+        top.addWidget(QLabel("Ordenar por:"))
+        self.cbo_metric = QComboBox()
+        self.cbo_metric.addItems([f"Δ{v}" for v in self.METRICS])
+        self.cbo_metric.currentIndexChanged.connect(self._refresh_ranking)
+        top.addWidget(self.cbo_metric)
+        lay.addLayout(top)
+
+        split = QSplitter(Qt.Orientation.Horizontal, self)
+        self.model = ColumnsTableModel()
+        self.view = make_table_view(self, self.model)
+        self.view.setToolTip("Doble clic: ir a la sección en el tiempo del máximo cambio")
+        self.view.doubleClicked.connect(self._on_row_activated)
+        split.addWidget(self.view)
+        self.fig = Figure(figsize=(6, 4), tight_layout=True)
+        self.ax_ab = self.fig.add_subplot(211)
+        self.ax_d = self.fig.add_subplot(212, sharex=self.ax_ab)
+        self.canvas = FigureCanvas(self.fig)
+        split.addWidget(self.canvas)
+        split.setStretchFactor(0, 2)
+        split.setStretchFactor(1, 3)
+        lay.addWidget(split, 1)
+
+        row = QHBoxLayout()
+        row.addStretch(1)
+        self.btn_export = QPushButton("Exportar ranking…")
+        self.btn_export.setEnabled(False)
+        self.btn_export.clicked.connect(self._export)
+        row.addWidget(self.btn_export)
+        btn_close = QPushButton("Cerrar")
+        btn_close.clicked.connect(self.close)
+        row.addWidget(btn_close)
+        lay.addLayout(row)
+
+    def set_comparison(self, cmp: RunComparison | None):
+        self._cmp = cmp
+        if cmp is None:
+            self._ranking = None
+            self.model.clear([])
+            self.lbl_info.setText("Sin comparación")
+            self.btn_export.setEnabled(False)
+            self.show_profile(None, "", "")
+            return
+        only_a = int((cmp.in_a & ~cmp.in_b).sum())
+        only_b = int((cmp.in_b & ~cmp.in_a).sum())
+        self.lbl_info.setText(f"A = {cmp.label_a}   B = {cmp.label_b}   —   {len(cmp.sections)} secciones "
+                              f"({only_a} solo A, {only_b} solo B), {len(cmp.times)} tiempos")
+        self.btn_export.setEnabled(True)
+        self._refresh_ranking()
+
+    def _refresh_ranking(self):
+        if self._cmp is None:
+            return
+        var = self.METRICS[self.cbo_metric.currentIndex()]
+        self._ranking = self._cmp.ranking(var)
+        headers, cols = self._ranking
+        num = fixed_format(3)
+        self.model.set_columns(headers, cols, [None, None, num, num, num, num, num])
+        self.view.resizeColumnToContents(0)
+
+    def _on_row_activated(self, ix):
+        if self._cmp is None or self._ranking is None:
+            return
+        _headers, cols = self._ranking
+        sec_id, th = str(cols[0][ix.row()]), cols[2][ix.row()]
+        t_label = ""
+        if np.isfinite(th):
+            i = int(np.searchsorted(self._cmp.time_hours, th))
+            t_label = self._cmp.times[min(i, len(self._cmp.times) - 1)]
+        self.section_activated.emit(sec_id, t_label)
+
+    def show_profile(self, cmp_profile: ProfileDiff | None, sec_id: str, time_label: str):
+        """Perfil A/B (lámina y fondo) y diferencias por estación de la sección visible."""
+        self.ax_ab.clear()
+        self.ax_d.clear()
+        if cmp_profile is None:
+            self.ax_ab.text(0.5, 0.5, "Sin perfil para comparar", ha="center", va="center",
+                            transform=self.ax_ab.transAxes)
+            self.canvas.draw_idle()
+            return
+        p = cmp_profile
+        x = p.station
+        self.ax_ab.plot(x, p.bed_a, color="#8c6d46", linewidth=1.2, label="Fondo A")
+        self.ax_ab.plot(x, p.bed_b, color="#8c6d46", linewidth=1.0, linestyle="--", label="Fondo B")
+        self.ax_ab.plot(x, p.a["WSEL"], color="#1f77b4", linewidth=1.4, label="WSEL A")
+        self.ax_ab.plot(x, p.b["WSEL"], color="#d62728", linewidth=1.2, linestyle="--", label="WSEL B")
+        self.ax_ab.set_ylabel("Elevación (m)")
+        self.ax_ab.set_title(f"{sec_id} @ {time_label}")
+        self.ax_ab.legend(loc="best", fontsize=8)
+        self.ax_ab.grid(True, alpha=0.3)
+        colors = {"WSEL": "#1f77b4", "DEPTH": "#2ca02c", "VEL_NORM": "#ff7f0e"}
+        for v in DIFF_VARS:
+            self.ax_d.plot(x, p.d[v], color=colors[v], linewidth=1.2, label=f"Δ{v}")
+        self.ax_d.axhline(0.0, color="0.4", linewidth=0.8)
+        self.ax_d.set_xlabel("Estación (m)")
+        self.ax_d.set_ylabel("B − A")
+        self.ax_d.legend(loc="best", fontsize=8)
+        self.ax_d.grid(True, alpha=0.3)
+        self.canvas.draw_idle()
+
+    def _export(self):
+        import pandas as pd
+        if self._ranking is None:
+            return
+        s = QSettings("MyFriendTGI", "Flow2D")
+        path, filt = QFileDialog.getSaveFileName(
+            self, "Guardar ranking", os.path.join(s.value("export_dir", os.path.expanduser("~")),
+                                                  "comparacion_escenarios.csv"),
+            "CSV (*.csv);;Excel (*.xlsx)")
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += ".xlsx" if filt.startswith("Excel") else ".csv"
+        s.setValue("export_dir", os.path.dirname(path))
+        headers, cols = self._ranking
+        df = pd.DataFrame(dict(zip(headers, cols)))
+        try:
+            if path.lower().endswith(".xlsx"):
+                with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+                    df.to_excel(writer, sheet_name="Comparación", index=False)
+            else:
+                df.to_csv(path, index=False)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo guardar:\n{e}")
+            return
+        print(f"[COMPARE] Ranking -> {path}")
+
+
+class QueryDialog(QDialog):
+    """
+    Consulta sobre todo el XSECI cargado (p.ej. "DEPTH > 1.5 o VEL_NORM > 3"); no modal.
+    Cada fila es un punto (tiempo, sección, estación) que cumple; clic → ir a ese perfil.
+    """
+    hit_activated = pyqtSignal(str, str, float)   # tiempo, sección, estación
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setWindowTitle("Consultar resultados")
+        self.resize(640, 480)
+        self._index: ZoneMapIndex | None = None
+        self._result: QueryResult | None = None
+
+        lay = QVBoxLayout(self)
+        row = QHBoxLayout()
+        self.txt_query = QLineEdit(QSettings("MyFriendTGI", "Flow2D").value("last_query", "DEPTH > 1.5 o VEL_NORM > 3"))
+        self.txt_query.setToolTip(f"Columnas: {', '.join(QUERY_COLUMNS)}  ·  operadores: > >= < <= = !=\n"
+                                  "Unir con 'y' / 'o' ('y' se evalúa primero)")
+        self.txt_query.returnPressed.connect(self.run_query)
+        row.addWidget(self.txt_query, 1)
+        self.btn_run = QPushButton("Buscar")
+        self.btn_run.clicked.connect(self.run_query)
+        row.addWidget(self.btn_run)
+        lay.addLayout(row)
+
+        self.lbl_info = QLabel("")
+        lay.addWidget(self.lbl_info)
+        self.model = ColumnsTableModel()
+        self.view = make_table_view(self, self.model)
+        self.view.setToolTip("Clic: mostrar ese tiempo/sección en XSECI")
+        self.view.clicked.connect(self._on_row_clicked)
+        lay.addWidget(self.view, 1)
+
+        row = QHBoxLayout()
+        row.addStretch(1)
+        btn_close = QPushButton("Cerrar")
+        btn_close.clicked.connect(self.close)
+        row.addWidget(btn_close)
+        lay.addLayout(row)
+
+    def set_index(self, index: ZoneMapIndex | None):
+        """Nuevo resultado cargado: se descartan los resultados anteriores."""
+        self._index = index
+        self._result = None
+        self.model.clear([])
+        self.btn_run.setEnabled(index is not None)
+        if index is None:
+            self.lbl_info.setText("No hay un XSECI cargado")
+        else:
+            self.lbl_info.setText(f"{index.n_rows:,} filas en {index.n_blocks:,} bloques (tiempo, sección)")
+
+    def run_query(self):
+        if self._index is None:
+            return
+        text = self.txt_query.text()
+        try:
+            res = self._index.query(text)
+        except ValueError as e:
+            self.lbl_info.setText(f"⚠️ {e}")
+            return
+        QSettings("MyFriendTGI", "Flow2D").setValue("last_query", text)
+        self._result = res
+        headers, cols = res.as_columns()
+        num = fixed_format(3)
+        self.model.set_columns(headers, cols, [None, None] + [num] * (len(headers) - 2))
+        self.lbl_info.setText(f"{len(res):,} puntos en {res.n_sections} secciones y {res.blocks_matched:,} bloques  —  "
+                              f"evaluados {res.blocks_scanned:,} de {res.blocks_total:,} bloques "
+                              f"({res.elapsed * 1000:.1f} ms)")
+
+    def _on_row_clicked(self, ix):
+        res = self._result
+        if res is None or not (0 <= ix.row() < len(res)):
+            return
+        r = ix.row()
+        self.hit_activated.emit(res.times[res.t_idx[r]], res.sections[res.s_idx[r]], float(res.station[r]))
+
+
+class JobWorker(QObject):
+    """Ejecuta fn(progress_cb, cancel_cb) en un QThread (render/exportación larga sin congelar la GUI)."""
+    progress = pyqtSignal(int, int)   # done, total
+    finished = pyqtSignal(object)     # valor devuelto por fn
+    failed   = pyqtSignal(str)
+    cancelled= pyqtSignal()
+
+    def __init__(self, fn):
+        super().__init__()
+        self._fn = fn
+        self._cancel = False
+
+    def request_cancel(self):
+        self._cancel = True
+
+    def run(self):
+        name_thread("Flow2D job")
+        try:
+            res = self._fn(self.progress.emit, lambda: self._cancel)
+            if self._cancel:
+                self.cancelled.emit()
+            else:
+                self.finished.emit(res)
+        except (RenderCancelled, ParseCancelled, ExportCancelled, CompareCancelled, QueryCancelled):
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+
 class XSECIWorker(QObject):
     progress = pyqtSignal(int, int)   # done, total
     finished = pyqtSignal(object)     # result
@@ -1525,7 +2160,7 @@ class XSECHidrogramaTab(QWidget):
     Hidrogramas por sección:
       - Arriba: gráfico (horas vs Q)
       - Abajo: tabla (tiempo vs columnas de secciones)
-      - Fuente de caudal: 'XSECI' o 'Ajustados'
+      - Fuente de caudal: 'XSECI' o 'Ajustados' (+ 'B' y 'ΔQ' si XSECI tiene una comparación de escenarios)
       - Multi-selección de secciones a graficar
     """
     def __init__(self):
@@ -1537,6 +2172,8 @@ class XSECHidrogramaTab(QWidget):
         self._sections: list[str] = []                # ids ordenados
         self._Q_xseci: np.ndarray | None = None       # shape (T, S)
         self._Q_adj:   np.ndarray | None = None       # shape (T, S)
+        self._Q_b:     np.ndarray | None = None       # shape (T, S) escenario B en la grilla de A
+        self._Q_diff:  np.ndarray | None = None       # shape (T, S) B − A
 
         # --- UI raíz ---
         root = QVBoxLayout(self)
@@ -1561,8 +2198,33 @@ class XSECHidrogramaTab(QWidget):
         self.act_y2.toggled.connect(self._toggle_y2)
         tb.addAction(self.act_y2)
 
+        # Ajuste de caudales (panel plegable; recalcula 'Caudales ajustados' al cambiar un control)
+        self.act_adjust = QAction("Ajustes", self, checkable=True)
+        self.act_adjust.setToolTip("Relleno de huecos, suavizado, negativos y escalado de 'Caudales ajustados'")
+        self.act_adjust.toggled.connect(self._toggle_adjust_panel)
+        tb.addAction(self.act_adjust)
+
+        # Resumen por sección (pico, hora del pico, volumen) de la fuente actual
+        self.act_summary = QAction("Resumen", self)
+        self.act_summary.setToolTip("Q pico, hora del pico y volumen de cada sección")
+        self.act_summary.triggered.connect(self._show_summary)
+        tb.addAction(self.act_summary)
+        self._summary_dlg: HydroSummaryDialog | None = None
+
+        # Carga directa de .XSECH (tiempos + Q por sección; no necesita el XSECI)
+        tb.addSeparator()
+        self.act_open = QAction("Abrir XSECH…", self)
+        self.act_open.setToolTip("Cargar hidrogramas desde un .XSECH (mucho más liviano que el XSECI)")
+        self.act_open.triggered.connect(self._abrir_xsech)
+        tb.addAction(self.act_open)
+        self._load_job = None
+        self.adj_panel = self._build_adjust_panel()
+        self.adj_panel.setVisible(False)
+        root.addWidget(self.adj_panel)
+
         # 2) Barra de navegación de Matplotlib (como widget debajo del toolbar)
         self.canvas = PlotCanvas(self, use_colorbar=False)
+        self._hydro = HydrographRenderer(self.canvas.ax)   # una colección + decimación por píxel
         self.nav = NavigationToolbar(self.canvas, self)
         self.nav.setIconSize(QSize(18, 18))
         root.addWidget(self.nav)   # <- opción simple y limpia
@@ -1573,9 +2235,10 @@ class XSECHidrogramaTab(QWidget):
         list_row = QWidget(self)
         list_lay = QHBoxLayout(list_row); list_lay.setContentsMargins(0, 0, 0, 0)
         list_lay.addWidget(QLabel("Secciones:"))
-        self.lst_sections = QListWidget()
-        self.lst_sections.setSelectionMode(QListWidget.SelectionMode.MultiSelection)
-        self.lst_sections.setMaximumHeight(90)
+        self._sections_model = LabelListModel(parent=self)
+        self.lst_sections = FilterListView(self, "Filtrar secciones…", QListView.SelectionMode.MultiSelection)
+        self.lst_sections.set_source(self._sections_model)
+        self.lst_sections.setMaximumHeight(120)
         list_lay.addWidget(self.lst_sections, 1)
         root.addWidget(list_row)
 
@@ -1584,7 +2247,8 @@ class XSECHidrogramaTab(QWidget):
         split.setOrientation(Qt.Orientation.Vertical)
         split.addWidget(self.canvas)
 
-        self.table = QTableWidget(self)
+        self.table_model = MatrixTableModel(self)
+        self.table = make_table_view(self, self.table_model)
         split.addWidget(self.table)
 
         split.setStretchFactor(0, 3)
@@ -1592,12 +2256,141 @@ class XSECHidrogramaTab(QWidget):
         root.addWidget(split)
 
         # Señales mínimas
-        self.cbo_source.currentIndexChanged.connect(self._refresh_plot)
+        self.cbo_source.currentIndexChanged.connect(self._refresh_all)
         self.lst_sections.itemSelectionChanged.connect(self._refresh_plot)
+        self.lst_sections.itemSelectionChanged.connect(self._on_sections_selected)
 
         # Eje espejo (se creará on‑demand)
         self.ax2 = None
 
+        register_source("Flow 2D · XSECH", self._memory_usage)
+
+    # ------------ Ajuste de caudales -----------------
+    def _build_adjust_panel(self) -> QWidget:
+        panel = QWidget(self)
+        lay = QHBoxLayout(panel)
+        lay.setContentsMargins(0, 0, 0, 0)
+
+        self.chk_fill = QCheckBox("Rellenar huecos")
+        self.chk_fill.setChecked(True)
+        self.spin_gap = QSpinBox()
+        self.spin_gap.setRange(0, 100000)
+        self.spin_gap.setSpecialValueText("sin límite")
+        self.spin_gap.setPrefix("máx. ")
+        self.spin_gap.setSuffix(" pasos")
+        self.cbo_smooth = QComboBox()
+        self.cbo_smooth.addItem("Sin suavizado", "none")
+        self.cbo_smooth.addItem("Media móvil", "mean")
+        self.cbo_smooth.addItem("Savitzky–Golay", "savgol")
+        self.spin_window = QSpinBox()
+        self.spin_window.setRange(3, 501)
+        self.spin_window.setSingleStep(2)
+        self.spin_window.setValue(5)
+        self.spin_window.setPrefix("ventana ")
+        self.spin_poly = QSpinBox()
+        self.spin_poly.setRange(0, 6)
+        self.spin_poly.setValue(2)
+        self.spin_poly.setPrefix("orden ")
+        self.chk_clip = QCheckBox("Sin negativos")
+        self.chk_clip.setChecked(True)
+        self.cbo_scale = QComboBox()
+        self.cbo_scale.addItem("Sin escalar", "none")
+        self.cbo_scale.addItem("Pico objetivo", "peak")
+        self.cbo_scale.addItem("Volumen objetivo", "volume")
+        self.spin_target = QDoubleSpinBox()
+        self.spin_target.setRange(0.0, 1e12)
+        self.spin_target.setDecimals(3)
+        self.spin_target.setValue(100.0)
+        self.chk_only_sel = QCheckBox("Solo seleccionadas")
+        self.chk_only_sel.setToolTip("Escalar solo las secciones seleccionadas en la lista")
+
+        for w in (self.chk_fill, self.spin_gap, self.cbo_smooth, self.spin_window, self.spin_poly,
+                  self.chk_clip, self.cbo_scale, self.spin_target, self.chk_only_sel):
+            lay.addWidget(w)
+        lay.addStretch(1)
+
+        # Debounce: varios cambios seguidos → un solo recálculo
+        self._adj_timer = QTimer(self)
+        self._adj_timer.setSingleShot(True)
+        self._adj_timer.setInterval(120)
+        self._adj_timer.timeout.connect(self._recompute_adjusted)
+        for sig in (self.chk_fill.toggled, self.spin_gap.valueChanged, self.cbo_smooth.currentIndexChanged,
+                    self.spin_window.valueChanged, self.spin_poly.valueChanged, self.chk_clip.toggled,
+                    self.cbo_scale.currentIndexChanged, self.spin_target.valueChanged,
+                    self.chk_only_sel.toggled):
+            sig.connect(self._adj_timer.start)
+        return panel
+
+    def _memory_usage(self) -> MemoryUsage | None:
+        """Matrices T×S (XSECI y ajustada) + series decimadas del gráfico."""
+        if self._Q_xseci is None:
+            return None
+        usage = measure((self._times_labels, self._times_hours, self._sections, self._Q_xseci, self._Q_adj,
+                         self._Q_b, self._Q_diff))
+        usage.add("Cachés", self._hydro.nbytes())
+        return usage
+
+    def _on_sections_selected(self):
+        if self.chk_only_sel.isChecked():
+            self._adj_timer.start()   # el escalado depende de la selección
+
+    def _toggle_adjust_panel(self, on: bool):
+        self.adj_panel.setVisible(on)
+        if on and self.cbo_source.currentIndex() != 1:
+            self.cbo_source.setCurrentIndex(1)   # lo que se ajusta es lo que se ve
+
+    def _adjust_params(self) -> AdjustParams:
+        columns = None
+        if self.chk_only_sel.isChecked():
+            columns = np.asarray(self.lst_sections.selected_rows(), dtype=int)
+        return AdjustParams(
+            fill_gaps=self.chk_fill.isChecked(),
+            max_gap=self.spin_gap.value() or None,
+            smooth=self.cbo_smooth.currentData(),
+            window=self.spin_window.value(),
+            polyorder=self.spin_poly.value(),
+            clip_negative=self.chk_clip.isChecked(),
+            scale=self.cbo_scale.currentData(),
+            target=self.spin_target.value(),
+            columns=columns,
+        )
+
+    @traced(cat="derive")
+    def _recompute_adjusted(self):
+        """Recalcula _Q_adj sobre toda la matriz y refresca si es la fuente visible."""
+        if self._times_hours is None or self._Q_xseci is None:
+            return
+        self._Q_adj = adjust_discharges(self._times_hours, self._Q_xseci, self._adjust_params())
+        if self.cbo_source.currentIndex() == 1:
+            self._refresh_all()
+
+    # ------------ Resumen por sección -----------------
+    def _show_summary(self):
+        if self._summary_dlg is None:
+            self._summary_dlg = HydroSummaryDialog(self)
+            self._summary_dlg.section_activated.connect(self._select_only_section)
+        self._update_summary()
+        self._summary_dlg.show()
+        self._summary_dlg.raise_()
+
+    @traced(cat="derive")
+    def _update_summary(self):
+        """Recalcula el resumen si el diálogo está abierto (o se va a abrir)."""
+        dlg = self._summary_dlg
+        if dlg is None:
+            return
+        if self._times_hours is None or self._Q_xseci is None:
+            dlg.set_summary(None)
+            return
+        t0 = time.perf_counter()
+        summary = hydrograph_summary(self._times_hours, self._current_Q_matrix(), self._sections)
+        dlg.set_summary(summary, self.cbo_source.currentText(), time.perf_counter() - t0)
+
+    def _select_only_section(self, row: int):
+        if 0 <= row < self.lst_sections.count():
+            self.lst_sections.set_selected_rows([row])
+            self.lst_sections.scroll_to_row(row)
+
     # ------------ Helpers para grafica -----------------
     def _ensure_ax2(self):
         """Crea el eje Y secundario si no existe."""
@@ -1679,6 +2472,37 @@ class XSECHidrogramaTab(QWidget):
 
 
     # ------------------- API pública -------------------
+    SOURCE_B, SOURCE_DIFF = 2, 3   # índices de cbo_source agregados por set_comparison
+
+    @traced(cat="derive")
+    def set_comparison(self, cmp):
+        """
+        Setter llamado desde Flow2DWidget con la comparación de XSECI (o None al quitarla):
+        agrega las fuentes 'Caudales B' y 'ΔQ (B − A)' sobre la grilla de A (tiempos/secciones de A;
+        lo que solo existe en B queda en el ranking de la comparación).
+        """
+        had = self.cbo_source.count() > self.SOURCE_B
+        if cmp is None or self._Q_xseci is None:
+            self._Q_b = self._Q_diff = None
+            if had:
+                self.cbo_source.blockSignals(True)
+                if self.cbo_source.currentIndex() >= self.SOURCE_B:
+                    self.cbo_source.setCurrentIndex(0)
+                while self.cbo_source.count() > self.SOURCE_B:
+                    self.cbo_source.removeItem(self.cbo_source.count() - 1)
+                self.cbo_source.blockSignals(False)
+                self._refresh_all()
+            return
+        self._Q_b = cmp.reindex(cmp.Q_b, self._times_labels, self._sections)
+        Q_a = cmp.reindex(cmp.Q_a, self._times_labels, self._sections)
+        self._Q_diff = self._Q_b - Q_a
+        if not had:
+            self.cbo_source.addItems([f"Caudales B ({cmp.label_b})", "ΔQ (B − A)"])
+        else:
+            self.cbo_source.setItemText(self.SOURCE_B, f"Caudales B ({cmp.label_b})")
+        if self.cbo_source.currentIndex() >= self.SOURCE_B:
+            self._refresh_all()
+
     def set_xseci_result(self, res):
         """Setter llamado desde Flow2DWidget cuando XSECI termina de cargar."""
         if not res or not getattr(res, "data", None):
@@ -1687,18 +2511,76 @@ class XSECHidrogramaTab(QWidget):
         self._build_from_result(res)
         self._populate_sections_list()
         self._populate_table()
+        self._reset_renderer_data()
         self._refresh_plot()
+        if self._summary_dlg is not None and self._summary_dlg.isVisible():
+            self._update_summary()
+
+    # ------------ Carga directa de .XSECH -----------------
+    def _abrir_xsech(self):
+        s = QSettings("MyFriendTGI", "Flow2D")
+        path, _ = QFileDialog.getOpenFileName(self, "Abrir XSECH", s.value("xsech_dir", os.path.expanduser("~")),
+                                              "XSECH (*.XSECH *.xsech)")
+        if not path:
+            return
+        s.setValue("xsech_dir", os.path.dirname(path))
+        self._cargar_xsech_async(path)
+
+    def _cargar_xsech_async(self, path: str):
+        """Parseo en un QThread (JobWorker) con progreso por bytes y cancelación."""
+        if self._load_job is not None:
+            return
+        parser = get_parser(".XSECH")
+        prog = QProgressDialog("Cargando XSECH...", "Cancelar", 0, 100, self)
+        prog.setWindowModality(Qt.WindowModality.ApplicationModal)
+        prog.setAutoClose(False)
+        prog.setAutoReset(False)
+        prog.setMinimumDuration(300)  # ms
+
+        thr = QThread(self)
+        wk = JobWorker(lambda progress_cb, cancel_cb: parser.parse(path, progress_cb, cancel_cb))
+        wk.moveToThread(thr)
+        self._load_job = (thr, wk, prog)
+
+        def _progress(done: int, total: int):
+            if total > 0:
+                prog.setRange(0, total)
+                prog.setValue(done)
+
+        def _finish():
+            prog.close()
+            thr.quit()
+            thr.wait(1500)
+            self._load_job = None
+
+        def _ok(res):
+            _finish()
+            self.set_comparison(None)   # B/ΔQ vienen de una comparación XSECI: no aplican a este archivo
+            self.set_xseci_result(res)
+
+        def _fail(msg: str):
+            _finish()
+            QMessageBox.critical(self, "Error", f"No se pudo cargar el XSECH:\n{msg}")
+
+        thr.started.connect(wk.run)
+        wk.progress.connect(_progress)
+        wk.finished.connect(_ok)
+        wk.failed.connect(_fail)
+        wk.cancelled.connect(_finish)
+        prog.canceled.connect(wk.request_cancel)
+        thr.start()
 
 
     # ----------------- CConstrucción de modelo a partir del resultado XSECI -----------------
+    @traced(cat="derive")
     def _build_from_result(self, res):
         """
         Construye:
         - _times_labels: lista de etiquetas "0000d 00h 06m 00s" (ordenada)
-        - _times_hours : ndarray float con horas
+        - _times_hours : ndarray float con horas (ParseResult.time_hours; etiquetas solo como respaldo)
         - _sections    : lista ids ordenados globalmente
         - _Q_xseci     : matriz T x S con Q leídos (None->NaN)
-        - _Q_adj       : matriz T x S (por ahora 0.0 en todos)
+        - _Q_adj       : matriz T x S ajustada (flow2d_hydro.adjust_discharges, panel 'Ajustes')
         """
         # 1) Tiempos
         times = list(res.meta.get("times", []))
@@ -1706,30 +2588,26 @@ class XSECHidrogramaTab(QWidget):
             # Si no estaban en meta, tómalos de las keys para robustez
             times = sorted(res.data.keys())
         self._times_labels = times
-        self._times_hours  = np.array([self._time_label_to_hours(t) for t in times], dtype=float)
+        th = getattr(res, "time_hours", None)   # eje numérico del parser (sin re-parsear etiquetas)
+        if th is not None and len(th) == len(times):
+            self._times_hours = np.asarray(th, dtype=float)
+        else:
+            self._times_hours = np.array([self._time_label_to_hours(t) for t in times], dtype=float)
 
-        # 2) Secciones (unión global)
-        all_ids = sorted({sid for t in res.data for sid in res.data[t].keys()})
+        # 2) Secciones (unión global; NavIndex del parser si existe, si no las de meta: XSECH)
+        nav = getattr(res, "nav", None)
+        if nav is not None:
+            all_ids = nav.sections
+        else:
+            all_ids = list(res.meta.get("ids") or sorted({sid for t in res.data for sid in res.data[t].keys()}))
         self._sections = all_ids
 
-        # 3) Matriz Q_xseci (T,S)
-        T, S = len(times), len(all_ids)
-        Q = np.full((T, S), np.nan, dtype=float)
-        for it, t in enumerate(times):
-            sec_map = res.data.get(t, {})
-            for is_, sid in enumerate(all_ids):
-                sec = sec_map.get(sid)
-                if sec is None:
-                    continue
-                val = sec.get("Q")
-                try:
-                    Q[it, is_] = float(val) if val is not None else np.nan
-                except Exception:
-                    Q[it, is_] = np.nan
+        # 3) Matriz Q_xseci (T,S): XSECH la trae lista; en XSECI sale del Q de cada bloque
+        Q = np.asarray(res.q_matrix(), dtype=float)
         self._Q_xseci = Q
 
-        # 4) Matriz Q ajustados (placeholder = 0.0)
-        self._Q_adj = np.zeros_like(Q)
+        # 4) Matriz Q ajustados (parámetros actuales del panel)
+        self._Q_adj = adjust_discharges(self._times_hours, Q, self._adjust_params())
 
 
     
@@ -1739,82 +2617,55 @@ class XSECHidrogramaTab(QWidget):
     def _populate_sections_list(self):
         """Llena la lista de secciones y las marca todas seleccionadas por defecto."""
         self.lst_sections.blockSignals(True)
-        self.lst_sections.clear()
-        for sid in self._sections:
-            item = QListWidgetItem(sid)
-            item.setSelected(True)  # seleccionadas por defecto
-            self.lst_sections.addItem(item)
+        self._sections_model.set_labels(self._sections)
+        self.lst_sections.select_all()  # seleccionadas por defecto (el renderer lo soporta en bloque)
         self.lst_sections.blockSignals(False)
 
+    @traced(cat="table")
     def _populate_table(self):
         """Tabla: columna 0 = Tiempo (h), columnas 1.. = Q por sección (todas)."""
         if self._times_hours is None or self._Q_xseci is None:
-            self.table.clearContents(); self.table.setRowCount(0); self.table.setColumnCount(0); return
-
-        times_h = self._times_hours
-        Q = self._current_Q_matrix()  # según fuente
+            self.table_model.clear([]); return
 
-        # Encabezados
-        headers = ["Tiempo (h)"] + self._sections
-        self.table.setColumnCount(len(headers))
-        self.table.setRowCount(len(times_h))
-        self.table.setHorizontalHeaderLabels(headers)
-
-        # Datos
-        for r, th in enumerate(times_h):
-            self.table.setItem(r, 0, QTableWidgetItem(f"{th:.3f}"))
-            for c, sid in enumerate(self._sections, start=1):
-                val = Q[r, c-1]
-                self.table.setItem(r, c, QTableWidgetItem("" if np.isnan(val) else f"{val:.6f}"))
-
-        self.table.resizeColumnsToContents()
+        # Modelo virtual sobre la matriz (sin T×S items): solo se formatean celdas visibles
+        self.table_model.set_matrix(
+            "Tiempo (h)", self._times_hours, self._sections, self._current_Q_matrix(),
+            axis_format=fixed_format(3), value_format=fixed_format(6),
+        )
 
     # ----------------- Plot -----------------
     def _refresh_all(self):
         """Cambio de fuente de caudales → actualizar todo."""
         self._populate_table()
+        self._reset_renderer_data()
         self._refresh_plot()
+        if self._summary_dlg is not None and self._summary_dlg.isVisible():
+            self._update_summary()
+
+    def _reset_renderer_data(self):
+        """Entrega al renderer la matriz de la fuente actual (invalida lo decimado)."""
+        if self._times_hours is None:
+            return
+        self._hydro.set_data(self._times_hours, self._current_Q_matrix(), self._sections)
 
 
+    @traced(cat="plot")
     def _refresh_plot(self):
         """Grafica los hidrogramas de las secciones seleccionadas (con eje duplicado a la derecha)."""
-        ax = self.canvas.ax
-        ax.clear()
-
         if self._times_hours is None:
-            ax.set_title("Sin datos")
+            self._hydro.clear("Sin datos")
             self.canvas.draw_idle()
             return
 
-        times_h = self._times_hours
-        Q = self._current_Q_matrix()
-
-        # Secciones seleccionadas
-        selected = [i.text() for i in self.lst_sections.selectedItems()]
-        if not selected:
-            ax.set_title("Seleccione al menos una sección")
+        # Secciones seleccionadas (filas de la lista = columnas de Q)
+        rows = self.lst_sections.selected_rows().tolist()
+        if not rows:
+            self._hydro.clear("Seleccione al menos una sección")
             self.canvas.draw_idle()
             return
 
-        idx = {sid: i for i, sid in enumerate(self._sections)}
-
-        # Ploteo normal
-        for sid in selected:
-            j = idx.get(sid)
-            if j is None:
-                continue
-            ax.plot(times_h, Q[:, j], label=sid, linewidth=1.8)
-
-        # Configuración estética
-        ax.set_title("Hidrogramas")
-        ax.set_xlabel("Tiempo (h)")
-        ax.set_ylabel("Caudal (m³/s)")
-        ax.grid(True, linestyle=":", alpha=0.6)
-
-        # Leyenda
-        handles, _ = ax.get_legend_handles_labels()
-        if handles:
-            ax.legend(loc="upper right", fontsize=9, frameon=False)
+        # Solo se decima/añade lo nuevo y se quita lo deseleccionado (una sola LineCollection)
+        self._hydro.set_selection(rows)
 
         # --- 👇 eje duplicado (espejo)
         if self.ax2 is not None:
@@ -1830,23 +2681,24 @@ class XSECHidrogramaTab(QWidget):
 
     def _current_Q_matrix(self) -> np.ndarray:
         """Devuelve la matriz Q según la fuente seleccionada."""
-        if self.cbo_source.currentIndex() == 0:
-            return self._Q_xseci if self._Q_xseci is not None else np.empty((0,0))
-        return self._Q_adj   if self._Q_adj   is not None else np.empty((0,0))
+        idx = self.cbo_source.currentIndex()
+        if idx == self.SOURCE_B and self._Q_b is not None:
+            return self._Q_b
+        if idx == self.SOURCE_DIFF and self._Q_diff is not None:
+            return self._Q_diff
+        if idx == 1:
+            return self._Q_adj   if self._Q_adj   is not None else np.empty((0,0))
+        return self._Q_xseci if self._Q_xseci is not None else np.empty((0,0))
+
+    def current_hydrographs(self):
+        """(horas (T,), Q (T,S) de la fuente elegida, secciones, etiqueta) o None si no hay datos."""
+        if self._times_hours is None or self._Q_xseci is None:
+            return None
+        return self._times_hours, self._current_Q_matrix(), list(self._sections), self.cbo_source.currentText()
 
     def _time_label_to_hours(self, s: str) -> float:
-        """
-        Convierte '0000d 00h 06m 00s' → horas (float).
-        Si tus labels vinieran como '0000 days, 00 hours, 06 min.,00 secs.' 
-        adapta el regex según corresponda.
-        """
-        import re
-        m = re.search(r"(\d+)d\s+(\d+)h\s+(\d+)m\s+(\d+)s", s)
-        if not m:
-            # fallback: 0.0 h si formato inesperado
-            return 0.0
-        d, h, mm, ss = map(int, m.groups())
-        return d*24.0 + h + mm/60.0 + ss/3600.0
+        """Convierte '0000d 00h 06m 00s' → horas (float); ver flow2d_xseci.time_label_to_hours."""
+        return time_label_to_hours(s)
     
     def _clear_all_ui(self, title: str):
         self._times_labels = []
@@ -1854,10 +2706,161 @@ class XSECHidrogramaTab(QWidget):
         self._sections     = []
         self._Q_xseci = None
         self._Q_adj   = None
-        self.lst_sections.clear()
-        self.table.clear()
-        self.table.setRowCount(0); self.table.setColumnCount(0)
+        self._Q_b = self._Q_diff = None
+        self._sections_model.set_labels([])
+        self.table_model.clear([])
         self.canvas.clear(); self.canvas.ax.set_title(title); self.canvas.draw_idle()
+        if self._summary_dlg is not None:
+            self._summary_dlg.set_summary(None)
+
+class PlanMapTab(QWidget):
+    """
+    Mapa en planta: secciones del XSECS (o extremos del XSECI si no hay XSECS) coloreadas por una
+    métrica del XSECI, unidas por ID. Una sola LineCollection (flow2d_planmap.PlanMapRenderer):
+    cambiar de tiempo o de métrica solo recolorea.
+    """
+    section_activated = pyqtSignal(str, str)   # (sección, tiempo actual) al hacer doble clic
+
+    def __init__(self, time_model: LabelListModel | None = None):
+        super().__init__()
+        self._geom_xsecs: PlanGeometry | None = None
+        self._geom_xseci: PlanGeometry | None = None
+        self._xseci_result: ParseResult | None = None
+        self._metrics: SectionMetrics | None = None
+        self._geom: PlanGeometry | None = None
+        self._join: PlanJoin | None = None
+        self._values: np.ndarray | None = None     # por línea de geometría (lo que se ve)
+
+        root = QVBoxLayout(self)
+        tb = QToolBar("Planta", self)
+        tb.setIconSize(QSize(18, 18))
+        root.addWidget(tb)
+        tb.addWidget(QLabel("Métrica:"))
+        self.cbo_metric = QComboBox()
+        self.cbo_metric.addItems([m[0] for m in PLAN_METRICS])
+        tb.addWidget(self.cbo_metric)
+        tb.addSeparator()
+        tb.addWidget(QLabel("Tiempo:"))
+        self._own_times = time_model is None       # sin modelo compartido: se llena con los tiempos del índice
+        self._time_model = time_model if time_model is not None else LabelListModel(parent=self)
+        self.cbo_time = FilterComboBox()
+        self.cbo_time.setModel(self._time_model)
+        self.cbo_time.setMinimumWidth(180)
+        tb.addWidget(self.cbo_time)
+
+        self.fig = Figure(figsize=(6, 5))   # márgenes fijos: sin recalcular layout en cada repintado
+        self.fig.subplots_adjust(left=0.1, right=0.95, top=0.93, bottom=0.08)
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_xlabel("x")
+        self.ax.set_ylabel("y")
+        self.canvas = FigureCanvas(self.fig)
+        self._renderer = PlanMapRenderer(self.ax)
+        self.nav = NavigationToolbar(self.canvas, self)
+        self.nav.setIconSize(QSize(18, 18))
+        root.addWidget(self.nav)
+        root.addWidget(self.canvas, 1)
+        self.lbl_info = QLabel("Cargue un XSECS y/o un XSECI")
+        root.addWidget(self.lbl_info)
+
+        self.cbo_metric.currentIndexChanged.connect(self._refresh_values)
+        self.cbo_time.currentIndexChanged.connect(self._on_time_changed)
+        self.canvas.mpl_connect("pick_event", self._on_pick)
+        self._sync_time_enabled()
+        register_source("Flow 2D · Planta", self._memory_usage)
+
+    # ------------ entradas (Flow2DWidget) -----------------
+    def set_xsecs_result(self, res):
+        """Geometría del XSECS (None al limpiar → se vuelve a los extremos del XSECI si hay)."""
+        self._geom_xsecs = geometry_from_xsecs(res)
+        self._rebuild()
+
+    def set_xseci_result(self, res):
+        """Resultado XSECI: solo aporta la geometría de respaldo (los valores vienen de set_zone_maps)."""
+        self._xseci_result = res
+        self._geom_xseci = None          # se arma a demanda (solo si no hay XSECS)
+        if self._geom_xsecs is None:
+            self._rebuild()
+
+    def set_zone_maps(self, index: ZoneMapIndex | None):
+        self._metrics = section_metrics(index)
+        if index is None:
+            self._xseci_result = None
+            self._geom_xseci = None
+        if self._own_times:
+            self._time_model.set_labels(self._metrics.times if self._metrics is not None else [])
+        self._rebuild()
+
+    # ------------ armado -----------------
+    def _active_geometry(self) -> PlanGeometry | None:
+        if self._geom_xsecs is not None:
+            return self._geom_xsecs
+        if self._geom_xseci is None and self._xseci_result is not None:
+            self._geom_xseci = geometry_from_xseci(self._xseci_result)
+        return self._geom_xseci
+
+    def _rebuild(self):
+        geom = self._active_geometry()
+        if geom is not self._geom:
+            self._geom = geom
+            self._renderer.set_geometry(geom)
+        self._join = join_geometry(geom, self._metrics.sections) if (geom and self._metrics) else None
+        self._refresh_values()
+
+    def _sync_time_enabled(self):
+        self.cbo_time.setEnabled(PLAN_METRICS[max(self.cbo_metric.currentIndex(), 0)][2])
+
+    def _on_time_changed(self, _idx: int):
+        if PLAN_METRICS[max(self.cbo_metric.currentIndex(), 0)][2]:
+            self._refresh_values()
+
+    @traced(cat="plot")
+    def _refresh_values(self, *_):
+        self._sync_time_enabled()
+        metric = max(self.cbo_metric.currentIndex(), 0)
+        label = PLAN_METRICS[metric][0]
+        geom, m, join = self._geom, self._metrics, self._join
+        if geom is None:
+            self._values = None
+            self.ax.set_title("Sin geometría (XSECS o coordenadas del XSECI)")
+            self.lbl_info.setText("Cargue un XSECS y/o un XSECI")
+        elif m is None or join is None:
+            self._values = np.full(len(geom), np.nan)
+            self._renderer.set_values(self._values, label)
+            self.ax.set_title(f"{len(geom)} secciones ({geom.source}) — sin resultados XSECI")
+            self.lbl_info.setText(f"Geometría: {geom.source}, {len(geom)} secciones")
+        else:
+            t = self.cbo_time.currentIndex()
+            self._values = join.take(m.values(metric, t))
+            self._renderer.set_values(self._values, label, m.limits(metric))
+            when = f" @ {m.times[t]}" if PLAN_METRICS[metric][2] and 0 <= t < len(m.times) else ""
+            self.ax.set_title(f"{label}{when}")
+            self.lbl_info.setText(f"Geometría: {geom.source} — {join.matched} secciones unidas, "
+                                  f"{len(join.only_geometry)} solo geometría, {len(join.only_results)} solo XSECI")
+        self.canvas.draw_idle()
+
+    def _on_pick(self, event):
+        if self._geom is None or event.artist is not self._renderer.collection or not len(event.ind):
+            return
+        i = int(event.ind[0])
+        sid = self._geom.ids[i]
+        v = self._values[i] if self._values is not None else np.nan
+        val = f"{v:.3f}" if np.isfinite(v) else "sin dato"
+        self.lbl_info.setText(f"{sid}: {self.cbo_metric.currentText()} = {val}")
+        if event.mouseevent.dblclick and self._metrics is not None:
+            t = self.cbo_time.currentIndex()
+            self.section_activated.emit(sid, self._metrics.times[t] if 0 <= t < len(self._metrics.times) else "")
+
+    def _memory_usage(self) -> MemoryUsage | None:
+        if self._metrics is None and self._geom is None:
+            return None
+        usage = MemoryUsage()
+        if self._metrics is not None:
+            usage.add("Arreglos", self._metrics.nbytes())
+        for g in (self._geom_xsecs, self._geom_xseci):
+            if g is not None:
+                usage.add("Arreglos", g.nbytes())
+        return usage
+
 
 # --- WIDGET RAÍZ CON TABS ---
 
@@ -1871,13 +2874,31 @@ class Flow2DWidget(QWidget):
         xsecs_tab  = XSECSSectionTab()
         xseci_tab  = XSECITab()
         xsech_tab  = XSECHidrogramaTab()
+        self.xsech_tab = xsech_tab   # otros módulos (Hidrogramas Cv) leen sus hidrogramas
+        plan_tab   = PlanMapTab(xseci_tab._time_model)   # mismo modelo de tiempos que XSECI
 
         tabs.addTab(xsecs_tab, "XSECS")
         tabs.addTab(xseci_tab, "XSECI")
         tabs.addTab(xsech_tab, "XSECH")
+        tabs.addTab(plan_tab, "Planta")
 
         # 🔗 CONEXIÓN CLAVE: cuando XSECI cargue, XSECH recibe el ParseResult
         xseci_tab.dataLoaded.connect(xsech_tab.set_xseci_result)
+        # Comparación de escenarios en XSECI → fuentes 'B' y 'ΔQ' en XSECH
+        xseci_tab.compareLoaded.connect(xsech_tab.set_comparison)
+        # Mapa en planta: geometría (XSECS) + métricas (índice de XSECI), unidos por ID de sección
+        xsecs_tab.dataLoaded.connect(plan_tab.set_xsecs_result)
+        xseci_tab.dataLoaded.connect(plan_tab.set_xseci_result)
+        xseci_tab.zoneMapsChanged.connect(plan_tab.set_zone_maps)
+        xseci_tab.cbo_time.currentIndexChanged.connect(plan_tab.cbo_time.setCurrentIndex)
+
+        def _goto_from_plan(sec_id: str, time_label: str):
+            tabs.setCurrentWidget(xseci_tab)
+            i = xseci_tab.cbo_time.findText(time_label) if time_label else -1
+            if i >= 0 and i != xseci_tab.cbo_time.currentIndex():
+                xseci_tab.cbo_time.setCurrentIndex(i)
+            xseci_tab._select_section(sec_id)
+        plan_tab.section_activated.connect(_goto_from_plan)
         
         # (opcional) si al crear el widget XSECI ya tenía algo (p.ej. restaurado),
         # pásalo inmediatamente:
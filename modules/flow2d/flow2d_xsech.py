@@ -0,0 +1,253 @@
+# modules/flow2d/flow2d_xsech.py
+"""
+Lector de .XSECH (hidrogramas por sección): produce directamente el eje de tiempo y la matriz de
+caudales Q (T×S) que consume XSECHidrogramaTab, sin pasar por el XSECI (mucho más grande).
+- Lectura por bloques de CHUNK_BYTES (memoria acotada, progreso por bytes, cancelable).
+- Las corridas de filas numéricas se convierten de una vez (np.fromstring sobre el texto unido);
+  solo si una fila viene rota (columnas de menos, '*****') se cae a la conversión fila por fila.
+- Dos disposiciones:
+    * por bloques (como XSECI):   CROSS SECTION NO.: 1  CROSS SECTION ID: XSEC_1
+                                   TIME   Q   [otras columnas]
+                                   (hr)  (m3/s)
+                                   0.000  10.5 ...
+    * ancha (una columna por sección):  TIME(hr)  XSEC_1  XSEC_2 ...
+                                         0.000     10.5    11.2
+  Unidades de tiempo por encabezado: s/sec/secs, min, h/hr/hrs/hours, d/days (por defecto horas).
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+import re
+import warnings
+
+import numpy as np
+
+from .flow2d_xseci import ParseCancelled
+from utils.tracing import traced
+
+CHUNK_BYTES = 8 * 1024 * 1024
+
+_SECT_RE = re.compile(r"CROSS\s+SECTION\s+(?:NO\.\s*:\s*(\d+)\s+)?(?:CROSS\s+SECTION\s+)?ID\s*:\s*(\S+)",
+                      re.IGNORECASE)
+_UNIT_RE = re.compile(r"\(([^)]*)\)")
+_TIME_UNITS = {
+    "s": 1.0, "sec": 1.0, "secs": 1.0, "seg": 1.0, "seconds": 1.0,
+    "min": 60.0, "mins": 60.0, "minutes": 60.0,
+    "h": 3600.0, "hr": 3600.0, "hrs": 3600.0, "hour": 3600.0, "hours": 3600.0, "horas": 3600.0,
+    "d": 86400.0, "day": 86400.0, "days": 86400.0, "dias": 86400.0,
+}
+_DIGITS = set("0123456789")
+_RULE_RE = re.compile(r"^[-=_*+|\s]+$")           # líneas separadoras '-----' / '====='
+_TIME_HEAD = ("TIME", "T(", "TIEMPO")
+
+
+@dataclass
+class XSECHData:
+    """Resultado del lector: tiempos (s, crecientes) × secciones."""
+    time_seconds: np.ndarray     # (T,) float
+    sections: list[str]          # orden del archivo
+    Q: np.ndarray                # (T, S) float, NaN sin dato
+    time_unit: str = "h"
+    q_units: str = ""
+
+
+def seconds_to_time_label(seconds: int) -> str:
+    """Segundos → etiqueta con el formato de XSECI ("0000d 01h 30m 00s")."""
+    d, r = divmod(int(seconds), 86400)
+    h, r = divmod(r, 3600)
+    m, s = divmod(r, 60)
+    return f"{d:04d}d {h:02d}h {m:02d}m {s:02d}s"
+
+
+def _is_numeric(line: str) -> bool:
+    """Fila de datos: empieza con dígito o signo/punto seguido de dígito (no '-----')."""
+    s = line.lstrip()
+    if not s:
+        return False
+    if s[0] in _DIGITS:
+        return True
+    return s[0] in "+-." and len(s) > 1 and (s[1] in _DIGITS or s[1] == ".")
+
+
+def _rows_to_matrix(rows: list[str]) -> np.ndarray:
+    """Filas de texto numéricas → matriz n×k (una conversión vectorizada si las filas son regulares)."""
+    k = len(rows[0].split())
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)   # NumPy viejo: texto no numérico solo avisa
+            flat = np.fromstring(" ".join(rows), dtype=float, sep=" ")
+    except (ValueError, DeprecationWarning):
+        flat = None
+    if flat is not None and flat.size == len(rows) * k:
+        return flat.reshape(len(rows), k)
+    # filas irregulares o con valores no numéricos: fila por fila, NaN donde falte
+    k = max(len(r.split()) for r in rows)
+    out = np.full((len(rows), k), np.nan)
+    for i, r in enumerate(rows):
+        for j, tok in enumerate(r.split()):
+            try:
+                out[i, j] = float(tok)
+            except ValueError:
+                pass
+    return out
+
+
+def _time_factor(header: str, units: str) -> tuple[float, str]:
+    """Segundos por unidad de la columna de tiempo (encabezado 'TIME(hr)' o fila de unidades '(hr)')."""
+    for text in (header, units):
+        m = _UNIT_RE.search(text or "")
+        if m:
+            u = m.group(1).strip().lower().rstrip(".")
+            if u in _TIME_UNITS:
+                return _TIME_UNITS[u], u
+    for tok in re.split(r"[\s_\[\]]+", (header or "").lower()):
+        if tok in _TIME_UNITS and tok not in ("s", "d", "h"):
+            return _TIME_UNITS[tok], tok
+    return 3600.0, "h"
+
+
+def _is_time_header(s: str) -> bool:
+    """Encabezado de columnas: el primer token es la columna de tiempo ('TIME', 'TIME(hr)', 'TIEMPO')."""
+    toks = s.split()
+    return bool(toks) and toks[0].upper().startswith(_TIME_HEAD)
+
+
+def _q_column(header: str) -> int:
+    """Índice de la columna de caudal en un encabezado de bloque (por defecto la 2ª)."""
+    toks = [re.sub(r"\(.*\)", "", t).upper() for t in (header or "").split()]
+    for i, t in enumerate(toks):
+        if t in ("Q", "DISCHARGE", "CAUDAL", "FLOW") or t.startswith("Q("):
+            return i
+    return 1
+
+
+def _wide_ids(header: str) -> list[str]:
+    """
+    IDs de sección de un encabezado ancho: la columna de tiempo es el 1er token más, opcionalmente,
+    un token de unidad '(hr)' separado ('TIME (hr)  XS1  XS2'); el resto, una sección por columna.
+    """
+    toks = header.split()[1:]
+    if toks and toks[0].startswith("(") and toks[0].endswith(")"):
+        toks = toks[1:]
+    return [re.sub(r"\(.*\)", "", t) or t for t in toks]
+
+
+def _units_of(units_line: str, col: int) -> str:
+    toks = _UNIT_RE.findall(units_line or "")
+    return toks[col].strip() if 0 <= col < len(toks) else ""
+
+
+@traced("XSECH.read", "parse")
+def parse_xsech(path: str | Path, progress_cb=None, cancel_cb=None) -> XSECHData:
+    """
+    - progress_cb(done_bytes:int, total_bytes:int) ; cancel_cb() -> bool (mismo contrato que parse_xseci).
+    """
+    path = Path(path)
+    total = path.stat().st_size
+    done = 0
+
+    # estado del recorrido
+    sec_pos: dict[str, int] = {}                  # ID → columna (un ID puede repetirse en varios bloques)
+    # disposición por bloques: (sección, matriz n×k, col. Q, s por unidad de t, unidad t, unidad Q)
+    blocks: list[tuple[int, np.ndarray, int, float, str, str]] = []
+    wide: list[np.ndarray] = []                   # disposición ancha
+    cur_sec: int | None = None
+    sec_header = units = ""
+    wide_header = None
+    run: list[str] = []
+
+    def flush_run():
+        if not run:
+            return
+        M = _rows_to_matrix(run)
+        run.clear()
+        if cur_sec is not None:
+            # encabezado del propio bloque (flush_run corre antes de que on_text lo reemplace)
+            q_col = _q_column(sec_header)
+            factor, unit = _time_factor(sec_header, units)
+            blocks.append((cur_sec, M, q_col, factor, unit, _units_of(units, q_col)))
+        else:
+            wide.append(M)
+
+    def on_text(line: str):
+        nonlocal cur_sec, sec_header, units, wide_header
+        flush_run()
+        m = _SECT_RE.search(line)
+        if m:
+            cur_sec = sec_pos.setdefault(m.group(2), len(sec_pos))
+            sec_header = units = ""
+            return
+        s = line.strip()
+        if _RULE_RE.match(s):
+            return
+        if cur_sec is not None:
+            # solo el primer encabezado de columnas del bloque (y la fila de unidades que le sigue);
+            # títulos u otras líneas de texto no lo reemplazan
+            if not sec_header:
+                if _is_time_header(s):
+                    sec_header = s
+            elif not units and s.startswith("("):
+                units = s
+        elif s.startswith("("):
+            units = s
+        elif _is_time_header(s):
+            wide_header = s
+
+    if progress_cb and total > 0:
+        progress_cb(0, total)            # tick inicial (0%)
+    with path.open("r", encoding="utf-8", errors="ignore") as f:
+        tail = ""
+        while True:
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            done += len(chunk.encode("utf-8", errors="ignore")) if not chunk.isascii() else len(chunk)
+            lines = (tail + chunk).split("\n")
+            tail = lines.pop()               # última línea posiblemente incompleta
+            for line in lines:
+                if _is_numeric(line):
+                    run.append(line)
+                elif line.strip():
+                    on_text(line)
+            if progress_cb:
+                progress_cb(min(done, total), total)
+            if cancel_cb and cancel_cb():
+                raise ParseCancelled()
+        if tail.strip():
+            run.append(tail) if _is_numeric(tail) else on_text(tail)
+        flush_run()
+
+    # ---- armar eje de tiempo + matriz ----
+    sections = list(sec_pos)
+    if blocks:
+        # cada sección con su propio eje (y su propio encabezado): unión de tiempos y asignación
+        # vectorizada (Q[fila, sección] = q)
+        sec_idx = np.concatenate([np.full(len(b[1]), b[0]) for b in blocks])
+        t = np.concatenate([M[:, 0] * factor for _j, M, _c, factor, _u, _qu in blocks])
+        q = np.concatenate([M[:, c] if M.shape[1] > c else np.full(len(M), np.nan)
+                            for _j, M, c, _f, _u, _qu in blocks])
+        ok = np.isfinite(t)
+        times, inv = np.unique(t[ok], return_inverse=True)
+        Q = np.full((len(times), len(sections)), np.nan)
+        Q[inv, sec_idx[ok]] = q[ok]
+        unit = blocks[0][4]
+        q_units = next((b[5] for b in blocks if b[5]), "")
+    elif wide:
+        M = np.concatenate(wide) if len(wide) > 1 else wide[0]
+        factor, unit = _time_factor(wide_header or "", "")
+        if wide_header:
+            sections = _wide_ids(wide_header)
+            if len(sections) != M.shape[1] - 1:
+                raise ValueError(f"[XSECH] El encabezado tiene {len(sections)} secciones pero los datos "
+                                 f"{M.shape[1] - 1} columnas de caudal: {wide_header!r}")
+        else:
+            sections = [f"XSEC_{j + 1}" for j in range(M.shape[1] - 1)]
+        t = M[:, 0] * factor
+        ok = np.isfinite(t)
+        order = np.argsort(t[ok], kind="stable")
+        times = t[ok][order]
+        Q = M[ok][order][:, 1:1 + len(sections)]
+        q_units = ""
+    else:
+        raise ValueError(f"[XSECH] No se encontraron datos numéricos en {path}")
+    return XSECHData(times, sections, Q, unit, q_units)
@@ -3,8 +3,12 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 import re
+import time
+import numpy as np
 import pandas as pd
 
+from utils.tracing import is_enabled
+
 _TIME_RE = re.compile(
     r"TIME:\s*(\d+)\s*days,\s*(\d+)\s*hours,\s*(\d+)\s*min\.,\s*(\d+)\s*secs\.", re.IGNORECASE
 )
@@ -16,6 +20,15 @@ _Q_RE = re.compile(r"Q\s*=\s*([+-]?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\s*([A-Za-z0-9
 WANTED = ["ELEM", "STATION", "BEDEL", "DEPTH", "WSEL",
           "VEL_NORM", "FROUDE", "QS_NORM"]
 
+
+def float_matrix(df, cols: list[str]) -> np.ndarray:
+    """Matriz n×k float de un bloque (None/texto → NaN) en una conversión; columnas faltantes → NaN."""
+    sub = df if list(df.columns) == cols else df.reindex(columns=cols)
+    try:
+        return sub.to_numpy(dtype=float, na_value=np.nan)
+    except (TypeError, ValueError):
+        return sub.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+
 class ParseCancelled(Exception):
     """Señal interna para cortar parsing por cancelación del usuario."""
     pass
@@ -29,11 +42,46 @@ def _next_nonempty(it) -> str:
     raise EOFError("Fin de archivo inesperado.")
 
 def _parse_time_label(line: str) -> str:
+    return _parse_time(line)[0]
+
+def _parse_time(line: str) -> tuple[str, int]:
+    """Línea TIME: → (etiqueta '0000d 00h 06m 00s', segundos enteros)."""
     m = _TIME_RE.search(line)
     if not m:
         raise ValueError(f"Formato TIME no reconocido: {line!r}")
     d, h, m_, s = map(int, m.groups())
-    return f"{d:04d}d {h:02d}h {m_:02d}m {s:02d}s"
+    return f"{d:04d}d {h:02d}h {m_:02d}m {s:02d}s", ((d * 24 + h) * 60 + m_) * 60 + s
+
+
+class XSECIData(dict):
+    """
+    tiempo → {sección: bloque} (igual que antes) + `time_seconds`: etiqueta → segundos (int),
+    leídos una sola vez de la línea TIME: (ParseResult lo convierte en un eje numérico ordenado).
+    """
+    def __init__(self):
+        super().__init__()
+        self.time_seconds: Dict[str, int] = {}
+
+_LABEL_RE = re.compile(r"(\d+)d\s+(\d+)h\s+(\d+)m\s+(\d+)s")
+
+def time_label_to_hours(label: str) -> float:
+    """
+    Convierte '0000d 00h 06m 00s' (formato de _parse_time_label) → horas (float).
+    Si el formato es inesperado devuelve 0.0.
+    """
+    m = _LABEL_RE.search(label or "")
+    if not m:
+        return 0.0
+    d, h, mm, ss = map(int, m.groups())
+    return d*24.0 + h + mm/60.0 + ss/3600.0
+
+def time_label_to_seconds(label: str) -> int | None:
+    """'0000d 00h 06m 00s' → segundos (int); None si el formato es inesperado (p.ej. 'Unknown')."""
+    m = _LABEL_RE.search(label or "")
+    if not m:
+        return None
+    d, h, mm, ss = map(int, m.groups())
+    return ((d * 24 + h) * 60 + mm) * 60 + ss
 
 def _split_ws(s: str) -> List[str]:
     return re.split(r"\s+", s.strip())
@@ -219,10 +267,13 @@ def parse_xseci(path: str | Path) -> Dict[str, Dict[str, Any]]:
 # parse_xseci(path, progress_cb=None, cancel_cb=None)
 # - progress_cb(done_bytes:int, total_bytes:int) -> None
 # - cancel_cb() -> bool  # True si hay que cancelar
+# - stats: dict opcional; con el trazado activo recibe build_df_blocks / build_df_ms (tiempo total
+#   armando DataFrames), para el span XSECI.read: un solo evento por archivo, no uno por bloque.
 
 def parse_xseci(path: str | Path,
                 progress_cb=None,
-                cancel_cb=None) -> Dict[str, Dict[str, Any]]:
+                cancel_cb=None,
+                stats: dict | None = None) -> XSECIData:
         
     path = Path(path)
     total_bytes = path.stat().st_size if path.exists() else 0
@@ -239,9 +290,23 @@ def parse_xseci(path: str | Path,
         if cancel_cb and cancel_cb():
             raise ParseCancelled()
 
-    data: Dict[str, Dict[str, Any]] = {}
+    data = XSECIData()
     current_time: str | None = None
 
+    timing = stats is not None and is_enabled()
+    build_s, n_blocks = 0.0, 0
+
+    def _build_df(header_line: str, units_line: str, rows: list[str]):
+        nonlocal build_s, n_blocks
+        if not timing:
+            return _build_df_from_rows(header_line, units_line, rows)
+        t0 = time.perf_counter()
+        try:
+            return _build_df_from_rows(header_line, units_line, rows)
+        finally:
+            build_s += time.perf_counter() - t0
+            n_blocks += 1
+
        
 
     with path.open("r", encoding="utf-8", errors="ignore") as f:
@@ -280,8 +345,9 @@ def parse_xseci(path: str | Path,
         while True:
             try:
                 if line.upper().startswith("TIME:"):
-                    current_time = _parse_time_label(line)  # tu función actual
+                    current_time, secs = _parse_time(line)
                     data.setdefault(current_time, {})
+                    data.time_seconds[current_time] = secs
                     line = _next_nonempty()
                     continue
 
@@ -300,7 +366,7 @@ def parse_xseci(path: str | Path,
                             q_match = _Q_RE.search(candidate)
                             Q_val   = float(q_match.group(1)) if q_match else None
                             Q_units = q_match.group(2) if (q_match and q_match.group(2)) else None
-                            df, units = _build_df_from_rows(header_line, units_line, rows)
+                            df, units = _build_df(header_line, units_line, rows)
                             if current_time is None:
                                 current_time = "Unknown"
                                 data.setdefault(current_time, {})
@@ -317,7 +383,7 @@ def parse_xseci(path: str | Path,
                                 line = ""
                             break
                         if u.startswith("CROSS SECTION NO.") or u.startswith("TIME:"):
-                            df, units = _build_df_from_rows(header_line, units_line, rows)
+                            df, units = _build_df(header_line, units_line, rows)
                             if current_time is None:
                                 current_time = "Unknown"
                                 data.setdefault(current_time, {})
@@ -337,6 +403,8 @@ def parse_xseci(path: str | Path,
             except EOFError:
                 break
 
+    if timing:
+        stats.update(build_df_blocks=n_blocks, build_df_ms=round(build_s * 1000.0, 1))
     return data
 
 
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# los módulos se importan como en la app (modules.*, utils.*), desde la raíz del repo
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
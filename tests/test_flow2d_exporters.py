@@ -0,0 +1,148 @@
+# tests/test_flow2d_exporters.py
+import numpy as np
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from modules.flow2d.flow2d_exporters import PARQUET_ROW_GROUP_ROWS, ParquetExporter, _unique_slug
+from modules.flow2d.flow2d_parsers import ParseResult
+from modules.flow2d.flow2d_xseci import WANTED
+from modules.flow2d.flow2d_xsech import seconds_to_time_label
+
+
+def _xseci_result(T: int, ids: list[str], rows: int) -> ParseResult:
+    rng = np.random.default_rng(0)
+    times = [seconds_to_time_label(i * 360) for i in range(T)]
+    data = {t: {sid: {"df": pd.DataFrame(rng.random((rows, len(WANTED))), columns=WANTED),
+                      "Q": 1.0, "Q_units": "m3/s", "units": {}, "coords_text": ""} for sid in ids}
+            for t in times}
+    return ParseResult(meta={"type": "XSECI", "source": "test", "times": times, "ids": ids},
+                       data=data, time_seconds=np.arange(T) * 360)
+
+
+def test_arrow_ipc_mas_de_un_row_group(tmp_path):
+    ids = [f"XS_{j}" for j in range(60)]
+    result = _xseci_result(12, ids, 250)
+    n = 12 * 60 * 250
+    assert n > PARQUET_ROW_GROUP_ROWS
+
+    out = tmp_path / "todo.arrow"
+    ParquetExporter().export(result, None, str(out))
+
+    with pa.ipc.open_file(str(out)) as reader:
+        table = reader.read_all()
+    assert table.num_rows == n
+    df = table.to_pandas()
+    assert list(pd.unique(df["time"].astype(str))) == result.meta["times"]
+    assert sorted(pd.unique(df["section"].astype(str))) == sorted(ids)
+
+
+def test_unique_slug_sin_colisiones():
+    used: set[str] = set()
+    assert [_unique_slug(k, used) for k in ("XS 1", "XS1", "XS/1", "xs1")] == ["XS1", "XS1__2", "XS1__3", "xs1__4"]
+
+
+def test_particion_por_seccion_no_sobrescribe(tmp_path):
+    ids = ["XS 1", "XS1", "XS/1"]
+    result = _xseci_result(2, ids, 5)
+    out_dir = tmp_path / "por_seccion"
+    ParquetExporter(partition_by="section").export(result, None, str(out_dir / "x.parquet"))
+
+    df = pd.read_parquet(out_dir)
+    assert len(df) == 2 * 3 * 5
+    assert sorted(pd.unique(df["section"].astype(str))) == sorted(ids)
+
+
+def test_cubo_hdf5_chunk_fijo_y_bloques_partidos(tmp_path, monkeypatch):
+    h5py = pytest.importorskip("h5py")
+    from modules.flow2d import flow2d_exporters as ex
+
+    result = _xseci_result(40, [f"XS_{j}" for j in range(20)], 30)
+    ex.HDF5CubeExporter().export(result, None, str(tmp_path / "a.nc"))
+    # bloque en memoria menor que una altura de chunk con todas las secciones: se parte por secciones
+    monkeypatch.setattr(ex, "CUBE_SLAB_BYTES", 32 * 16 * 30 * 8 * len(WANTED))
+    assert ex._cube_layout(40, 20, 30, len(WANTED)) == ((32, 16, 30), 32, 16)
+    ex.HDF5CubeExporter().export(result, None, str(tmp_path / "b.nc"))
+
+    with h5py.File(tmp_path / "a.nc") as fa, h5py.File(tmp_path / "b.nc") as fb:
+        for ds in (fa["DEPTH"], fb["DEPTH"]):
+            assert ds.chunks == (32, 16, 30)
+        np.testing.assert_array_equal(fa["DEPTH"][()], fb["DEPTH"][()])
+        np.testing.assert_array_equal(fa["Q"][()], fb["Q"][()])
+        df = result.data[result.meta["times"][7]]["XS_19"]["df"]
+        np.testing.assert_array_equal(fb["DEPTH"][7, 19], df["DEPTH"].to_numpy())
+
+
+def test_cubo_layout_modelo_grande():
+    from modules.flow2d.flow2d_exporters import _cube_layout
+
+    chunks, t_slab, s_slab = _cube_layout(5000, 20000, 200, len(WANTED))
+    assert chunks == (32, 16, 200)
+    assert t_slab == 32 and s_slab % 16 == 0 and s_slab < 20000
+
+
+def test_csv_mismo_texto_con_y_sin_pyarrow(tmp_path):
+    import io
+    from modules.flow2d.flow2d_exporters import _write_csv_arrow, _write_csv_python, iter_long
+
+    pytest.importorskip("pyarrow.csv")
+    raros = np.array([0.0, -0.0, 2.0, 1 / 3, 1e-7, 2.5e-6, 1e10, 123456789.123456789, -1.5e300, np.nan, np.inf])
+    block = {"time": np.array(["0000d 00h 06m 00s", 'con "comillas"', "a,b", "x", "y", "z", "", "u", "v", "w", "q"],
+                              dtype=object),
+             "section": np.array(["XS 1", None, "XS2", "s", "s", "s", "s", "s", "s", "s", "s"], dtype=object),
+             "row": np.arange(11, dtype=np.int64),
+             "v": raros,
+             "f32": np.array([0.1, 2.5, 1e-7, 3.3, 7.0, -1.25, 0.0, np.nan, 4e12, 1e-3, 5.5], dtype=np.float32)}
+    cols = list(block)
+    a, b = io.BytesIO(), io.BytesIO()
+    _write_csv_arrow(a, block, cols)
+    _write_csv_python(b, block, cols)
+    assert a.getvalue() == b.getvalue()
+    assert a.getvalue().splitlines()[0] == b'"0000d 00h 06m 00s","XS 1",0,0,0.10000000149011612'
+
+    result = _xseci_result(3, ["XS 1", "XS2"], 7)
+    columns, chunks = iter_long(result, chunk_rows=10)
+    for block in chunks:
+        a, b = io.BytesIO(), io.BytesIO()
+        _write_csv_arrow(a, block, columns)
+        _write_csv_python(b, block, columns)
+        assert a.getvalue() == b.getvalue()
+        back = pd.read_csv(io.BytesIO(a.getvalue()), header=None, names=columns, float_precision="round_trip")
+        np.testing.assert_array_equal(back["DEPTH"].to_numpy(), block["DEPTH"])   # floats de ida y vuelta
+
+
+def test_xlsx_sin_opt_close_limita_hojas(tmp_path, monkeypatch):
+    pytest.importorskip("xlsxwriter")
+    from modules.flow2d import flow2d_exporters as ex
+
+    result = _xseci_result(2, [f"XS_{j}" for j in range(5)], 3)
+    assert ex._can_close_sheets()   # la versión fijada en requirements.txt
+    ex.XLSXExporter().export(result, None, str(tmp_path / "ok.xlsx"))
+
+    monkeypatch.setattr(ex, "_can_close_sheets", lambda: False)   # xlsxwriter sin _opt_close
+    ex.XLSXExporter().export(result, None, str(tmp_path / "pocas.xlsx"))   # pocas hojas: solo avisa
+    monkeypatch.setattr(ex, "XLSX_MAX_OPEN_SHEETS", 3)
+    with pytest.raises(RuntimeError):
+        ex.XLSXExporter().export(result, None, str(tmp_path / "muchas.xlsx"))
+    assert not (tmp_path / "muchas.xlsx").exists()
+
+
+def test_json_resumen_escribe_picos(tmp_path):
+    import json
+    from modules.flow2d.flow2d_exporters import JSONSummaryExporter
+    from modules.flow2d.flow2d_pipeline import compute_variables
+
+    result = _xseci_result(3, ["XS 1", "XS2"], 4)
+    t_pico = result.meta["times"][1]
+    result.data[t_pico]["XS2"]["Q"] = 99.0
+    result.data[t_pico]["XS2"]["df"].loc[2, "DEPTH"] = 50.0
+    result.data[result.meta["times"][2]]["XS2"]["df"].loc[0, "DEPTH"] = np.nan
+    out = tmp_path / "resumen.json"
+    JSONSummaryExporter().export(result, compute_variables(result), str(out))
+
+    doc = json.loads(out.read_text(encoding="utf-8"))
+    assert doc["type"] == "XSECI" and doc["n_times"] == 3 and doc["n_sections"] == 2
+    xs2 = doc["sections"]["XS2"]
+    assert (xs2["Q_max"], xs2["Q_max_time"]) == (99.0, t_pico)
+    assert (xs2["DEPTH_max"], xs2["DEPTH_max_time"]) == (50.0, t_pico)
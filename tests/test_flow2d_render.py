@@ -0,0 +1,42 @@
+# tests/test_flow2d_render.py
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+from modules.flow2d.flow2d_render import HydrographRenderer  # noqa: E402
+
+
+def _renderer():
+    fig, ax = plt.subplots()
+    x = np.linspace(0.0, 10.0, 500)
+    Q = np.column_stack([np.sin(x) + 1.0, 100.0 * np.cos(x) + 100.0])
+    r = HydrographRenderer(ax)
+    r.set_data(x, Q, ["A", "B"])
+    return fig, ax, r
+
+
+def test_seleccion_respeta_zoom_del_usuario():
+    fig, ax, r = _renderer()
+    r.set_selection([0])
+    ax.set_xlim(2.0, 4.0)
+    ax.set_ylim(0.5, 1.5)
+    r.set_selection([0, 1])
+    r.set_selection([1])
+    assert ax.get_xlim() == (2.0, 4.0)
+    assert ax.get_ylim() == (0.5, 1.5)
+    plt.close(fig)
+
+
+def test_limites_automaticos_siguen_la_seleccion():
+    fig, ax, r = _renderer()
+    r.set_selection([0])
+    assert ax.get_ylim()[1] < 5.0
+    r.set_selection([0, 1])            # sin zoom del usuario: se ajusta a la nueva serie
+    assert ax.get_ylim()[1] > 150.0
+    ax.set_xlim(2.0, 4.0)
+    r.set_data(np.linspace(0.0, 20.0, 50), np.ones((50, 2)), ["A", "B"])
+    r.set_selection([0])               # datos nuevos: siempre se ajusta
+    assert ax.get_xlim() == (0.0, 20.0)
+    plt.close(fig)
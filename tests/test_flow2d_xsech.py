@@ -0,0 +1,46 @@
+# tests/test_flow2d_xsech.py
+import numpy as np
+import pytest
+
+from modules.flow2d.flow2d_xsech import parse_xsech
+
+
+def test_ancho_unidad_separada(tmp_path):
+    p = tmp_path / "ancho.XSECH"
+    p.write_text("TIME (hr)  XS1  XS2\n0.0 1 2\n1.0 3 4\n")
+    d = parse_xsech(p)
+    assert d.sections == ["XS1", "XS2"]
+    assert d.time_seconds.tolist() == [0.0, 3600.0]
+    assert d.Q.tolist() == [[1.0, 2.0], [3.0, 4.0]]
+
+
+def test_ancho_ids_no_coinciden(tmp_path):
+    p = tmp_path / "ancho.XSECH"
+    p.write_text("TIME (hr)  XS1\n0.0 1 2\n")
+    with pytest.raises(ValueError):
+        parse_xsech(p)
+
+
+def test_bloques_con_encabezados_distintos(tmp_path):
+    p = tmp_path / "bloques.XSECH"
+    p.write_text("CROSS SECTION NO.: 1 CROSS SECTION ID: A\n"
+                 "TIME Q DEPTH\n(hr) (m3/s) (m)\n0.0 10 1\n1.0 11 1\n"
+                 "CROSS SECTION NO.: 2 CROSS SECTION ID: B\n"
+                 "TIME DEPTH Q\n(min) (m) (m3/s)\n0 9 20\n60 9 21\n")
+    d = parse_xsech(p)
+    assert d.sections == ["A", "B"]
+    assert d.time_seconds.tolist() == [0.0, 3600.0]
+    np.testing.assert_array_equal(d.Q, [[10.0, 20.0], [11.0, 21.0]])
+    assert d.q_units == "m3/s"
+
+
+def test_bloques_con_linea_separadora(tmp_path):
+    p = tmp_path / "separador.XSECH"
+    p.write_text("CROSS SECTION NO.: 1 CROSS SECTION ID: A\n"
+                 "TIME DEPTH Q\n(hr) (m) (m3/s)\n--------------------\n0.0 1 10\n1.0 1 11\n"
+                 "CROSS SECTION NO.: 2 CROSS SECTION ID: B\n"
+                 "TIME DEPTH Q\n(hr) (m) (m3/s)\n====================\n0.0 2 20\n1.0 2 21\n")
+    d = parse_xsech(p)
+    assert d.sections == ["A", "B"]
+    np.testing.assert_array_equal(d.Q, [[10.0, 20.0], [11.0, 21.0]])
+    assert d.q_units == "m3/s"
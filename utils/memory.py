@@ -0,0 +1,270 @@
+# utils/memory.py
+"""
+Contabilidad de memoria de lo que está cargado en la aplicación (sin Qt).
+- measure(obj): bytes de un objeto (ParseResult, ExcelTable, dict…) por categoría:
+  DataFrames / Arreglos / Índices / Textos / Otros. Recorrido profundo sin contar dos veces el
+  mismo objeto; en contenedores enormes se mide una muestra uniforme y se escala (estimado).
+- register_source(nombre, proveedor): cada pestaña publica lo que tiene en memoria
+  (proveedor() → MemoryUsage | None); memory_report() junta todo + RSS del proceso.
+- rss_history: muestras (t, RSS) para ver la evolución en el tiempo.
+"""
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass, field
+import os
+import sys
+import time
+import weakref
+
+import numpy as np
+
+KINDS = ("DataFrames", "Arreglos", "Índices", "Textos", "Cachés", "Otros")
+MEASURE_BUDGET = 4000       # elementos por medición antes de pasar a muestreo
+SMALL_CONTAINER = 64        # contenedores de hasta este tamaño se recorren siempre completos
+RSS_HISTORY_LEN = 1800      # muestras guardadas (1 h a 2 s)
+
+
+@dataclass
+class MemoryUsage:
+    """Bytes por categoría de una fuente (p.ej. el XSECI cargado)."""
+    kinds: dict[str, int] = field(default_factory=dict)
+    estimated: bool = False     # True si algún contenedor se midió por muestreo
+
+    def add(self, kind: str, nbytes: float):
+        self.kinds[kind] = self.kinds.get(kind, 0) + int(nbytes)
+
+    def merge(self, other: "MemoryUsage") -> "MemoryUsage":
+        for k, v in other.kinds.items():
+            self.add(k, v)
+        self.estimated = self.estimated or other.estimated
+        return self
+
+    @property
+    def total(self) -> int:
+        return sum(self.kinds.values())
+
+
+# ---------------- medición ----------------
+def _frame_bytes(df, acc: MemoryUsage):
+    """DataFrame: buffers de columnas → DataFrames; índice → Índices; contenido de columnas de texto → Textos."""
+    shallow = df.memory_usage(index=True, deep=False)
+    acc.add("Índices", int(shallow.iloc[0]) + sys.getsizeof(df.columns))
+    acc.add("DataFrames", int(shallow.iloc[1:].sum()))
+    text = [c for c, dt in df.dtypes.items() if dt == object or str(dt) == "string"]
+    if text:
+        deep = df[text].memory_usage(index=False, deep=True)
+        acc.add("Textos", max(0, int(deep.sum()) - int(shallow[text].sum())))
+
+
+def _walk(obj, acc: MemoryUsage, seen: set, budget: int):
+    oid = id(obj)
+    if oid in seen:
+        return
+    seen.add(oid)
+    if isinstance(obj, (str, bytes)):
+        acc.add("Textos", sys.getsizeof(obj))
+        return
+    if isinstance(obj, (int, float, bool, complex)) or obj is None:
+        acc.add("Otros", sys.getsizeof(obj))
+        return
+    if isinstance(obj, np.ndarray):
+        # vistas: cuenta la base una sola vez
+        base = obj if obj.base is None or not isinstance(obj.base, np.ndarray) else obj.base
+        if base is obj or id(base) not in seen:
+            seen.add(id(base))
+            kind = "Textos" if base.dtype.kind in "OUS" else "Arreglos"
+            acc.add(kind, base.nbytes)
+            if base.dtype == object:
+                _walk_items(list(base.ravel()), acc, seen, budget)
+        return
+    mod = type(obj).__module__
+    if mod.startswith("pandas"):
+        if hasattr(obj, "columns") and hasattr(obj, "dtypes"):
+            _frame_bytes(obj, acc)
+            return
+        if hasattr(obj, "memory_usage"):
+            acc.add("DataFrames", obj.memory_usage(deep=True))
+            return
+    if isinstance(obj, dict):
+        acc.add("Índices", sys.getsizeof(obj))
+        if type(obj) is not dict and hasattr(obj, "__dict__"):   # p.ej. XSECIData.time_seconds
+            _walk(vars(obj), acc, seen, budget)
+        _walk_items(obj.items(), acc, seen, budget, len(obj), pairs=True)
+        return
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        acc.add("Índices", sys.getsizeof(obj))
+        _walk_items(obj, acc, seen, budget, len(obj))
+        return
+    d = getattr(obj, "__dict__", None)
+    acc.add("Otros", sys.getsizeof(obj))
+    if d is not None:
+        _walk(d, acc, seen, budget)
+    elif hasattr(type(obj), "__slots__"):
+        for name in type(obj).__slots__:
+            if hasattr(obj, name):
+                _walk(getattr(obj, name), acc, seen, budget)
+
+
+def _walk_items(items, acc: MemoryUsage, seen: set, budget: int, n: int | None = None,
+                pairs: bool = False):
+    """
+    Recorre los elementos repartiendo el presupuesto; si hay más elementos que presupuesto
+    mide una muestra uniforme (paso fijo) y escala lo medido por n / muestra.
+    pairs=True: items son (clave, valor) de un dict (la tupla temporal no se cuenta).
+    """
+    if n is None:
+        items = list(items)
+        n = len(items)
+    if n == 0:
+        return
+
+    def visit(it, into, b):
+        if pairs:
+            _walk(it[0], into, seen, b)
+            _walk(it[1], into, seen, b)
+        else:
+            _walk(it, into, seen, b)
+
+    if n <= max(budget, SMALL_CONTAINER):
+        child = max(1, budget // n)
+        for it in items:
+            visit(it, acc, child)
+        return
+    step = n / budget
+    picks = set(int(i * step) for i in range(budget))
+    part = MemoryUsage()
+    for i, it in enumerate(items):
+        if i in picks:
+            visit(it, part, 1)
+    scale = n / len(picks)
+    for k, v in part.kinds.items():
+        acc.add(k, v * scale)
+    acc.estimated = True
+
+
+def measure(obj, budget: int = MEASURE_BUDGET) -> MemoryUsage:
+    """Bytes de `obj` (y de todo lo que referencia) por categoría."""
+    acc = MemoryUsage()
+    _walk(obj, acc, set(), budget)
+    return acc
+
+
+# ---------------- RSS del proceso ----------------
+def process_rss() -> int | None:
+    """Memoria residente actual del proceso en bytes (None si la plataforma no lo permite)."""
+    try:
+        import psutil  # type: ignore
+        return int(psutil.Process().memory_info().rss)
+    except ImportError:
+        pass
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class _PMC(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+            pmc = _PMC()
+            pmc.cb = ctypes.sizeof(_PMC)
+            k32 = ctypes.windll.kernel32
+            k32.GetCurrentProcess.restype = wintypes.HANDLE
+            if ctypes.windll.psapi.GetProcessMemoryInfo(k32.GetCurrentProcess(), ctypes.byref(pmc), pmc.cb):
+                return int(pmc.WorkingSetSize)
+        except Exception:
+            return None
+    return None
+
+
+class RSSHistory:
+    """Anillo de muestras (segundos desde el inicio, RSS en bytes)."""
+    def __init__(self, maxlen: int = RSS_HISTORY_LEN):
+        self._t0 = time.monotonic()
+        self._samples: deque = deque(maxlen=maxlen)
+
+    def sample(self) -> int | None:
+        rss = process_rss()
+        if rss is not None:
+            self._samples.append((time.monotonic() - self._t0, rss))
+        return rss
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        if not self._samples:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        t, r = zip(*self._samples)
+        return np.asarray(t, dtype=float), np.asarray(r, dtype=np.int64)
+
+    def peak(self) -> int | None:
+        return max((r for _t, r in self._samples), default=None)
+
+
+rss_history = RSSHistory()
+
+
+# ---------------- registro de fuentes ----------------
+_SOURCES: dict[str, object] = {}
+
+
+def register_source(name: str, provider):
+    """
+    proveedor() → MemoryUsage | None (None = no hay nada cargado).
+    Los métodos ligados se guardan con WeakMethod: si el widget se destruye, la fuente desaparece sola.
+    """
+    try:
+        ref = weakref.WeakMethod(provider)
+    except TypeError:
+        ref = lambda p=provider: p     # función normal: referencia fuerte
+    _SOURCES[name] = ref
+
+
+def unregister_source(name: str):
+    _SOURCES.pop(name, None)
+
+
+@dataclass
+class MemoryReport:
+    """Una fila por fuente registrada + RSS del proceso en el momento del informe."""
+    entries: list[tuple[str, MemoryUsage]]
+    rss: int | None
+    elapsed: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(u.total for _n, u in self.entries)
+
+    def as_columns(self) -> tuple[list[str], list[np.ndarray]]:
+        """Encabezados + columnas en MB (ColumnsTableModel/CSV)."""
+        mb = 1024.0 * 1024.0
+        headers = ["Fuente", *(f"{k} (MB)" for k in KINDS), "Total (MB)", "Estimado"]
+        cols = [np.array([n for n, _u in self.entries], dtype=object)]
+        for k in KINDS:
+            cols.append(np.array([u.kinds.get(k, 0) / mb for _n, u in self.entries], dtype=float))
+        cols.append(np.array([u.total / mb for _n, u in self.entries], dtype=float))
+        cols.append(np.array(["sí" if u.estimated else "" for _n, u in self.entries], dtype=object))
+        return headers, cols
+
+
+def memory_report() -> MemoryReport:
+    """Mide todas las fuentes registradas (las que no tienen nada cargado se omiten)."""
+    t0 = time.perf_counter()
+    entries = []
+    for name, ref in list(_SOURCES.items()):
+        provider = ref()
+        if provider is None:
+            _SOURCES.pop(name, None)
+            continue
+        usage = provider()
+        if usage is not None:
+            entries.append((name, usage))
+    rss = rss_history.sample()
+    return MemoryReport(entries, rss, time.perf_counter() - t0)
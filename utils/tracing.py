@@ -0,0 +1,169 @@
+# utils/tracing.py
+"""
+Instrumentación de tiempos por "spans" (intervalos con nombre) exportable como Chrome trace-event JSON
+(se abre en chrome://tracing, https://ui.perfetto.dev o speedscope).
+- Desactivado por defecto: span() devuelve un contexto nulo compartido y traced() solo consulta un
+  booleano → costo prácticamente nulo en el uso normal.
+- Activar: variable de entorno MYFRIENDTGI_TRACE=1, enable(True) o Ayuda ▸ Registrar trazas.
+- Uso:
+      with span("XSECI.parse", "parse", path=ruta): ...
+      @traced("compute_variables", "derive")
+      def compute_variables(...): ...
+- Los eventos se guardan en memoria (anillo acotado) con hilo y proceso; export_chrome_trace(path).
+"""
+from __future__ import annotations
+from collections import deque
+from functools import wraps
+import json
+import os
+import threading
+import time
+
+MAX_EVENTS = 200_000
+
+_enabled = os.environ.get("MYFRIENDTGI_TRACE", "").strip().lower() in ("1", "true", "yes", "on")
+_events: deque = deque(maxlen=MAX_EVENTS)   # (fase, nombre, categoría, ts_us, dur_us, tid, args)
+_thread_names: dict[int, str] = {}
+_T0 = time.perf_counter_ns()
+
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = bool(on)
+    print(f"[TRACE] {'activado' if _enabled else 'desactivado'}")
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def clear():
+    _events.clear()
+
+
+def event_count() -> int:
+    return len(_events)
+
+
+def _now_us() -> float:
+    return (time.perf_counter_ns() - _T0) / 1000.0
+
+
+def _tid() -> int:
+    t = threading.current_thread()
+    tid = threading.get_ident()
+    if tid not in _thread_names:
+        _thread_names[tid] = t.name
+    return tid
+
+
+def name_thread(name: str):
+    """Nombre legible del hilo actual en la traza (los QThread aparecen como 'Dummy-N')."""
+    _thread_names[threading.get_ident()] = name
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "_t0")
+
+    def __init__(self, name: str, cat: str, args: dict):
+        self.name, self.cat, self.args = name, cat, args
+
+    def __enter__(self):
+        self._t0 = _now_us()
+        return self
+
+    def set(self, **args):
+        """Agrega argumentos conocidos solo al final (p.ej. filas escritas)."""
+        self.args.update(args)
+
+    def __exit__(self, exc_type, exc, tb):
+        t1 = _now_us()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _events.append(("X", self.name, self.cat, self._t0, t1 - self._t0, _tid(), self.args))
+        return False
+
+
+def span(name: str, cat: str = "app", **args):
+    """Contexto que registra un evento de duración (nulo si el trazado está desactivado)."""
+    if not _enabled:
+        return _NULL
+    return _Span(name, cat, args)
+
+
+def traced(name: str | None = None, cat: str = "app"):
+    """Decorador: cada llamada es un span (nombre por defecto: Clase.método / función)."""
+    def deco(fn):
+        label = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*a, **kw):
+            if not _enabled:
+                return fn(*a, **kw)
+            with _Span(label, cat, {}):
+                return fn(*a, **kw)
+        return wrapper
+    return deco
+
+
+def instant(name: str, cat: str = "app", **args):
+    """Marca puntual (p.ej. 'archivo cargado')."""
+    if _enabled:
+        _events.append(("i", name, cat, _now_us(), 0.0, _tid(), args))
+
+
+def _jsonable(v):
+    if isinstance(v, (str, int, float, bool)) or v is None:
+        return v
+    return str(v)
+
+
+def export_chrome_trace(path: str) -> int:
+    """Escribe {"traceEvents": [...]} (formato Trace Event de Chrome). Devuelve nº de eventos."""
+    pid = os.getpid()
+    events = list(_events)
+    out = [{"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": "My Friend TGI"}}]
+    for tid, tname in list(_thread_names.items()):
+        out.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": tname}})
+    for ph, name, cat, ts, dur, tid, args in events:
+        ev = {"ph": ph, "name": name, "cat": cat, "ts": round(ts, 3), "pid": pid, "tid": tid}
+        if ph == "X":
+            ev["dur"] = round(dur, 3)
+        else:
+            ev["s"] = "t"
+        if args:
+            ev["args"] = {k: _jsonable(v) for k, v in args.items()}
+        out.append(ev)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, f)
+    print(f"[TRACE] {len(events)} eventos -> {path}")
+    return len(events)
+
+
+def summary() -> list[tuple[str, int, float, float]]:
+    """(nombre, llamadas, total ms, máx ms) ordenado por total descendente."""
+    acc: dict[str, list] = {}
+    for ph, name, _cat, _ts, dur, _tid, _args in list(_events):
+        if ph != "X":
+            continue
+        a = acc.setdefault(name, [0, 0.0, 0.0])
+        a[0] += 1
+        a[1] += dur / 1000.0
+        a[2] = max(a[2], dur / 1000.0)
+    return sorted(((n, c, t, m) for n, (c, t, m) in acc.items()), key=lambda r: -r[2])